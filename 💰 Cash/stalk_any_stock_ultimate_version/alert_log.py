@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+
+DEFAULT_LOG_FILE = "alert_log.jsonl"
+LEGACY_LOG_FILE = "alert_log.json"
+
+
+class AlertLog:
+    # Log de alertas append-only em JSONL (um alerta por linha) com indice em memoria
+    # de (simbolo, dia, regra): gravar um alerta nao exige reler nem reescrever o arquivo
+
+    def __init__(self, path: str = DEFAULT_LOG_FILE, legacy_path: str = LEGACY_LOG_FILE):
+        self.path = path
+        self.index = set()
+        self.count = 0
+
+        if not os.path.exists(self.path) and legacy_path and os.path.exists(legacy_path):
+            self.migrate_legacy(legacy_path)
+        self.load_index()
+
+    def key(self, alert: dict) -> tuple:
+        # Um alerta por ativo, regra e dia (registros antigos, sem "rule", vem do alert_price)
+        return (alert["symbol"], alert["timestamp"][:10], alert.get("rule", "alert_price"))
+
+    def load_index(self):
+        # Le o arquivo uma unica vez, na inicializacao, para montar o indice
+        for alert in self.iter_alerts():
+            self.index.add(self.key(alert))
+            self.count += 1
+
+    def iter_alerts(self):
+        # Percorre os alertas gravados sem carregar o arquivo inteiro na memoria
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Linha truncada (ex.: queda durante a gravacao) nao invalida o restante
+                    print(f"# Linha {line_number} invalida em {self.path}, ignorada")
+
+    def append(self, alerts: list) -> int:
+        # Grava apenas alertas ainda nao registrados no dia - RETORNA quantos foram gravados
+        new_alerts = []
+        for alert in alerts:
+            key = self.key(alert)
+            if key not in self.index:
+                self.index.add(key)
+                new_alerts.append(alert)
+
+        if new_alerts:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(alert, ensure_ascii=False) + "\n" for alert in new_alerts))
+            self.count += len(new_alerts)
+
+        return len(new_alerts)
+
+    def migrate_legacy(self, legacy_path: str):
+        # Converte o alert_log.json antigo (lista JSON) para o formato JSONL
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                alerts = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"# Nao foi possivel migrar {legacy_path}: {e}")
+            return
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+        print(f"# {len(alerts)} alerta(s) migrados de {legacy_path} para {self.path}")
+
+    def export_json(self, path: str = LEGACY_LOG_FILE) -> int:
+        # Exporta no formato antigo (lista JSON indentada) - RETORNA quantos alertas foram exportados
+        exported = 0
+        temp_path = path + ".tmp"
+
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write("[")
+            for alert in self.iter_alerts():
+                f.write(",\n" if exported else "\n")
+                # Mesma formatacao do json.dump(lista, indent=2) usado antes
+                f.write("\n".join("  " + line for line in json.dumps(alert, indent=2, ensure_ascii=False).splitlines()))
+                exported += 1
+            f.write("\n]" if exported else "]")
+
+        os.replace(temp_path, path)
+        return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log de alertas de precos")
+    parser.add_argument("--log", default=DEFAULT_LOG_FILE, help=f"Arquivo JSONL (padrao: {DEFAULT_LOG_FILE})")
+    parser.add_argument("--export", nargs="?", const=LEGACY_LOG_FILE, metavar="ARQUIVO",
+                        help=f"Exporta para uma lista JSON (padrao: {LEGACY_LOG_FILE})")
+    args = parser.parse_args()
+
+    log = AlertLog(args.log)
+    print(f"# {log.count} alerta(s) em {args.log}")
+
+    if args.export:
+        exported = log.export_json(args.export)
+        print(f"# {exported} alerta(s) exportados para {args.export}")
+
+
+if __name__ == "__main__":
+    main()
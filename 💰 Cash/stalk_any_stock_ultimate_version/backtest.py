@@ -0,0 +1,265 @@
+import argparse
+import csv
+import datetime
+import json
+import time
+
+import numpy as np
+import requests
+
+from coin_resolver import CoinResolver
+from fetch_engine import FetchEngine
+from price_store import PriceStore
+from rules import AlertRuleEngine, describe_rule
+
+# Enderecos base das APIs (settings.api_base_urls troca por outro servidor, como no main.py)
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+YAHOO_API_URL = "https://query1.finance.yahoo.com/v8/finance"
+YAHOO_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+DEFAULT_DAYS = 365
+
+
+class BacktestEngine:
+    # Reaplica as regras do config.json (as mesmas compiladas para o check_alerts) sobre series
+    # historicas inteiras de uma vez com NumPy: cada regra vira uma mascara booleana sobre a serie
+
+    def __init__(self, assets: list):
+        self.assets = assets
+        self.rule_engine = AlertRuleEngine(assets)
+        # Dia local, como no log de alertas (que deduplica por ativo, regra e dia)
+        self.utc_offset = time.localtime().tm_gmtoff
+
+    def evaluate(self, asset: dict, timestamps, prices) -> list:
+        # Resultado de cada regra do ativo sobre a serie - RETORNA [dict, ...]
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        symbol_rules = self.rule_engine.symbols.get(self.rule_engine.asset_key(asset))
+        if symbol_rules is None or len(prices) == 0:
+            return []
+
+        days = (timestamps + self.utc_offset) // 86400
+        results = []
+
+        for limit, rule_id in symbol_rules.above.between(0, len(symbol_rules.above)):
+            results.append(self.summarize(asset, symbol_rules.rules[rule_id], limit, prices >= limit,
+                                          timestamps, prices, days))
+
+        for limit, rule_id in symbol_rules.below.between(0, len(symbol_rules.below)):
+            results.append(self.summarize(asset, symbol_rules.rules[rule_id], limit, prices <= limit,
+                                          timestamps, prices, days))
+
+        if len(symbol_rules.cross):
+            previous, current = prices[:-1], prices[1:]
+            for limit, rule_id in symbol_rules.cross.between(0, len(symbol_rules.cross)):
+                # Subindo: anterior < limite <= atual; caindo: atual <= limite < anterior
+                crossed = np.zeros(len(prices), dtype=bool)
+                crossed[1:] = ((previous < limit) & (current >= limit)) | ((current <= limit) & (previous > limit))
+                results.append(self.summarize(asset, symbol_rules.rules[rule_id], limit, crossed,
+                                              timestamps, prices, days))
+
+        if len(symbol_rules.trailing):
+            # Pico acumulado (partindo do pico inicial da regra, ex.: buy_price)
+            initial_peak = symbol_rules.peak if symbol_rules.peak is not None else prices[0]
+            peaks = np.maximum.accumulate(np.maximum(prices, initial_peak))
+            drawdown = (1 - prices / peaks) * 100
+            for pct, rule_id in symbol_rules.trailing.between(0, len(symbol_rules.trailing)):
+                results.append(self.summarize(asset, symbol_rules.rules[rule_id], pct, drawdown >= pct,
+                                              timestamps, prices, days))
+
+        return results
+
+    def summarize(self, asset: dict, rule: dict, limit: float, mask, timestamps, prices, days) -> dict:
+        # Ticks que atendem a regra e alertas que o log registraria (o primeiro de cada dia)
+        hits = np.flatnonzero(mask)
+        # A serie e cronologica: basta marcar onde o dia muda entre disparos consecutivos
+        hit_days = days[hits]
+        new_day = np.ones(len(hits), dtype=bool)
+        new_day[1:] = hit_days[1:] != hit_days[:-1]
+        logged = hits[new_day]
+
+        first = int(hits[0]) if len(hits) else None
+        return {
+            "symbol": asset["symbol"],
+            "type": asset["type"],
+            "rule": rule["id"],
+            "rule_type": rule["type"],
+            "description": describe_rule(rule, limit) if rule["type"] != "trailing_stop" else f"trailing stop de {limit:.1f}%",
+            "ticks": int(len(prices)),
+            "ticks_fired": int(len(hits)),
+            "alerts": int(len(logged)),
+            "first_alert": iso(timestamps[first]) if first is not None else None,
+            "first_alert_price": float(prices[first]) if first is not None else None,
+            "last_alert": iso(timestamps[hits[-1]]) if len(hits) else None,
+            "alert_days": [iso(timestamps[i])[:10] for i in logged]
+        }
+
+    def run(self, series: dict) -> list:
+        # series: {(tipo, simbolo): (timestamps, precos)} - RETORNA os resultados de todas as regras
+        results = []
+        for asset in self.assets:
+            data = series.get(self.rule_engine.asset_key(asset))
+            if data is not None:
+                results.extend(self.evaluate(asset, *data))
+        return results
+
+
+def iso(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(float(timestamp)).isoformat(timespec="seconds")
+
+
+def load_from_store(store: PriceStore, assets: list, start: float) -> dict:
+    # Series gravadas localmente pelo tracker
+    series = {}
+    for asset in assets:
+        # Le a serie inteira e recorta o periodo com NumPy (sem laco em Python)
+        data = np.frombuffer(store.read_series(store.series_key(asset["type"], asset["symbol"])), dtype=np.float64)
+        timestamps, prices = data[0::2], data[1::2]
+        selected = timestamps >= start
+        if selected.any():
+            key = ("crypto" if asset["type"] == "crypto" else "stock", asset["symbol"])
+            series[key] = (timestamps[selected], prices[selected])
+    return series
+
+
+def download_crypto_series(engine: FetchEngine, coin_id: str, days: int, base_url: str = COINGECKO_API_URL) -> tuple:
+    # Historico do CoinGecko em BRL (granularidade automatica: 5 min ate 1 dia, horaria ate 90 dias)
+    response = engine.get("coingecko", f"{base_url}/coins/{coin_id}/market_chart",
+                          params={"vs_currency": "brl", "days": days})
+    response.raise_for_status()
+    points = np.asarray(response.json().get("prices", []), dtype=np.float64)
+    if not len(points):
+        return np.empty(0), np.empty(0)
+    return points[:, 0] / 1000, points[:, 1]
+
+
+def download_stock_series(engine: FetchEngine, symbol: str, days: int, base_url: str = YAHOO_API_URL) -> tuple:
+    # Historico do Yahoo (intraday de hora em hora ate 730 dias; acima disso, diario)
+    clean_symbol = symbol.strip().upper()
+    if not clean_symbol.endswith('.SA'):
+        clean_symbol += '.SA'
+    params = {"range": f"{days}d", "interval": "1h" if days <= 730 else "1d"}
+    response = engine.get("yahoo", f"{base_url}/chart/{clean_symbol}", params=params, headers=YAHOO_HEADERS)
+    response.raise_for_status()
+
+    result = response.json()["chart"]["result"][0]
+    timestamps = np.asarray(result.get("timestamp", []), dtype=np.float64)
+    closes = np.asarray(result["indicators"]["quote"][0].get("close", []), dtype=np.float64)
+    # Velas sem negociacao vem como null
+    valid = ~np.isnan(closes)
+    return timestamps[valid], closes[valid]
+
+
+def download_series(engine: FetchEngine, assets: list, resolver: CoinResolver, days: int, base_urls: dict = None) -> dict:
+    # Baixa as series de todos os ativos em paralelo (respeitando os limites de cada provedor)
+    base_urls = base_urls or {}
+    coingecko_url = base_urls.get("coingecko", COINGECKO_API_URL).rstrip("/")
+    yahoo_url = base_urls.get("yahoo", YAHOO_API_URL).rstrip("/")
+
+    def fetch(asset):
+        try:
+            if asset["type"] == "crypto":
+                coin_id = resolver.resolve(asset["symbol"])
+                if not coin_id:
+                    print(f"# {asset['symbol']} nao encontrado no mapeamento nem na lista do CoinGecko")
+                    return None
+                return download_crypto_series(engine, coin_id, days, coingecko_url)
+            return download_stock_series(engine, asset["symbol"], days, yahoo_url)
+        except (requests.exceptions.RequestException, KeyError, IndexError, ValueError) as e:
+            print(f"# Erro ao baixar historico de {asset['symbol']}: {e}")
+            return None
+
+    series = {}
+    for asset, data in zip(assets, engine.run_all([(fetch, (asset,)) for asset in assets])):
+        if data is not None and len(data[1]):
+            series[("crypto" if asset["type"] == "crypto" else "stock", asset["symbol"])] = data
+    return series
+
+
+def apply_overrides(assets: list, overrides: list) -> list:
+    # --set PETR4=42.5 troca o alert_price do ativo apenas nesta simulacao
+    prices = {}
+    for override in overrides or []:
+        symbol, _, value = override.partition("=")
+        prices[symbol.strip().upper()] = float(value)
+
+    changed = []
+    for asset in assets:
+        asset = dict(asset)
+        if asset["symbol"].upper() in prices:
+            asset["alert_price"] = prices[asset["symbol"].upper()]
+        changed.append(asset)
+    return changed
+
+
+def print_results(results: list, elapsed: float, total_ticks: int):
+    print("\n# RESULTADO DO BACKTEST")
+    print("=" * 90)
+    print(f"{'Ativo':<10} {'Regra':<42} {'Disparos':>10} {'Alertas':>8}  Primeiro alerta")
+    print("-" * 90)
+    for result in results:
+        first = result["first_alert"] or "-"
+        print(f"{result['symbol']:<10} {result['description'][:42]:<42} {result['ticks_fired']:>10} "
+              f"{result['alerts']:>8}  {first}")
+    print("=" * 90)
+    print(f"# {len(results)} regra(s), {total_ticks} preco(s) avaliados em {elapsed * 1000:.0f} ms")
+
+
+def save_results(results: list, path: str):
+    if path.lower().endswith(".csv"):
+        fields = ["symbol", "type", "rule", "rule_type", "description", "ticks", "ticks_fired",
+                  "alerts", "first_alert", "first_alert_price", "last_alert"]
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"# Resultado salvo em {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reaplica as regras de alerta sobre precos historicos")
+    parser.add_argument("--config", default="config.json", help="Arquivo de configuracao (padrao: config.json)")
+    parser.add_argument("--source", choices=("store", "download"), default="store",
+                        help="store: historico local (price_history); download: CoinGecko/Yahoo")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help=f"Dias de historico (padrao: {DEFAULT_DAYS})")
+    parser.add_argument("--set", action="append", metavar="SIMBOLO=PRECO",
+                        help="Simula outro alert_price para o ativo (pode repetir)")
+    parser.add_argument("--output", metavar="ARQUIVO", help="Salva o resultado em .json ou .csv")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    settings = config.get("settings", {})
+    assets = apply_overrides(config.get("assets", []), args.set)
+
+    if args.source == "store":
+        store = PriceStore(settings.get("price_history", {}))
+        series = load_from_store(store, assets, time.time() - args.days * 86400)
+    else:
+        engine = FetchEngine(settings)
+        base_urls = settings.get("api_base_urls", {})
+        resolver = CoinResolver(engine, settings.get("coin_resolver", {}), config.get("crypto_mapping", {}),
+                                base_urls.get("coingecko", COINGECKO_API_URL))
+        series = download_series(engine, assets, resolver, args.days, base_urls)
+        engine.close()
+
+    if not series:
+        print("# Nenhuma serie de precos disponivel para os ativos do config")
+        return
+
+    start = time.perf_counter()
+    results = BacktestEngine(assets).run(series)
+    elapsed = time.perf_counter() - start
+
+    print_results(results, elapsed, sum(len(prices) for _, prices in series.values()))
+    if args.output:
+        save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
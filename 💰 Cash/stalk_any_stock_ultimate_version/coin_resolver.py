@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "cache_file": "coin_list.json",
+    # Validade do cache da lista de moedas
+    "ttl_hours": 24,
+    # Sem cache e com a API fora do ar, espera isso antes de tentar baixar de novo
+    "retry_minutes": 10
+}
+
+
+class CoinResolver:
+    # Resolve o simbolo usado no config.json (ex.: "BTC") para o id do CoinGecko (ex.: "bitcoin").
+    # O crypto_mapping do config tem prioridade; o resto sai de um indice em memoria montado a
+    # partir da lista de moedas do CoinGecko, baixada uma vez e guardada em disco por ttl_hours
+
+    def __init__(self, engine, settings: dict = None, mapping: dict = None, base_url: str = COINGECKO_API_URL):
+        self.engine = engine
+        self.base_url = base_url.rstrip("/")
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.mapping = {symbol.upper(): coin_id for symbol, coin_id in (mapping or {}).items()}
+
+        self.by_symbol = {}
+        self.by_name = {}
+        self.ids = set()
+        self.valid_until = 0.0
+        self.lock = threading.Lock()
+
+    def resolve(self, symbol: str):
+        # Id do CoinGecko para o simbolo - RETORNA o id ou None
+        coin_id = self.mapping.get(symbol.upper())
+        if coin_id or not self.settings["enabled"]:
+            return coin_id
+
+        self.ensure_index()
+        key = symbol.strip().lower()
+        return self.by_symbol.get(key) or self.by_name.get(key) or (key if key in self.ids else None)
+
+    def ensure_index(self):
+        # Monta o indice na primeira consulta e renova quando o TTL vence
+        if time.time() < self.valid_until:
+            return
+
+        with self.lock:
+            # Outra thread pode ter carregado enquanto esta esperava
+            if time.time() < self.valid_until:
+                return
+
+            cache = self.load_cache()
+            if cache and time.time() - cache["downloaded_at"] < self.settings["ttl_hours"] * 3600:
+                self.build_index(cache)
+                return
+
+            downloaded = self.download()
+            if downloaded:
+                self.save_cache(downloaded)
+                self.build_index(downloaded)
+                return
+
+            # Sem lista nova: um cache vencido ainda e melhor do que nenhum
+            if cache and not self.ids:
+                print("# Usando lista de criptomoedas em cache (vencida)")
+                self.build_index(cache)
+            self.valid_until = time.time() + self.settings["retry_minutes"] * 60
+
+    def download(self):
+        # Lista completa de moedas + ids das maiores por valor de mercado (para desempatar
+        # simbolos repetidos) - RETORNA o conteudo do cache ou None
+        try:
+            response = self.engine.get("coingecko", self.base_url + "/coins/list")
+            if response.status_code != 200:
+                print(f"# Erro HTTP {response.status_code} ao baixar a lista de criptomoedas")
+                return None
+            coins = response.json()
+
+            ranked = []
+            response = self.engine.get("coingecko", self.base_url + "/coins/markets", params={
+                "vs_currency": "usd", "order": "market_cap_desc", "per_page": 250, "page": 1
+            })
+            if response.status_code == 200:
+                ranked = [coin["id"] for coin in response.json()]
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"# Erro ao baixar a lista de criptomoedas: {e}")
+            return None
+
+        print(f"# Lista de criptomoedas atualizada: {len(coins)} moedas")
+        return {
+            "downloaded_at": time.time(),
+            "coins": [[coin["id"], coin.get("symbol", ""), coin.get("name", "")] for coin in coins],
+            "ranked": ranked
+        }
+
+    def load_cache(self):
+        try:
+            with open(self.settings["cache_file"], 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if "coins" in cache and "downloaded_at" in cache else None
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save_cache(self, cache: dict):
+        path = self.settings["cache_file"]
+        try:
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"# Erro ao salvar cache da lista de criptomoedas: {e}")
+
+    def build_index(self, cache: dict):
+        # Simbolo e nome (minusculos) -> id; em simbolos repetidos vence a moeda de maior valor de
+        # mercado e, fora do ranking, o id mais curto (tokens "wrapped"/"bridged" tem ids longos)
+        rank = {coin_id: position for position, coin_id in enumerate(cache.get("ranked", []))}
+        unranked = len(rank)
+
+        def priority(coin_id):
+            return (rank.get(coin_id, unranked), len(coin_id), coin_id)
+
+        by_symbol, by_name = {}, {}
+        for coin_id, symbol, name in cache["coins"]:
+            for index, key in ((by_symbol, symbol.lower()), (by_name, name.lower())):
+                if not key:
+                    continue
+                current = index.get(key)
+                if current is None or priority(coin_id) < priority(current):
+                    index[key] = coin_id
+
+        # Troca as referencias de uma vez: leitores em outras threads nunca veem um indice pela metade
+        self.by_symbol, self.by_name = by_symbol, by_name
+        self.ids = {coin[0] for coin in cache["coins"]}
+        self.valid_until = cache["downloaded_at"] + self.settings["ttl_hours"] * 3600
@@ -0,0 +1,166 @@
+import datetime
+import json
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+import requests
+
+DEFAULT_SINKS = ["sound"]
+# Alertas que chegam dentro desta janela sao enviados juntos em uma unica notificacao
+DEFAULT_COALESCE_SECONDS = 2.0
+DEFAULT_NOTIFICATION_LOG = "notifications.log"
+
+# Marca de encerramento da fila
+_STOP = object()
+
+
+def format_alert(alert: dict) -> str:
+    # Linha de texto de um alerta (usada por log, email e webhook)
+    symbol = "R$" if alert["currency"] == "BRL" else "$"
+    text = f"{alert['symbol']} ({alert['name']}) a {symbol}{alert['current_price']:.2f}"
+    if alert.get("rule") and alert["rule"] != "alert_price":
+        text += f" [{alert['rule']}]"
+    return text
+
+
+class SoundSink:
+    # Toca o alerta sonoro uma vez por lote, por mais alertas que ele tenha
+
+    def __init__(self, play_function):
+        self.play_function = play_function
+
+    def send(self, alerts: list):
+        self.play_function()
+
+
+class LogSink:
+    # Acrescenta cada alerta a um arquivo de texto
+
+    def __init__(self, settings: dict):
+        self.path = settings.get("notification_log", DEFAULT_NOTIFICATION_LOG)
+
+    def send(self, alerts: list):
+        now = datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(f"{now} ALERTA {format_alert(alert)}\n")
+
+
+class EmailSink:
+    # Envia um email por lote via SMTP (settings.email: host, port, user, password, from, to, use_tls)
+
+    def __init__(self, settings: dict):
+        self.settings = settings.get("email", {})
+
+    def send(self, alerts: list):
+        message = EmailMessage()
+        message["Subject"] = f"{len(alerts)} alerta(s) de preco"
+        message["From"] = self.settings.get("from", self.settings.get("user", ""))
+        message["To"] = self.settings["to"]
+        message.set_content("\n".join(format_alert(alert) for alert in alerts))
+
+        with smtplib.SMTP(self.settings["host"], self.settings.get("port", 587), timeout=15) as smtp:
+            if self.settings.get("use_tls", True):
+                smtp.starttls()
+            if self.settings.get("user"):
+                smtp.login(self.settings["user"], self.settings.get("password", ""))
+            smtp.send_message(message)
+
+
+class WebhookSink:
+    # POST em JSON com a lista de alertas do lote (settings.webhook.url)
+
+    def __init__(self, settings: dict, session=None):
+        self.url = settings.get("webhook", {}).get("url")
+        self.session = session or requests.Session()
+
+    def send(self, alerts: list):
+        payload = {
+            "alerts": alerts,
+            "text": "\n".join(format_alert(alert) for alert in alerts)
+        }
+        response = self.session.post(self.url, data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                     headers={"Content-Type": "application/json"}, timeout=15)
+        response.raise_for_status()
+
+
+class AlertDispatcher:
+    # Fila de notificacoes atendida por uma thread propria: trigger_alert so enfileira e volta
+    # para a avaliacao dos precos; rajadas de alertas viram uma notificacao por destino
+
+    def __init__(self, sinks: dict, coalesce_seconds: float = DEFAULT_COALESCE_SECONDS):
+        self.sinks = sinks
+        self.coalesce_seconds = coalesce_seconds
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self.run, name="alert-dispatcher", daemon=True)
+        self.worker.start()
+
+    def dispatch(self, alert: dict):
+        # Nao bloqueia: a notificacao acontece na thread do dispatcher
+        self.queue.put(alert)
+
+    def run(self):
+        while True:
+            first = self.queue.get()
+            if first is _STOP:
+                return
+
+            # Junta o que chegar durante a janela de agrupamento
+            batch = [first]
+            stop = False
+            window_end = time.monotonic() + self.coalesce_seconds
+            while True:
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self.deliver(batch)
+            if stop:
+                return
+
+    def deliver(self, alerts: list):
+        # Uma falha em um destino nao impede os demais
+        for name, sink in self.sinks.items():
+            try:
+                sink.send(alerts)
+            except Exception as e:
+                print(f"# Erro ao notificar via {name}: {e}")
+
+    def close(self, timeout: float = 30):
+        # Entrega o que estiver na fila antes de encerrar
+        self.queue.put(_STOP)
+        self.worker.join(timeout)
+
+
+def create_dispatcher(settings: dict, play_function, session=None) -> AlertDispatcher:
+    # Monta o dispatcher a partir de settings.notifications
+    notifications = settings.get("notifications", {})
+    names = list(notifications.get("sinks", DEFAULT_SINKS))
+    if not settings.get("play_sound_alert", True) and "sound" in names:
+        names.remove("sound")
+
+    sinks = {}
+    for name in names:
+        if name == "sound":
+            sinks[name] = SoundSink(play_function)
+        elif name == "log":
+            sinks[name] = LogSink(notifications)
+        elif name == "email":
+            sinks[name] = EmailSink(notifications)
+        elif name == "webhook":
+            sinks[name] = WebhookSink(notifications, session)
+        else:
+            print(f"# Destino de notificacao desconhecido: {name}")
+
+    return AlertDispatcher(sinks, notifications.get("coalesce_seconds", DEFAULT_COALESCE_SECONDS))
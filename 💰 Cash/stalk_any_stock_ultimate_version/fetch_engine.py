@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Metrics
+from rate_limit import RETRY_STATUS, RateLimitGovernor, parse_retry_after
+
+# Requisicoes simultaneas por provedor (os demais esperam a vez)
+DEFAULT_PROVIDER_LIMITS = {
+    "coingecko": 4,
+    "yahoo": 8
+}
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_REQUEST_TIMEOUT = 15
+DEFAULT_POOL_SIZE = 32
+
+
+class FetchEngine:
+    # Executa as chamadas HTTP dos provedores em paralelo, com uma sessao keep-alive compartilhada,
+    # limite de concorrencia e de taxa por provedor e prazo (deadline) por requisicao e por ciclo
+
+    def __init__(self, settings: dict = None, metrics: Metrics = None):
+        settings = settings or {}
+        self.metrics = metrics or Metrics()
+        self.max_workers = settings.get("max_workers", DEFAULT_MAX_WORKERS)
+        self.request_timeout = settings.get("request_timeout_seconds", DEFAULT_REQUEST_TIMEOUT)
+
+        limits = dict(DEFAULT_PROVIDER_LIMITS)
+        limits.update(settings.get("provider_concurrency", {}))
+        self.semaphores = {provider: threading.BoundedSemaphore(limit) for provider, limit in limits.items()}
+
+        # Uma unica sessao reaproveita as conexoes TCP/TLS entre ciclos e entre threads
+        self.session = requests.Session()
+        pool_size = max(DEFAULT_POOL_SIZE, self.max_workers)
+        adapter = HTTPAdapter(pool_connections=len(limits) + 1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.governor = RateLimitGovernor(settings)
+        self._local = threading.local()
+
+        # Um unico pool para a vida do engine: as threads nao se acumulam entre ciclos
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+
+    def current_deadline(self):
+        # Deadline (time.monotonic) ativo na thread atual, ou None
+        return getattr(self._local, "deadline", None)
+
+    @contextmanager
+    def deadline(self, seconds):
+        # Define um prazo total para as chamadas feitas dentro do bloco (None = sem prazo)
+        previous = self.current_deadline()
+        self._local.deadline = time.monotonic() + seconds if seconds else previous
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+
+    def remaining(self, deadline=None):
+        # Segundos ate o deadline (None quando nao ha prazo)
+        deadline = deadline if deadline is not None else self.current_deadline()
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        # GET com novas tentativas em 429/5xx (Retry-After + backoff com jitter) enquanto houver prazo
+        attempt = 0
+        while True:
+            response = self.get_once(provider, url, **kwargs)
+            if response.status_code not in RETRY_STATUS or attempt >= self.governor.max_retries:
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            delay = self.governor.backoff_delay(attempt, retry_after)
+            remaining = self.remaining()
+            if remaining is not None and delay >= remaining:
+                return response
+
+            print(f"# {provider} respondeu HTTP {response.status_code}; nova tentativa em {delay:.1f}s")
+            if response.status_code == 429:
+                # Limite de taxa: o provedor inteiro pausa e os pedidos na fila esperam junto
+                self.governor.penalize(provider, delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def get_once(self, provider: str, url: str, **kwargs) -> requests.Response:
+        # GET respeitando os limites do provedor e o deadline; estouro de prazo vira requests Timeout
+        with self.metrics.timer("rate_limit_wait_seconds", provider=provider):
+            allowed = self.governor.acquire(provider, self.current_deadline())
+        if not allowed:
+            self.metrics.inc("provider_errors_total", provider=provider, type="rate_limit_deadline")
+            raise requests.exceptions.Timeout(f"limite de taxa de {provider} nao permite a chamada dentro do prazo")
+
+        timeout = self.request_timeout
+        remaining = self.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise requests.exceptions.Timeout(f"prazo do ciclo esgotado antes de chamar {provider}")
+            timeout = min(timeout, remaining)
+
+        semaphore = self.semaphores.get(provider)
+        if semaphore is None:
+            return self.timed_get(provider, url, timeout, **kwargs)
+
+        if not semaphore.acquire(timeout=timeout):
+            self.metrics.inc("provider_errors_total", provider=provider, type="queue_deadline")
+            raise requests.exceptions.Timeout(f"fila de {provider} excedeu o prazo")
+        try:
+            # O tempo na fila tambem conta para o prazo desta requisicao
+            remaining = self.remaining()
+            if remaining is not None:
+                timeout = min(timeout, max(remaining, 0.001))
+            return self.timed_get(provider, url, timeout, **kwargs)
+        finally:
+            semaphore.release()
+
+    def timed_get(self, provider: str, url: str, timeout: float, **kwargs) -> requests.Response:
+        # A requisicao em si, com latencia e erros por provedor nas metricas
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout:
+            self.metrics.inc("provider_errors_total", provider=provider, type="timeout")
+            raise
+        except requests.exceptions.ConnectionError:
+            self.metrics.inc("provider_errors_total", provider=provider, type="connection")
+            raise
+        except requests.exceptions.RequestException:
+            self.metrics.inc("provider_errors_total", provider=provider, type="request")
+            raise
+        finally:
+            self.metrics.observe("provider_request_seconds", time.perf_counter() - start, provider=provider)
+
+        self.metrics.inc("provider_requests_total", provider=provider, status=response.status_code)
+        if response.status_code != 200:
+            self.metrics.inc("provider_errors_total", provider=provider, type=f"http_{response.status_code}")
+        return response
+
+    def run_all(self, calls: list) -> list:
+        # Executa [(funcao, args), ...] em paralelo e devolve os resultados na mesma ordem;
+        # chamadas que nao terminarem ate o deadline do ciclo ficam como None
+        if not calls:
+            return []
+
+        deadline = self.current_deadline()
+        pending = deque(enumerate(calls))
+        results = [None] * len(calls)
+        finished = threading.Condition()
+        done = 0
+
+        def drain(worker=False):
+            # Tira chamadas da fila ate esvazia-la
+            nonlocal done
+            if worker:
+                self._local.worker = True
+            while True:
+                with finished:
+                    if not pending:
+                        return
+                    index, (function, args) = pending.popleft()
+
+                # As threads herdam o deadline de quem disparou as chamadas
+                previous = self.current_deadline()
+                self._local.deadline = deadline
+                try:
+                    remaining = self.remaining(deadline)
+                    if remaining is None or remaining > 0:
+                        results[index] = function(*args)
+                except Exception as error:
+                    print(f"# Erro em chamada paralela: {error}")
+                finally:
+                    self._local.deadline = previous
+                    with finished:
+                        done += 1
+                        finished.notify_all()
+
+        # Um run_all aninhado (dentro de uma thread do pool) tambem executa a propria fila,
+        # entao nunca fica esperando vaga no pool; o de fora so espera, para respeitar o deadline
+        nested = getattr(self._local, "worker", False)
+        for _ in range(min(len(calls) - nested, self.max_workers)):
+            self.executor.submit(drain, True)
+        if nested:
+            drain()
+
+        # Chamadas ainda em andamento no deadline nao sao abandonadas: o timeout de cada
+        # requisicao ja e limitado pelo prazo restante, entao elas terminam logo em seguida
+        with finished:
+            remaining = self.remaining(deadline)
+            finished.wait_for(lambda: done == len(calls), timeout=None if remaining is None else max(remaining, 0))
+            return list(results)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
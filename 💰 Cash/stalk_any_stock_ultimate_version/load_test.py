@@ -0,0 +1,351 @@
+import argparse
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from main import PriceAlertTracker
+
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_CYCLES = 3
+
+# Comportamento padrao dos provedores simulados
+DEFAULT_PROVIDER_OPTIONS = {
+    "latency_ms": 50,
+    "jitter_ms": 50,
+    # Fracao das requisicoes respondidas com HTTP 500
+    "error_rate": 0.0,
+    # Fracao das requisicoes respondidas com HTTP 429 + Retry-After
+    "throttle_rate": 0.0,
+    "retry_after": 1,
+    # Fracao das acoes que nao vem no spark (forca a busca individual no chart)
+    "missing_rate": 0.01
+}
+
+
+def base_price(symbol: str) -> float:
+    # Preco de referencia deterministico por simbolo (entre 1 e ~10.000)
+    return round(10 ** (zlib.crc32(symbol.encode()) % 4000 / 1000), 2)
+
+
+def simulated_price(symbol: str) -> float:
+    # Oscila +-5% em torno do preco de referencia ao longo de alguns minutos
+    phase = zlib.crc32(symbol.encode()) % 360
+    return round(base_price(symbol) * (1 + 0.05 * math.sin(time.time() / 60 + phase)), 4)
+
+
+def is_missing(symbol: str, missing_rate: float) -> bool:
+    # Sempre os mesmos simbolos ficam fora do spark (como tickers que o Yahoo nao agrega)
+    return zlib.crc32(symbol.encode()) % 10000 < missing_rate * 10000
+
+
+class ProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexoes maior: o tracker abre dezenas de conexoes simultaneas
+    request_queue_size = 256
+
+
+def make_handler(provider: str, options: dict, stats: dict, lock: threading.Lock):
+    # Handler do provedor simulado (CoinGecko ou Yahoo) com latencia, erros e 429 configuraveis
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, body, headers: dict = None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+            with lock:
+                stats["requests"] += 1
+                stats["status"][str(status)] = stats["status"].get(str(status), 0) + 1
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/_stats":
+                with lock:
+                    body = json.loads(json.dumps(stats))
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+            time.sleep((options["latency_ms"] + random.uniform(0, options["jitter_ms"])) / 1000)
+            if random.random() < options["throttle_rate"]:
+                self.send_json(429, {"error": "rate limited"}, {"Retry-After": str(options["retry_after"])})
+                return
+            if random.random() < options["error_rate"]:
+                self.send_json(500, {"error": "internal error"})
+                return
+
+            query = parse_qs(url.query)
+            if provider == "coingecko":
+                self.coingecko(url.path, query)
+            else:
+                self.yahoo(url.path, query)
+
+        def coingecko(self, path: str, query: dict):
+            if path.endswith("/simple/price"):
+                ids = query.get("ids", [""])[0].split(",")
+                self.send_json(200, {coin_id: {"brl": simulated_price(coin_id), "usd": simulated_price(coin_id) / 5}
+                                     for coin_id in ids if coin_id})
+            elif path.endswith("/coins/list"):
+                self.send_json(200, [])
+            elif path.endswith("/coins/markets"):
+                self.send_json(200, [])
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def yahoo(self, path: str, query: dict):
+            if path.endswith("/spark"):
+                symbols = query.get("symbols", [""])[0].split(",")
+                self.send_json(200, {symbol: {"symbol": symbol, "close": [simulated_price(symbol)]}
+                                     for symbol in symbols
+                                     if symbol and not is_missing(symbol, options["missing_rate"])})
+            elif "/chart/" in path:
+                symbol = path.rsplit("/", 1)[1]
+                self.send_json(200, {"chart": {"result": [
+                    {"meta": {"regularMarketPrice": simulated_price(symbol), "currency": "BRL"}}
+                ]}})
+            else:
+                self.send_json(404, {"error": "not found"})
+
+    return Handler
+
+
+def serve_providers(options: dict, ports):
+    # Processo separado: a CPU e a memoria dos servidores nao entram nas medicoes do tracker
+    servers = []
+    for provider in ("coingecko", "yahoo"):
+        stats = {"requests": 0, "status": {}}
+        server = ProviderServer(("127.0.0.1", 0), make_handler(provider, options, stats, threading.Lock()))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    ports.put([server.server_address[1] for server in servers])
+    threading.Event().wait()
+
+
+def start_providers(options: dict) -> tuple:
+    # Sobe os provedores simulados - RETORNA (processo, {provedor: url base})
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_providers, args=(options, ports), daemon=True)
+    process.start()
+    coingecko_port, yahoo_port = ports.get(timeout=30)
+    return process, {
+        "coingecko": f"http://127.0.0.1:{coingecko_port}",
+        "yahoo": f"http://127.0.0.1:{yahoo_port}"
+    }
+
+
+def provider_stats(urls: dict) -> dict:
+    stats = {}
+    for provider, url in urls.items():
+        with urllib.request.urlopen(url + "/_stats", timeout=10) as response:
+            stats[provider] = json.loads(response.read())
+    return stats
+
+
+def stats_delta(before: dict, after: dict) -> dict:
+    # Requisicoes e status recebidos por provedor entre duas leituras
+    delta = {}
+    for provider in after:
+        status = {code: count - before[provider]["status"].get(code, 0)
+                  for code, count in after[provider]["status"].items()}
+        delta[provider] = {
+            "requests": after[provider]["requests"] - before[provider]["requests"],
+            "status": {code: count for code, count in status.items() if count}
+        }
+    return delta
+
+
+def build_config(size: int, urls: dict, workdir: str, args) -> dict:
+    # Carteira sintetica: metade cripto (todas no crypto_mapping), metade acoes da B3
+    crypto_count = int(size * args.crypto_share)
+    rng = random.Random(size)
+    crypto_mapping = {}
+    assets = []
+
+    for i in range(size):
+        if i < crypto_count:
+            symbol = f"C{i:05d}"
+            coin_id = f"coin-{i:05d}"
+            crypto_mapping[symbol] = coin_id
+            reference = base_price(coin_id)
+            asset_type = "crypto"
+        else:
+            symbol = f"S{i:05d}"
+            reference = base_price(symbol + ".SA")
+            asset_type = "stock"
+        # Cerca de 10% dos ativos ja estao acima do alvo (exercita alertas, log e notificacoes)
+        assets.append({
+            "symbol": symbol,
+            "name": f"Ativo {i}",
+            "type": asset_type,
+            "alert_price": round(reference * rng.uniform(0.85, 1.6), 2),
+            "buy_price": round(reference * rng.uniform(0.5, 1.2), 2),
+            "buy_date": "2024-01-10"
+        })
+
+    settings = {
+        "api_base_urls": urls,
+        "play_sound_alert": False,
+        "cycle_deadline_seconds": args.deadline,
+        "alert_log_file": os.path.join(workdir, "alert_log.jsonl"),
+        "price_history": {"directory": os.path.join(workdir, "price_history")},
+        "coin_resolver": {"cache_file": os.path.join(workdir, "coin_list.json")},
+        "metrics": {"enabled": False, "snapshot_file": os.path.join(workdir, "metrics.json")}
+    }
+    if not args.keep_rate_limits:
+        # Limites de taxa reais transformariam o teste em espera; o que se mede aqui e o tracker
+        settings["rate_limits"] = {
+            "coingecko": {"per_minute": 1000000, "burst": 1000},
+            "yahoo": {"per_minute": 1000000, "burst": 1000}
+        }
+    return {"crypto_mapping": crypto_mapping, "assets": assets, "settings": settings}
+
+
+def run_size(size: int, urls: dict, args) -> dict:
+    # Sobe um tracker com a carteira sintetica e mede cada ciclo de check_alerts
+    workdir = tempfile.mkdtemp(prefix=f"load_test_{size}_")
+    config_file = os.path.join(workdir, "config.json")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(build_config(size, urls, workdir, args), f)
+
+    output = None if args.verbose else open(os.devnull, 'w')
+    if args.memory:
+        tracemalloc.start()
+
+    cycles = []
+    try:
+        with contextlib.redirect_stdout(output) if output else contextlib.nullcontext():
+            tracker = PriceAlertTracker(config_file)
+            try:
+                for _ in range(args.cycles):
+                    before = provider_stats(urls)
+                    start = time.perf_counter()
+                    alerts = tracker.check_alerts()
+                    elapsed = time.perf_counter() - start
+                    gauges = {name: value for (name, _), value in tracker.metrics.gauges.items()}
+                    cycles.append({
+                        "seconds": round(elapsed, 4),
+                        "successful": gauges.get("last_cycle_successful", 0),
+                        "alerts": len(alerts),
+                        "providers": stats_delta(before, provider_stats(urls))
+                    })
+            finally:
+                tracker.close()
+
+        memory = None
+        if args.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            memory = {"current_mb": round(current / 2 ** 20, 2), "peak_mb": round(peak / 2 ** 20, 2)}
+    finally:
+        if args.memory:
+            tracemalloc.stop()
+        if output:
+            output.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"assets": size, "cycles": cycles, "memory": memory}
+
+
+def print_results(results: list):
+    print("\n# RESULTADO DO TESTE DE CARGA")
+    print("=" * 100)
+    print(f"{'Ativos':>7} {'Ciclo medio':>12} {'Ciclo max':>10} {'Sucesso':>9} {'Alertas':>8} "
+          f"{'CoinGecko':>10} {'Yahoo':>7} {'429':>5} {'5xx':>5} {'Pico memoria':>13}")
+    print("-" * 100)
+    for result in results:
+        cycles = result["cycles"]
+        times = [cycle["seconds"] for cycle in cycles]
+
+        def requests_of(provider):
+            return sum(cycle["providers"][provider]["requests"] for cycle in cycles) / len(cycles)
+
+        def status_count(predicate):
+            return sum(count for cycle in cycles for provider in cycle["providers"].values()
+                       for code, count in provider["status"].items() if predicate(int(code)))
+
+        successful = min(cycle["successful"] for cycle in cycles)
+        memory = f"{result['memory']['peak_mb']:.1f} MB" if result["memory"] else "-"
+        print(f"{result['assets']:>7} {sum(times) / len(times):>11.3f}s {max(times):>9.3f}s "
+              f"{successful:>4}/{result['assets']:<4} {cycles[-1]['alerts']:>8} "
+              f"{requests_of('coingecko'):>10.1f} {requests_of('yahoo'):>7.1f} "
+              f"{status_count(lambda code: code == 429):>5} {status_count(lambda code: code >= 500):>5} {memory:>13}")
+    print("=" * 100)
+    print("# Requisicoes: media por ciclo; 429/5xx: total recebido; Sucesso: pior ciclo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do PriceAlertTracker com provedores simulados")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Tamanhos de carteira (padrao: 10 1000 10000)")
+    parser.add_argument("--cycles", type=int, default=DEFAULT_CYCLES, help=f"Ciclos por tamanho (padrao: {DEFAULT_CYCLES})")
+    parser.add_argument("--crypto-share", type=float, default=0.5, help="Fracao de criptos na carteira (padrao: 0.5)")
+    parser.add_argument("--deadline", type=float, default=30, help="cycle_deadline_seconds do tracker (padrao: 30)")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_PROVIDER_OPTIONS["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_PROVIDER_OPTIONS["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_PROVIDER_OPTIONS["error_rate"],
+                        help="Fracao de respostas HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=DEFAULT_PROVIDER_OPTIONS["throttle_rate"],
+                        help="Fracao de respostas HTTP 429")
+    parser.add_argument("--retry-after", type=int, default=DEFAULT_PROVIDER_OPTIONS["retry_after"],
+                        help="Retry-After (segundos) enviado com os 429")
+    parser.add_argument("--missing-rate", type=float, default=DEFAULT_PROVIDER_OPTIONS["missing_rate"],
+                        help="Fracao das acoes ausentes no spark")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Mantem os limites de taxa padrao do tracker (por padrao sao liberados)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="Nao mede memoria com tracemalloc (que deixa os ciclos mais lentos)")
+    parser.add_argument("--verbose", action="store_true", help="Mostra a saida do tracker")
+    parser.add_argument("--output", metavar="ARQUIVO", help="Salva o resultado completo em JSON")
+    args = parser.parse_args()
+
+    options = {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "error_rate": args.error_rate,
+        "throttle_rate": args.throttle_rate,
+        "retry_after": args.retry_after,
+        "missing_rate": args.missing_rate
+    }
+    process, urls = start_providers(options)
+    print(f"# Provedores simulados: CoinGecko em {urls['coingecko']}, Yahoo em {urls['yahoo']}")
+
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"# Testando {size} ativos ({args.cycles} ciclo(s))...")
+            results.append(run_size(size, urls, args))
+    finally:
+        process.terminate()
+
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"options": options, "results": results}, f, indent=2)
+        print(f"# Resultado salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,59 @@ import json
 import datetime
 import time
 import os
-import winsound
 from urllib.parse import quote
 
+try:
+    import winsound
+except ImportError:
+    # Fora do Windows o alerta sonoro vira uma mensagem no console
+    winsound = None
+from fetch_engine import FetchEngine
+from alert_log import AlertLog, DEFAULT_LOG_FILE
+from price_store import PriceStore
+from rules import AlertRuleEngine, describe_rule, LEGACY_RULE_ID
+from scheduler import AdaptiveScheduler
+from dispatch import create_dispatcher
+from metrics import DEFAULT_SETTINGS as DEFAULT_METRICS_SETTINGS, Metrics, start_metrics_server, timed
+from coin_resolver import CoinResolver
+
+# Limites de simbolos por requisicao nas chamadas em lote
+COINGECKO_BATCH_SIZE = 250
+YAHOO_BATCH_SIZE = 20
+
+# Prazo total (segundos) para buscar todas as cotacoes de um ciclo
+DEFAULT_CYCLE_DEADLINE = 30
+
+# Enderecos base das APIs (settings.api_base_urls troca por outro servidor, ex.: load_test.py)
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+YAHOO_API_URL = "https://query1.finance.yahoo.com/v8/finance"
+YAHOO_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
 class PriceAlertTracker:
     def __init__(self, config_file: str = "config.json"):
         self.config_file = config_file
         self.load_config()
+        base_urls = self.settings.get("api_base_urls", {})
+        self.coingecko_url = base_urls.get("coingecko", COINGECKO_API_URL).rstrip("/")
+        self.yahoo_url = base_urls.get("yahoo", YAHOO_API_URL).rstrip("/")
+        self.metrics = Metrics()
+        self.metrics_settings = dict(DEFAULT_METRICS_SETTINGS)
+        self.metrics_settings.update(self.settings.get("metrics", {}))
+        self.metrics_server = start_metrics_server(self.metrics, self.metrics_settings)
+        self.engine = FetchEngine(self.settings, self.metrics)
+        self.coin_resolver = CoinResolver(self.engine, self.settings.get("coin_resolver", {}), self.crypto_mapping,
+                                          self.coingecko_url)
+        self.prepare_coin_resolver()
+        self.rule_engine = AlertRuleEngine(self.assets)
+        self.dispatcher = create_dispatcher(self.settings, self.play_alert_sound, self.engine.session)
+        self.last_prices = {}
+        self.alert_log = AlertLog(self.settings.get("alert_log_file", DEFAULT_LOG_FILE))
+        
+        # Historico local de precos (settings.price_history.enabled = false desliga)
+        history_settings = self.settings.get("price_history", {})
+        self.price_store = PriceStore(history_settings) if history_settings.get("enabled", True) else None
         
     def load_config(self):
         # Carrega toda a configuracao do JSON
@@ -31,21 +77,33 @@ class PriceAlertTracker:
             print(f"# ERRO no JSON: {e}")
             raise
     
+    def prepare_coin_resolver(self):
+        # Criptos fora do crypto_mapping: carrega a lista do CoinGecko ja na inicializacao,
+        # fora do prazo do primeiro ciclo
+        unmapped = [asset["symbol"] for asset in self.assets
+                    if asset.get("type") == "crypto" and asset["symbol"].upper() not in self.coin_resolver.mapping]
+        if unmapped:
+            self.coin_resolver.ensure_index()
+            for symbol in unmapped:
+                coin_id = self.coin_resolver.resolve(symbol)
+                if coin_id:
+                    print(f"# {symbol} resolvido automaticamente para '{coin_id}'")
+    
+    @timed("price_fetch_seconds")
     def get_crypto_price(self, symbol: str) -> tuple:
         # Obtem preco de criptomoeda - RETORNA (preco, moeda)
         try:
-            coin_id = self.crypto_mapping.get(symbol.upper())
+            coin_id = self.coin_resolver.resolve(symbol)
             if not coin_id:
-                print(f"# {symbol} nao encontrado no mapeamento")
+                print(f"# {symbol} nao encontrado no mapeamento nem na lista do CoinGecko")
                 return 0, "USD"
             
-            url = "https://api.coingecko.com/api/v3/simple/price"
             params = {
                 "ids": coin_id,
                 "vs_currencies": "usd,brl"
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.engine.get("coingecko", self.coingecko_url + "/simple/price", params=params)
             
             if response.status_code != 200:
                 print(f"# Erro HTTP {response.status_code} na API")
@@ -53,18 +111,13 @@ class PriceAlertTracker:
                 
             data = response.json()
             
-            # Verifica qual moeda esta disponivel (prioriza BRL se disponivel)
             if coin_id in data:
-                price_data = data[coin_id]
-                if "brl" in price_data:
-                    price = price_data["brl"]
-                    currency = "BRL"
-                    print(f"   # Preco obtido: R${price:.2f}")
-                    return price, currency
-                elif "usd" in price_data:
-                    price = price_data["usd"]
-                    currency = "USD"
-                    print(f"   # Preco obtido: ${price:.2f}")
+                price, currency = self.parse_crypto_price(data[coin_id])
+                if price > 0:
+                    if currency == "BRL":
+                        print(f"   # Preco obtido: R${price:.2f}")
+                    else:
+                        print(f"   # Preco obtido: ${price:.2f}")
                     return price, currency
             
             print(f"# Dados invalidos da API para {symbol}")
@@ -80,22 +133,188 @@ class PriceAlertTracker:
             print(f"# Erro inesperado com {symbol}: {e}")
             return 0, "USD"
     
+    def parse_crypto_price(self, price_data: dict) -> tuple:
+        # Verifica qual moeda esta disponivel (prioriza BRL se disponivel) - RETORNA (preco, moeda)
+        if "brl" in price_data:
+            return price_data["brl"], "BRL"
+        if "usd" in price_data:
+            return price_data["usd"], "USD"
+        return 0, "USD"
+    
+    @timed("price_fetch_seconds")
+    def get_crypto_prices_batch(self, symbols: list) -> dict:
+        # Obtem precos de varias criptos com poucas chamadas - RETORNA {simbolo: (preco, moeda)}
+        prices = {}
+        ids_by_symbol = {}
+        
+        for symbol in symbols:
+            coin_id = self.coin_resolver.resolve(symbol)
+            if coin_id:
+                ids_by_symbol[symbol] = coin_id
+            else:
+                print(f"# {symbol} nao encontrado no mapeamento nem na lista do CoinGecko")
+                prices[symbol] = (0, "USD")
+        
+        coin_ids = sorted(set(ids_by_symbol.values()))
+        
+        # O simple/price aceita varios ids separados por virgula; os lotes saem em paralelo
+        chunks = [coin_ids[start:start + COINGECKO_BATCH_SIZE]
+                  for start in range(0, len(coin_ids), COINGECKO_BATCH_SIZE)]
+        data = {}
+        for chunk_data in self.engine.run_all([(self.fetch_crypto_chunk, (chunk,)) for chunk in chunks]):
+            data.update(chunk_data or {})
+        
+        # Mapeia cada id de volta para os simbolos que o usam
+        for symbol, coin_id in ids_by_symbol.items():
+            prices[symbol] = self.parse_crypto_price(data.get(coin_id, {}))
+        
+        if coin_ids:
+            print(f"# Criptos: {len(ids_by_symbol)} ativo(s) em {len(chunks)} requisicao(oes)")
+        return prices
+    
+    def fetch_crypto_chunk(self, coin_ids: list) -> dict:
+        # Uma chamada ao simple/price para um lote de ids - RETORNA a resposta da API ou {}
+        params = {
+            "ids": ",".join(coin_ids),
+            "vs_currencies": "usd,brl"
+        }
+        
+        try:
+            response = self.engine.get("coingecko", self.coingecko_url + "/simple/price", params=params)
+            if response.status_code != 200:
+                print(f"# Erro HTTP {response.status_code} na API (lote de {len(coin_ids)} criptos)")
+                return {}
+            return response.json()
+        except requests.exceptions.Timeout:
+            print(f"# Timeout ao buscar lote de {len(coin_ids)} criptos")
+        except requests.exceptions.ConnectionError:
+            print(f"# Erro de conexao ao buscar lote de {len(coin_ids)} criptos")
+        except ValueError as e:
+            print(f"# Resposta invalida da API no lote de criptos: {e}")
+        return {}
+    
+    def normalize_stock_symbol(self, symbol: str) -> str:
+        # Para acoes da B3, adicionamos .SA ao simbolo
+        clean_symbol = symbol.strip().upper()
+        if not clean_symbol.endswith('.SA'):
+            clean_symbol += '.SA'
+        return clean_symbol
+    
+    @timed("price_fetch_seconds")
+    def get_stock_prices_batch(self, symbols: list) -> dict:
+        # Obtem precos de varias acoes pelo endpoint spark do Yahoo - RETORNA {simbolo: (preco, moeda)}
+        symbols_by_ticker = {}
+        for symbol in symbols:
+            symbols_by_ticker.setdefault(self.normalize_stock_symbol(symbol), []).append(symbol)
+        
+        tickers = list(symbols_by_ticker)
+        chunks = [tickers[start:start + YAHOO_BATCH_SIZE]
+                  for start in range(0, len(tickers), YAHOO_BATCH_SIZE)]
+        found = {}
+        for chunk_prices in self.engine.run_all([(self.fetch_stock_chunk, (chunk,)) for chunk in chunks]):
+            found.update(chunk_prices or {})
+        
+        if tickers:
+            print(f"# Acoes: {len(found)}/{len(tickers)} em {len(chunks)} requisicao(oes) em lote")
+        
+        # Simbolos ausentes na resposta em lote: tenta o endpoint individual (tambem em paralelo)
+        missing = [ticker for ticker in tickers if ticker not in found]
+        for ticker in missing:
+            print(f"# {ticker} ausente no lote, buscando individualmente...")
+        fallback = self.engine.run_all([(self.get_stock_price, (ticker,)) for ticker in missing])
+        
+        prices = {}
+        for ticker, price in zip(missing, fallback):
+            prices[ticker] = price or (0, "BRL")
+        for ticker in found:
+            # Para acoes da B3, forcar BRL
+            prices[ticker] = (found[ticker], "BRL")
+        return {symbol: prices[ticker]
+                for ticker, original_symbols in symbols_by_ticker.items()
+                for symbol in original_symbols}
+    
+    def fetch_stock_chunk(self, tickers: list) -> dict:
+        # Uma chamada ao spark para um lote de tickers - RETORNA {ticker: preco}
+        params = {
+            "symbols": ",".join(tickers),
+            "range": "1d",
+            "interval": "1d"
+        }
+        
+        try:
+            response = self.engine.get("yahoo", self.yahoo_url + "/spark", params=params, headers=YAHOO_HEADERS)
+            if response.status_code != 200:
+                print(f"# Erro HTTP {response.status_code} no lote de {len(tickers)} acoes")
+                return {}
+            return self.parse_spark_response(response.json())
+        except requests.exceptions.Timeout:
+            print(f"# Timeout ao buscar lote de {len(tickers)} acoes")
+        except requests.exceptions.ConnectionError:
+            print(f"# Erro de conexao ao buscar lote de {len(tickers)} acoes")
+        except ValueError as e:
+            print(f"# Resposta invalida no lote de acoes: {e}")
+        return {}
+    
+    def parse_spark_response(self, data: dict) -> dict:
+        # Extrai {ticker: preco} da resposta do spark (aceita os dois formatos que o Yahoo devolve)
+        prices = {}
+        
+        if "spark" in data:
+            for result in data["spark"].get("result") or []:
+                for item in result.get("response") or []:
+                    price = item.get("meta", {}).get("regularMarketPrice")
+                    if price:
+                        prices[result["symbol"].upper()] = price
+            return prices
+        
+        for ticker, series in data.items():
+            if not isinstance(series, dict):
+                continue
+            closes = [close for close in series.get("close") or [] if close is not None]
+            if closes:
+                prices[ticker.upper()] = closes[-1]
+        return prices
+    
+    def get_prices_batch(self, assets: list) -> dict:
+        # Agrupa os ativos por tipo e busca cada grupo em lote - RETORNA {(tipo, simbolo): (preco, moeda)}
+        crypto_symbols = [asset["symbol"] for asset in assets if asset["type"] == "crypto"]
+        stock_symbols = [asset["symbol"] for asset in assets if asset["type"] != "crypto"]
+        
+        # Os dois provedores sao consultados ao mesmo tempo
+        crypto_prices, stock_prices = self.engine.run_all([
+            (self.get_crypto_prices_batch, (crypto_symbols,)),
+            (self.get_stock_prices_batch, (stock_symbols,))
+        ])
+        
+        prices = {}
+        for symbol in crypto_symbols:
+            prices[("crypto", symbol)] = (crypto_prices or {}).get(symbol, (0, "USD"))
+        for symbol in stock_symbols:
+            prices[("stock", symbol)] = (stock_prices or {}).get(symbol, (0, "BRL"))
+        return prices
+    
+    def get_prices_individually(self, assets: list) -> dict:
+        # Uma requisicao por ativo, todas em paralelo - RETORNA {(tipo, simbolo): (preco, moeda)}
+        results = self.engine.run_all([(self.get_current_price, (asset,)) for asset in assets])
+        
+        prices = {}
+        for asset, price in zip(assets, results):
+            default_currency = "USD" if asset["type"] == "crypto" else "BRL"
+            prices[self.price_key(asset)] = price or (0, default_currency)
+        return prices
+    
+    def price_key(self, asset: dict) -> tuple:
+        # Chave do ativo no resultado de get_prices_batch
+        return ("crypto" if asset["type"] == "crypto" else "stock", asset["symbol"])
+    
+    @timed("price_fetch_seconds")
     def get_stock_price(self, symbol: str) -> tuple:
         # Obtem preco de acao - RETORNA (preco, moeda)
         try:
-            # Para acoes da B3, adicionamos .SA ao simbolo
-            clean_symbol = symbol.strip().upper()
-            if not clean_symbol.endswith('.SA'):
-                clean_symbol += '.SA'
+            clean_symbol = self.normalize_stock_symbol(symbol)
             
             # Yahoo Finance API
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{clean_symbol}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
+            response = self.engine.get("yahoo", f"{self.yahoo_url}/chart/{clean_symbol}", headers=YAHOO_HEADERS)
             
             if response.status_code != 200:
                 print(f"# Erro HTTP {response.status_code} para {clean_symbol}")
@@ -144,36 +363,73 @@ class PriceAlertTracker:
         except:
             print("# Alerta sonoro!")
     
-    def check_alerts(self):
-        # Verifica todos os ativos em busca de alertas
+    def check_alerts(self, assets: list = None):
+        # Verifica os ativos informados (padrao: todos) em busca de alertas
+        assets = self.assets if assets is None else assets
+        cycle_start = time.perf_counter()
         print(f"\n# Verificando precos - {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
         print("=" * 60)
         
         alerts_triggered = []
         successful_checks = 0
         
-        for asset in self.assets:
+        # Todas as cotacoes sao buscadas em paralelo antes da avaliacao; o ciclo inteiro
+        # respeita o prazo de settings.cycle_deadline_seconds
+        with self.engine.deadline(self.settings.get("cycle_deadline_seconds", DEFAULT_CYCLE_DEADLINE)):
+            if self.settings.get("batch_requests", True):
+                # Uma chamada por grupo de ativos em vez de uma por ativo
+                prices = self.get_prices_batch(assets)
+            else:
+                prices = self.get_prices_individually(assets)
+        self.last_prices.update(prices)
+        
+        for asset in assets:
             print(f"\n# Verificando {asset['symbol']} ({asset['name']})...")
             
-            current_price, currency = self.get_current_price(asset)
+            current_price, currency = prices[self.price_key(asset)]
             
             if current_price > 0:
                 successful_checks += 1
+                if self.price_store:
+                    self.price_store.record(asset["type"], asset["symbol"], current_price, currency)
                 self.print_asset_status(asset, current_price, currency)
                 
-                if current_price >= asset["alert_price"]:
-                    alert_data = self.trigger_alert(asset, current_price, currency)
+                # Cada regra atendida pelo preco atual (alert_price e a lista "rules") gera um alerta
+                for rule, threshold in self.rule_engine.evaluate(asset, current_price):
+                    alert_data = self.trigger_alert(asset, current_price, currency, rule, threshold)
                     alerts_triggered.append(alert_data)
             else:
                 print(f"   # Nao foi possivel obter preco para {asset['symbol']}")
+                self.metrics.inc("price_failures_total", type=self.price_key(asset)[0])
         
-        print(f"\n# Resumo: {successful_checks}/{len(self.assets)} ativos verificados")
+        print(f"\n# Resumo: {successful_checks}/{len(assets)} ativos verificados")
+        self.record_cycle_metrics(time.perf_counter() - cycle_start, len(assets), successful_checks,
+                                  len(alerts_triggered))
         
         if alerts_triggered:
             self.save_alerts_to_log(alerts_triggered)
         
+        if self.price_store:
+            self.price_store.maybe_flush()
+        
         return alerts_triggered
     
+    def record_cycle_metrics(self, duration: float, checked: int, successful: int, alerts: int):
+        # Duracao e resultado do ciclo; o snapshot em JSON e regravado a cada ciclo
+        self.metrics.observe("cycle_seconds", duration)
+        self.metrics.set_gauge("last_cycle_seconds", round(duration, 4))
+        self.metrics.set_gauge("last_cycle_assets", checked)
+        self.metrics.set_gauge("last_cycle_successful", successful)
+        self.metrics.inc("cycles_total")
+        self.metrics.inc("alerts_triggered_total", alerts)
+        
+        snapshot_file = self.metrics_settings.get("snapshot_file")
+        if snapshot_file:
+            try:
+                self.metrics.write_snapshot(snapshot_file)
+            except OSError as e:
+                print(f"# Erro ao salvar metricas: {e}")
+    
     def get_current_price(self, asset: dict) -> tuple:
         # Obtem preco atual baseado no tipo do ativo - RETORNA (preco, moeda)
         if asset["type"] == "crypto":
@@ -183,6 +439,10 @@ class PriceAlertTracker:
     
     def print_asset_status(self, asset: dict, current_price: float, currency: str):
         # Mostra status do ativo com a moeda correta
+        if "alert_price" not in asset:
+            self.print_rules_status(asset, current_price, currency)
+            return
+        
         status = "# ALERTA ATINGIDO!" if current_price >= asset["alert_price"] else "# Aguardando..."
         print(f"   {status}")
         
@@ -209,63 +469,58 @@ class PriceAlertTracker:
             else:
                 print(f"   # Acima do alvo por ${profit:.2f}")
     
-    def trigger_alert(self, asset: dict, current_price: float, currency: str) -> dict:
-        # Dispara alerta para um ativo
+    def print_rules_status(self, asset: dict, current_price: float, currency: str):
+        # Status de ativos configurados so com a lista "rules"
+        if currency == "BRL":
+            print(f"   Preco atual: R${current_price:.2f}")
+        else:
+            print(f"   Preco atual: ${current_price:.2f} ({currency})")
+        
+        distance = self.rule_engine.nearest_distance(asset, current_price)
+        rule_count = self.rule_engine.rule_count(asset)
+        if distance is None:
+            print(f"   Regras: {rule_count}")
+        else:
+            print(f"   Regras: {rule_count} (limite mais proximo a {distance * 100:.1f}%)")
+    
+    def trigger_alert(self, asset: dict, current_price: float, currency: str,
+                      rule: dict = None, threshold: float = None) -> dict:
+        # Dispara alerta para um ativo (rule = regra atendida; sem regra, vale o alert_price)
+        if rule is None:
+            rule = {"id": LEGACY_RULE_ID, "type": "above", "price": asset["alert_price"]}
+            threshold = asset["alert_price"]
+        
         if currency == "BRL":
             alert_msg = f"# ALERTA! {asset['symbol']} atingiu R${current_price:.2f}"
         else:
             alert_msg = f"# ALERTA! {asset['symbol']} atingiu ${current_price:.2f} ({currency})"
+        if rule["id"] != LEGACY_RULE_ID:
+            alert_msg += f" - {describe_rule(rule, threshold)}"
         
         print(f"   # {alert_msg}")
         
-        if self.settings.get("play_sound_alert", True):
-            self.play_alert_sound()
-        
-        return {
+        alert_data = {
             "symbol": asset["symbol"],
             "name": asset["name"],
             "type": asset["type"],
             "current_price": current_price,
             "currency": currency,
-            "alert_price": asset["alert_price"],
+            "alert_price": threshold,
+            "rule": rule["id"],
+            "rule_type": rule["type"],
             "timestamp": datetime.datetime.now().isoformat(),
             "buy_date": asset.get("buy_date", ""),
             "buy_price": asset.get("buy_price", 0)
         }
+        
+        # Som, email, webhook etc. rodam na thread do dispatcher; a verificacao segue sem esperar
+        self.dispatcher.dispatch(alert_data)
+        return alert_data
     
     def save_alerts_to_log(self, alerts: list):
-        # Salva alertas no arquivo de log
-        log_file = "alert_log.json"
-        
+        # Salva alertas no log append-only (apenas 1 por ativo, regra e dia)
         try:
-            # Carrega alertas existentes
-            if os.path.exists(log_file):
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    existing_alerts = json.load(f)
-            else:
-                existing_alerts = []
-            
-            # Adiciona apenas alertas novos do dia
-            today = datetime.datetime.now().strftime('%Y-%m-%d')
-            new_alerts = 0
-            
-            for alert in alerts:
-                alert_date = alert["timestamp"][:10]
-                
-                # Verifica se ja existe alerta igual hoje
-                existing_today = any(
-                    a["symbol"] == alert["symbol"] and a["timestamp"][:10] == alert_date
-                    for a in existing_alerts
-                )
-                
-                if not existing_today:
-                    existing_alerts.append(alert)
-                    new_alerts += 1
-            
-            # Salva arquivo atualizado
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_alerts, f, indent=2, ensure_ascii=False)
-            
+            new_alerts = self.alert_log.append(alerts)
             print(f"# {new_alerts} novo(s) alerta(s) salvos no log")
             
         except Exception as e:
@@ -276,6 +531,11 @@ class PriceAlertTracker:
         print("\n# Iniciando monitoramento continuo...")
         print("# Pressione Ctrl+C para parar")
         
+        scheduler_settings = self.settings.get("scheduler", {})
+        if scheduler_settings.get("enabled", True):
+            self.run_adaptive_monitoring(scheduler_settings)
+            return
+        
         try:
             while True:
                 self.check_alerts()
@@ -288,6 +548,52 @@ class PriceAlertTracker:
                 
         except KeyboardInterrupt:
             print("\n# Monitoramento parado pelo usuario")
+    
+    def run_adaptive_monitoring(self, scheduler_settings: dict):
+        # Cada ativo tem seu proprio horario de verificacao (volatilidade, distancia aos limites e pregao)
+        scheduler = AdaptiveScheduler(scheduler_settings, self.settings.get("check_interval_minutes", 60),
+                                      self.rule_engine)
+        now = time.time()
+        if self.price_store:
+            # O historico local ja permite estimar a volatilidade no primeiro ciclo
+            for asset in self.assets:
+                timestamps, prices = self.price_store.load(asset["type"], asset["symbol"], start=now - 86400)
+                scheduler.seed_history(asset, timestamps[-scheduler.settings["history_size"]:],
+                                       prices[-scheduler.settings["history_size"]:])
+        scheduler.add_assets(self.assets, now)
+        
+        try:
+            while True:
+                due = scheduler.pop_due(time.time())
+                if due:
+                    self.check_alerts(due)
+                    checked_at = time.time()
+                    for asset in due:
+                        price, _ = self.last_prices.get(self.price_key(asset), (0, ""))
+                        scheduler.reschedule(asset, price, checked_at)
+                
+                next_due = scheduler.next_due_time()
+                if next_due is None:
+                    # Agenda vazia (config sem ativos): nao ha o que monitorar
+                    print("\n# Nenhum ativo para monitorar")
+                    return
+                next_check = datetime.datetime.fromtimestamp(next_due)
+                print(f"\n# Proxima verificacao: {next_check.strftime('%d/%m %H:%M:%S')} "
+                      f"({len(due)} ativo(s) verificados agora)")
+                print("-" * 50)
+                time.sleep(max(next_due - time.time(), 0))
+                
+        except KeyboardInterrupt:
+            print("\n# Monitoramento parado pelo usuario")
+    
+    def close(self):
+        # Entrega as notificacoes pendentes, grava o que ainda estiver em buffer e fecha as conexoes
+        self.dispatcher.close()
+        if self.metrics_server:
+            self.metrics_server.close()
+        if self.price_store:
+            self.price_store.close()
+        self.engine.close()
 
 def main():
     print("# SISTEMA DE ALERTAS DE PRECOS")
@@ -304,11 +610,14 @@ def main():
         print(f"\n# Nenhum alerta disparado")
     
     # Monitoramento continuo
-    response = input("\n# Iniciar monitoramento continuo? (s/n): ").strip().lower()
-    if response in ['s', 'sim', 'y', 'yes']:
-        tracker.run_continuous_monitoring()
-    else:
-        print("# Execucao unica concluida")
+    try:
+        response = input("\n# Iniciar monitoramento continuo? (s/n): ").strip().lower()
+        if response in ['s', 'sim', 'y', 'yes']:
+            tracker.run_continuous_monitoring()
+        else:
+            print("# Execucao unica concluida")
+    finally:
+        tracker.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,205 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites (segundos) dos buckets dos histogramas de latencia
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60)
+
+# Endpoint HTTP e snapshot em arquivo sao opcionais (desligados por padrao)
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "host": "127.0.0.1",
+    "port": 9108,
+    "snapshot_file": None
+}
+
+
+class Histogram:
+    # Contagem por bucket (nao cumulativa internamente), soma e total de observacoes
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float):
+        # Estimativa pelo limite superior do bucket que contem o quantil
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {str(limit): count for limit, count in zip(self.buckets + ("+Inf",), self.counts)}
+        }
+
+
+class Metrics:
+    # Registro de histogramas, contadores e gauges identificados por (nome, rotulos)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started_at = time.time()
+
+    def key(self, name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted((labels or {}).items())))
+
+    def observe(self, name: str, value: float, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self.lock:
+            self.gauges[self.key(name, labels)] = value
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        # Mede a duracao do bloco em um histograma
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        # Estado atual em formato JSON
+        def entries(items, render):
+            return [{"name": name, "labels": dict(labels), **render(value)}
+                    for (name, labels), value in sorted(items.items())]
+
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "histograms": entries(self.histograms, lambda h: h.to_dict()),
+                "counters": entries(self.counters, lambda v: {"value": v}),
+                "gauges": entries(self.gauges, lambda v: {"value": v})
+            }
+
+    def to_prometheus(self) -> str:
+        # Formato texto do Prometheus (histogramas com buckets cumulativos)
+        def render_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{name}{render_labels(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                lines.append(f"{name}{render_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for limit, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{render_labels(labels, [('le', limit)])} {cumulative}")
+                lines.append(f"{name}_sum{render_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str):
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+
+def timed(name: str):
+    # Decorador de metodos: registra a duracao de cada chamada em self.metrics
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(name, function=function.__name__):
+                return function(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsServer:
+    # Endpoint local: /metrics (Prometheus) e /metrics.json
+
+    def __init__(self, metrics: Metrics, host: str, port: int):
+        metrics_ref = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(metrics_ref.snapshot(), indent=2).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = metrics_ref.to_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_metrics_server(metrics: Metrics, settings: dict):
+    # Sobe o endpoint se habilitado; porta ocupada so gera um aviso - RETORNA o servidor ou None
+    if not settings.get("enabled", DEFAULT_SETTINGS["enabled"]):
+        return None
+    try:
+        server = MetricsServer(metrics, settings.get("host", DEFAULT_SETTINGS["host"]),
+                               settings.get("port", DEFAULT_SETTINGS["port"]))
+    except OSError as e:
+        print(f"# Endpoint de metricas indisponivel: {e}")
+        return None
+    print(f"# Metricas em {server.address}/metrics")
+    return server
@@ -0,0 +1,248 @@
+import argparse
+import datetime
+import json
+import time
+
+import numpy as np
+
+from backtest import iso, load_from_store
+from price_store import PriceStore
+
+# Minimo de dias com retorno nos dois ativos para calcular a correlacao do par
+DEFAULT_MIN_OVERLAP = 20
+DEFAULT_TOP_PAIRS = 10
+
+
+def parse_buy_date(value: str):
+    # "2024-01-10" -> timestamp Unix (meia-noite local), ou None se ausente/invalido
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").timestamp()
+    except ValueError:
+        print(f"# buy_date invalido ignorado: {value}")
+        return None
+
+
+class PortfolioAnalyzer:
+    # Metricas da carteira sobre o historico local: as series viram uma matriz ativos x dias
+    # (ultimo preco de cada dia) e cada metrica e calculada para todos os ativos de uma vez
+
+    def __init__(self, assets: list, series: dict):
+        self.utc_offset = time.localtime().tm_gmtoff
+        # So entram ativos com historico gravado
+        self.assets = [asset for asset in assets if self.asset_key(asset) in series]
+        self.series = series
+
+        count = len(self.assets)
+        self.buy_prices = np.array([float(asset.get("buy_price") or np.nan) for asset in self.assets])
+        self.quantities = np.array([float(asset.get("quantity", 1)) for asset in self.assets])
+        buy_dates = [parse_buy_date(asset.get("buy_date")) for asset in self.assets]
+        self.buy_times = np.array([np.nan if value is None else value for value in buy_dates])
+
+        # Preco e horario mais recentes de cada ativo (observacao original, nao o fechamento diario)
+        self.last_prices = np.empty(count)
+        self.last_times = np.empty(count)
+        for row, asset in enumerate(self.assets):
+            timestamps, prices = series[self.asset_key(asset)]
+            self.last_prices[row] = prices[-1]
+            self.last_times[row] = timestamps[-1]
+
+        self.days, self.closes, self.observed = self.daily_matrix()
+
+    def asset_key(self, asset: dict) -> tuple:
+        return ("crypto" if asset["type"] == "crypto" else "stock", asset["symbol"])
+
+    def daily_matrix(self) -> tuple:
+        # Matriz ativos x dias com o ultimo preco de cada dia; dias sem negociacao repetem o anterior
+        day_series = []
+        for asset in self.assets:
+            timestamps, prices = self.series[self.asset_key(asset)]
+            days = ((timestamps + self.utc_offset) // 86400).astype(np.int64)
+            # Serie cronologica: o ultimo preco do dia e onde o dia seguinte muda
+            last_of_day = np.ones(len(days), dtype=bool)
+            last_of_day[:-1] = days[1:] != days[:-1]
+            day_series.append((days[last_of_day], prices[last_of_day]))
+
+        first_day = min(days[0] for days, _ in day_series)
+        last_day = max(days[-1] for days, _ in day_series)
+        width = int(last_day - first_day) + 1
+
+        closes = np.full((len(self.assets), width), np.nan)
+        for row, (days, prices) in enumerate(day_series):
+            closes[row, days - first_day] = prices
+        observed = ~np.isnan(closes)
+
+        # Forward fill vetorizado: cada coluna aponta para a ultima coluna com preco da linha
+        last_seen = np.where(observed, np.arange(width), 0)
+        np.maximum.accumulate(last_seen, axis=1, out=last_seen)
+        filled = closes[np.arange(len(self.assets))[:, None], last_seen]
+        # Antes da primeira observacao nao ha preco a repetir
+        filled[np.cumsum(observed, axis=1) == 0] = np.nan
+
+        return np.arange(first_day, last_day + 1), filled, observed
+
+    def unrealized_pnl(self) -> tuple:
+        # (variacao percentual, resultado em moeda) desde o buy_price - NaN sem buy_price
+        pct = (self.last_prices / self.buy_prices - 1) * 100
+        value = (self.last_prices - self.buy_prices) * self.quantities
+        return pct, value
+
+    def cagr(self) -> np.ndarray:
+        # Retorno anualizado desde buy_date; menos de um dia de posicao nao e anualizado
+        years = (self.last_times - self.buy_times) / (365.25 * 86400)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = ((self.last_prices / self.buy_prices) ** (1 / years) - 1) * 100
+        result[~(years >= 1 / 365.25)] = np.nan
+        return result
+
+    def max_drawdown(self) -> np.ndarray:
+        # Maior queda (%) desde um pico, contando a partir do buy_date; o pico parte do buy_price
+        # (como no trailing stop). Calculado sobre os fechamentos diarios
+        prices = self.closes.copy()
+        day_start = self.days * 86400 - self.utc_offset
+        before_buy = day_start[None, :] + 86400 <= np.nan_to_num(self.buy_times, nan=-np.inf)[:, None]
+        prices[before_buy] = np.nan
+
+        # fmax ignora NaN: o pico so avanca nos dias com preco
+        peaks = np.fmax.accumulate(np.fmax(prices, self.buy_prices[:, None]), axis=1)
+        with np.errstate(invalid="ignore"):
+            drawdown = (prices / peaks - 1) * 100
+        return 0.0 - np.fmin.reduce(drawdown, axis=1, initial=0.0)
+
+    def correlation(self, min_overlap: int = DEFAULT_MIN_OVERLAP) -> np.ndarray:
+        # Correlacao de Pearson dos retornos logaritmicos diarios, par a par, so nos dias em que
+        # os dois ativos tem retorno (acoes nao negociam no fim de semana, cripto sim).
+        # As somas de todos os pares saem de produtos de matrizes, sem laco sobre os pares
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.diff(np.log(self.closes), axis=1)
+        # Retorno so existe em dia com negociacao e com preco anterior conhecido
+        valid = self.observed[:, 1:] & ~np.isnan(returns)
+        mask = valid.astype(np.float64)
+        values = np.where(valid, returns, 0.0)
+
+        overlap = mask @ mask.T
+        sum_x = values @ mask.T
+        sum_xx = (values ** 2) @ mask.T
+        sum_xy = values @ values.T
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = sum_xy - sum_x * sum_x.T / overlap
+            variance_x = sum_xx - sum_x ** 2 / overlap
+            variance_y = variance_x.T
+            result = covariance / np.sqrt(variance_x * variance_y)
+        result[overlap < min_overlap] = np.nan
+        return np.clip(result, -1, 1)
+
+    def report(self, min_overlap: int = DEFAULT_MIN_OVERLAP, top: int = DEFAULT_TOP_PAIRS) -> dict:
+        pct, value = self.unrealized_pnl()
+        cagr = self.cagr()
+        drawdown = self.max_drawdown()
+        correlation = self.correlation(min_overlap)
+
+        def number(x):
+            return None if np.isnan(x) else round(float(x), 4)
+
+        positions = []
+        for row, asset in enumerate(self.assets):
+            positions.append({
+                "symbol": asset["symbol"],
+                "type": asset["type"],
+                "buy_price": number(self.buy_prices[row]),
+                "buy_date": asset.get("buy_date", ""),
+                "quantity": float(self.quantities[row]),
+                "last_price": number(self.last_prices[row]),
+                "last_update": iso(self.last_times[row]),
+                "pnl_pct": number(pct[row]),
+                "pnl": number(value[row]),
+                "cagr_pct": number(cagr[row]),
+                "max_drawdown_pct": number(drawdown[row])
+            })
+
+        symbols = [asset["symbol"] for asset in self.assets]
+        return {
+            "positions": positions,
+            "top_pairs": top_pairs(symbols, correlation, top),
+            "symbols": symbols,
+            "correlation": to_json_matrix(correlation)
+        }
+
+
+def to_json_matrix(matrix: np.ndarray) -> list:
+    # Matriz arredondada com None no lugar de NaN (JSON valido), sem laco por elemento
+    rounded = np.round(matrix, 4).astype(object)
+    rounded[np.isnan(matrix)] = None
+    return rounded.tolist()
+
+
+def top_pairs(symbols: list, matrix: np.ndarray, count: int) -> list:
+    # Pares mais correlacionados (em modulo) - RETORNA [[simbolo, simbolo, correlacao], ...]
+    rows, cols = np.triu_indices(len(symbols), k=1)
+    values = matrix[rows, cols]
+    keep = ~np.isnan(values)
+    rows, cols, values = rows[keep], cols[keep], values[keep]
+    order = np.argsort(-np.abs(values))[:count]
+    return [[symbols[rows[i]], symbols[cols[i]], round(float(values[i]), 4)] for i in order]
+
+
+def print_report(report: dict, elapsed: float):
+    def fmt(value, suffix="", signed=False):
+        if value is None:
+            return "-"
+        return f"{value:+.2f}{suffix}" if signed else f"{value:.2f}{suffix}"
+
+    print("\n# CARTEIRA")
+    print("=" * 96)
+    print(f"{'Ativo':<10} {'Compra':>12} {'Atual':>12} {'P&L %':>9} {'P&L':>14} {'CAGR':>9} {'Max DD':>8}  Atualizado")
+    print("-" * 96)
+    for position in report["positions"]:
+        print(f"{position['symbol']:<10} {fmt(position['buy_price']):>12} {fmt(position['last_price']):>12} "
+              f"{fmt(position['pnl_pct'], '%', True):>9} {fmt(position['pnl'], '', True):>14} "
+              f"{fmt(position['cagr_pct'], '%', True):>9} {fmt(position['max_drawdown_pct'], '%'):>8}  "
+              f"{position['last_update'][:16]}")
+    print("=" * 96)
+
+    if report["top_pairs"]:
+        print("\n# Pares mais correlacionados (retornos diarios)")
+        for first, second, value in report["top_pairs"]:
+            print(f"   {first:<10} x {second:<10} {value:+.2f}")
+
+    print(f"\n# {len(report['positions'])} posicao(oes) analisadas em {elapsed * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatorio da carteira a partir do historico local de precos")
+    parser.add_argument("--config", default="config.json", help="Arquivo de configuracao (padrao: config.json)")
+    parser.add_argument("--days", type=int, help="Usa apenas os ultimos N dias do historico")
+    parser.add_argument("--min-overlap", type=int, default=DEFAULT_MIN_OVERLAP,
+                        help=f"Dias em comum para correlacionar um par (padrao: {DEFAULT_MIN_OVERLAP})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_PAIRS,
+                        help=f"Pares correlacionados exibidos (padrao: {DEFAULT_TOP_PAIRS})")
+    parser.add_argument("--output", metavar="ARQUIVO", help="Salva o relatorio completo (com a matriz) em JSON")
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    settings = config.get("settings", {})
+    assets = config.get("assets", [])
+
+    store = PriceStore(settings.get("price_history", {}))
+    start = time.time() - args.days * 86400 if args.days else 0
+    series = load_from_store(store, assets, start)
+    if not series:
+        print("# Nenhum historico de precos para os ativos do config (rode o monitoramento primeiro)")
+        return
+
+    started = time.perf_counter()
+    report = PortfolioAnalyzer(assets, series).report(args.min_overlap, args.top)
+    elapsed = time.perf_counter() - started
+
+    print_report(report, elapsed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"# Relatorio salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import json
+import os
+import re
+import time
+from array import array
+
+DEFAULT_DIRECTORY = "price_history"
+META_FILE = "meta.json"
+
+# Cada observacao ocupa 16 bytes no disco: (timestamp, preco) como dois float64
+RECORD_SIZE = array('d').itemsize * 2
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "directory": DEFAULT_DIRECTORY,
+    # Observacoes mais antigas que isso sao apagadas
+    "retention_days": 365,
+    # Depois desse prazo, fica so o ultimo preco de cada intervalo de downsample_minutes
+    "downsample_after_days": 7,
+    "downsample_minutes": 60,
+    # Grava no disco quando o buffer atinge flush_every observacoes ou a cada flush_interval_seconds
+    "flush_every": 500,
+    "flush_interval_seconds": 300,
+    "compact_interval_hours": 24
+}
+
+
+class PriceStore:
+    # Serie temporal local de todos os precos buscados: um arquivo binario por ativo com
+    # pares (timestamp, preco) em float64, acrescentados em lote a partir de um buffer em memoria
+
+    def __init__(self, settings: dict = None):
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.directory = self.settings["directory"]
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.meta = self.load_meta()
+        self.buffers = {}
+        self.buffered = 0
+        self.last_flush = time.time()
+
+    def load_meta(self) -> dict:
+        # Metadados: moeda e arquivo de cada serie e a data da ultima compactacao
+        try:
+            with open(os.path.join(self.directory, META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"series": {}, "last_compaction": 0}
+
+    def save_meta(self):
+        path = os.path.join(self.directory, META_FILE)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def series_key(self, asset_type: str, symbol: str) -> str:
+        return f"{'crypto' if asset_type == 'crypto' else 'stock'}:{symbol.strip().upper()}"
+
+    def series_path(self, key: str) -> str:
+        file_name = re.sub(r'[^A-Za-z0-9_.-]', '_', key.replace(':', '_')) + ".bin"
+        return os.path.join(self.directory, file_name)
+
+    def record(self, asset_type: str, symbol: str, price: float, currency: str, timestamp: float = None):
+        # Registra uma observacao no buffer (barato: nenhum acesso a disco)
+        key = self.series_key(asset_type, symbol)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = array('d')
+            if key not in self.meta["series"]:
+                self.meta["series"][key] = {"type": key.split(':')[0], "symbol": symbol.strip().upper(),
+                                            "currency": currency, "file": os.path.basename(self.series_path(key))}
+        buffer.append(timestamp if timestamp is not None else time.time())
+        buffer.append(price)
+        self.meta["series"][key]["currency"] = currency
+        self.buffered += 1
+
+    def maybe_flush(self):
+        # Grava o buffer quando ele cresce ou envelhece; compacta as series uma vez por intervalo
+        interval_elapsed = time.time() - self.last_flush >= self.settings["flush_interval_seconds"]
+        if self.buffered >= self.settings["flush_every"] or (self.buffered and interval_elapsed):
+            self.flush()
+
+        hours_since_compaction = (time.time() - self.meta.get("last_compaction", 0)) / 3600
+        if hours_since_compaction >= self.settings["compact_interval_hours"]:
+            self.compact()
+
+    def flush(self):
+        # Acrescenta o buffer de cada serie ao final do seu arquivo
+        for key, buffer in self.buffers.items():
+            if buffer:
+                with open(self.series_path(key), 'ab') as f:
+                    buffer.tofile(f)
+        if self.buffers:
+            self.save_meta()
+        self.buffers = {}
+        self.buffered = 0
+        self.last_flush = time.time()
+
+    def read_series(self, key: str) -> array:
+        # Conteudo de uma serie (disco + buffer) como array intercalado [t0, p0, t1, p1, ...]
+        data = array('d')
+        path = self.series_path(key)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                raw = f.read()
+            # Ignora um registro incompleto no final (gravacao interrompida)
+            data.frombytes(raw[:len(raw) - len(raw) % RECORD_SIZE])
+        data.extend(self.buffers.get(key, ()))
+        return data
+
+    def load(self, asset_type: str, symbol: str, start: float = None, end: float = None) -> tuple:
+        # Serie de um ativo entre start e end (timestamps Unix) - RETORNA (timestamps, precos)
+        data = self.read_series(self.series_key(asset_type, symbol))
+        timestamps, prices = data[0::2], data[1::2]
+
+        if start is None and end is None:
+            return timestamps, prices
+
+        selected_times, selected_prices = array('d'), array('d')
+        for timestamp, price in zip(timestamps, prices):
+            if (start is None or timestamp >= start) and (end is None or timestamp <= end):
+                selected_times.append(timestamp)
+                selected_prices.append(price)
+        return selected_times, selected_prices
+
+    def series(self) -> dict:
+        # {chave: metadados} de todas as series gravadas
+        return dict(self.meta["series"])
+
+    def compact(self):
+        # Aplica retencao e downsampling reescrevendo cada serie de forma atomica
+        self.flush()
+        now = time.time()
+        retention_cutoff = now - self.settings["retention_days"] * 86400
+        downsample_cutoff = now - self.settings["downsample_after_days"] * 86400
+        bucket_seconds = self.settings["downsample_minutes"] * 60
+        removed = 0
+
+        for key in list(self.meta["series"]):
+            data = self.read_series(key)
+            compacted = array('d')
+            last_bucket = None
+
+            for i in range(0, len(data), 2):
+                timestamp, price = data[i], data[i + 1]
+                if timestamp < retention_cutoff:
+                    continue
+                if timestamp < downsample_cutoff:
+                    # Dados antigos: so o ultimo preco de cada intervalo
+                    bucket = int(timestamp // bucket_seconds)
+                    if bucket == last_bucket:
+                        compacted[-2] = timestamp
+                        compacted[-1] = price
+                        continue
+                    last_bucket = bucket
+                compacted.append(timestamp)
+                compacted.append(price)
+
+            if len(compacted) == len(data):
+                continue
+
+            removed += (len(data) - len(compacted)) // 2
+            path = self.series_path(key)
+            if compacted:
+                with open(path + ".tmp", 'wb') as f:
+                    compacted.tofile(f)
+                os.replace(path + ".tmp", path)
+            else:
+                os.remove(path)
+                del self.meta["series"][key]
+
+        self.meta["last_compaction"] = now
+        self.save_meta()
+        if removed:
+            print(f"# Historico compactado: {removed} observacao(oes) removidas ou agregadas")
+
+    def close(self):
+        self.flush()
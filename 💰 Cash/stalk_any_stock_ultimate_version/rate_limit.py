@@ -0,0 +1,110 @@
+import email.utils
+import random
+import threading
+import time
+
+# Limites padrao por provedor: requisicoes por minuto e rajada maxima
+DEFAULT_PROVIDER_RATES = {
+    # Plano gratuito do CoinGecko: ~30 chamadas/minuto; fica uma margem de seguranca
+    "coingecko": {"per_minute": 25, "burst": 5},
+    "yahoo": {"per_minute": 120, "burst": 10}
+}
+
+# Status que indicam sobrecarga temporaria (vale esperar e tentar de novo)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+
+class TokenBucket:
+    # Balde de fichas na forma de "horario teorico de chegada" (GCRA): cada pedido reserva
+    # o proximo horario livre, entao quem chega primeiro e atendido primeiro (fila FIFO)
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute
+        self.tolerance = self.interval * (max(burst, 1) - 1)
+        self.theoretical_arrival = 0.0
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, deadline: float = None):
+        # Reserva uma ficha - RETORNA os segundos de espera, ou None se so haveria vaga apos o deadline
+        with self.lock:
+            now = time.monotonic()
+            arrival = max(self.theoretical_arrival, now)
+            allowed_at = max(arrival - self.tolerance, self.blocked_until, now)
+            if deadline is not None and allowed_at > deadline:
+                return None
+            self.theoretical_arrival = max(arrival, allowed_at) + self.interval
+            return allowed_at - now
+
+    def block(self, seconds: float):
+        # Suspende o provedor (ex.: Retry-After); pedidos ja na fila tambem esperam
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimitGovernor:
+    # Um balde de fichas por provedor, compartilhado por todas as threads do FetchEngine
+
+    def __init__(self, settings: dict = None):
+        settings = settings or {}
+        rates = {provider: dict(rate) for provider, rate in DEFAULT_PROVIDER_RATES.items()}
+        for provider, rate in settings.get("rate_limits", {}).items():
+            rates.setdefault(provider, {}).update(rate)
+
+        self.buckets = {
+            provider: TokenBucket(rate.get("per_minute", 60), rate.get("burst", 1))
+            for provider, rate in rates.items()
+        }
+        self.max_retries = settings.get("max_retries", DEFAULT_MAX_RETRIES)
+        self.backoff_base = settings.get("backoff_base_seconds", DEFAULT_BACKOFF_BASE)
+        self.backoff_max = settings.get("backoff_max_seconds", DEFAULT_BACKOFF_MAX)
+
+    def acquire(self, provider: str, deadline: float = None) -> bool:
+        # Espera a vez do pedido na fila do provedor - RETORNA False se nao couber antes do deadline
+        bucket = self.buckets.get(provider)
+        if bucket is None:
+            return True
+        wait_seconds = bucket.reserve(deadline)
+        if wait_seconds is None:
+            return False
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+        # Um Retry-After recebido enquanto o pedido esperava na fila tambem vale para ele
+        while True:
+            blocked_for = bucket.blocked_until - time.monotonic()
+            if blocked_for <= 0:
+                return True
+            if deadline is not None and bucket.blocked_until > deadline:
+                return False
+            time.sleep(blocked_for)
+
+    def backoff_delay(self, attempt: int, retry_after: float = None) -> float:
+        # Backoff exponencial com jitter completo; Retry-After do servidor e o piso
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def penalize(self, provider: str, seconds: float):
+        bucket = self.buckets.get(provider)
+        if bucket is not None:
+            bucket.block(seconds)
+
+
+def parse_retry_after(value: str):
+    # Retry-After em segundos ou como data HTTP - RETORNA segundos, ou None se ausente/invalido
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(moment.timestamp() - time.time(), 0.0)
@@ -0,0 +1,174 @@
+from bisect import bisect_left, bisect_right, insort
+
+# Tipos de regra aceitos em assets[].rules no config.json
+RULE_TYPES = ("above", "below", "cross", "pct_from_buy", "trailing_stop")
+
+# Id da regra criada a partir do alert_price de cada ativo (formato antigo)
+LEGACY_RULE_ID = "alert_price"
+
+
+class SortedThresholds:
+    # Limites em ordem crescente com os ids das regras na mesma posicao
+
+    def __init__(self):
+        self.limits = []
+        self.ids = []
+
+    def add(self, limit: float, rule_id: str):
+        position = bisect_right(self.limits, limit)
+        self.limits.insert(position, limit)
+        self.ids.insert(position, rule_id)
+
+    def between(self, start: int, end: int):
+        return zip(self.limits[start:end], self.ids[start:end])
+
+    def __len__(self):
+        return len(self.limits)
+
+
+class SymbolRules:
+    # Regras de um ativo em listas ordenadas por limite: cada tick custa O(log n + disparos)
+
+    def __init__(self):
+        self.above = SortedThresholds()     # dispara com preco >= limite
+        self.below = SortedThresholds()     # dispara com preco <= limite
+        self.cross = SortedThresholds()     # dispara quando o preco atravessa o limite
+        self.trailing = SortedThresholds()  # limite = queda percentual desde o pico
+        self.thresholds = []                # todos os limites fixos, para a distancia ao mais proximo
+        self.rules = {}
+        self.last_price = None
+        self.peak = None
+
+    def add(self, rule: dict, limit: float, kind: str):
+        # Ids repetidos se sobrescreveriam em self.rules e o alerta sairia com a regra errada
+        if rule["id"] in self.rules:
+            raise ValueError(f"regra com id '{rule['id']}' repetido")
+        self.rules[rule["id"]] = rule
+        getattr(self, kind).add(limit, rule["id"])
+        if kind != "trailing":
+            insort(self.thresholds, limit)
+
+    def evaluate(self, price: float) -> list:
+        # Regras disparadas por este tick - RETORNA [(regra, limite), ...]
+        hits = []
+
+        # above: os limites <= preco formam um prefixo da lista
+        hits.extend(self.above.between(0, bisect_right(self.above.limits, price)))
+
+        # below: os limites >= preco formam um sufixo da lista
+        hits.extend(self.below.between(bisect_left(self.below.limits, price), len(self.below)))
+
+        # cross: so os limites entre o preco anterior e o atual (dispara na passagem)
+        if self.last_price is not None:
+            limits = self.cross.limits
+            if price > self.last_price:
+                # Subindo: limites em (anterior, atual]
+                hits.extend(self.cross.between(bisect_right(limits, self.last_price), bisect_right(limits, price)))
+            elif price < self.last_price:
+                # Caindo: limites em [atual, anterior)
+                hits.extend(self.cross.between(bisect_left(limits, price), bisect_left(limits, self.last_price)))
+
+        # trailing_stop: os percentuais <= queda atual desde o pico formam um prefixo
+        self.peak = price if self.peak is None else max(self.peak, price)
+        if len(self.trailing) and self.peak > 0:
+            drawdown = (1 - price / self.peak) * 100
+            end = bisect_right(self.trailing.limits, drawdown)
+            hits.extend((self.peak * (1 - pct / 100), rule_id) for pct, rule_id in self.trailing.between(0, end))
+
+        self.last_price = price
+        return [(self.rules[rule_id], limit) for limit, rule_id in hits]
+
+    def nearest_distance(self, price: float):
+        # Distancia relativa (0.05 = 5%) ate o limite mais proximo, ou None sem limites
+        candidates = []
+        if self.thresholds:
+            i = bisect_left(self.thresholds, price)
+            candidates.extend(self.thresholds[j] for j in (i - 1, i) if 0 <= j < len(self.thresholds))
+        if len(self.trailing) and self.peak:
+            candidates.append(self.peak * (1 - self.trailing.limits[0] / 100))
+        if not candidates or price <= 0:
+            return None
+        return min(abs(limit - price) for limit in candidates) / price
+
+
+class AlertRuleEngine:
+    # Compila as regras de assets (alert_price + lista "rules") e avalia cada tick por ativo
+
+    def __init__(self, assets: list):
+        self.symbols = {}
+        for asset in assets:
+            try:
+                self.symbols[self.asset_key(asset)] = self.compile_asset(asset)
+            except ValueError as e:
+                raise ValueError(f"config invalido em {asset['symbol']}: {e}") from None
+
+    def asset_key(self, asset: dict) -> tuple:
+        return ("crypto" if asset["type"] == "crypto" else "stock", asset["symbol"])
+
+    def compile_asset(self, asset: dict) -> SymbolRules:
+        symbol_rules = SymbolRules()
+
+        # Formato antigo: alert_price equivale a uma regra "above"
+        if "alert_price" in asset:
+            rule = {"id": LEGACY_RULE_ID, "type": "above", "price": asset["alert_price"]}
+            symbol_rules.add(rule, float(asset["alert_price"]), "above")
+
+        for rule in asset.get("rules", []):
+            rule_type = rule.get("type")
+            if rule_type not in RULE_TYPES:
+                print(f"# Regra ignorada em {asset['symbol']}: tipo '{rule_type}' desconhecido")
+                continue
+
+            rule = dict(rule)
+            value = rule.get("pct") if rule_type in ("pct_from_buy", "trailing_stop") else rule.get("price")
+            if value is None:
+                print(f"# Regra '{rule_type}' de {asset['symbol']} sem valor, ignorada")
+                continue
+            rule.setdefault("id", f"{rule_type}:{value}")
+
+            if rule_type == "pct_from_buy":
+                buy_price = asset.get("buy_price")
+                if not buy_price:
+                    print(f"# Regra pct_from_buy de {asset['symbol']} ignorada: ativo sem buy_price")
+                    continue
+                # Percentual positivo: alvo de ganho; negativo: limite de perda
+                limit = buy_price * (1 + value / 100)
+                symbol_rules.add(rule, limit, "above" if value >= 0 else "below")
+            elif rule_type == "trailing_stop":
+                symbol_rules.add(rule, abs(float(value)), "trailing")
+                # O pico parte do preco de compra, quando informado
+                if asset.get("buy_price"):
+                    symbol_rules.peak = max(symbol_rules.peak or 0, asset["buy_price"])
+            else:
+                symbol_rules.add(rule, float(value), rule_type)
+
+        return symbol_rules
+
+    def evaluate(self, asset: dict, price: float) -> list:
+        # Regras do ativo disparadas pelo preco atual - RETORNA [(regra, limite), ...]
+        symbol_rules = self.symbols.get(self.asset_key(asset))
+        if symbol_rules is None:
+            return []
+        return symbol_rules.evaluate(price)
+
+    def nearest_distance(self, asset: dict, price: float):
+        symbol_rules = self.symbols.get(self.asset_key(asset))
+        return symbol_rules.nearest_distance(price) if symbol_rules else None
+
+    def rule_count(self, asset: dict) -> int:
+        symbol_rules = self.symbols.get(self.asset_key(asset))
+        return len(symbol_rules.rules) if symbol_rules else 0
+
+
+def describe_rule(rule: dict, limit: float) -> str:
+    # Texto curto para mensagens de alerta
+    rule_type = rule["type"]
+    if rule_type == "above":
+        return f"acima de {limit:.2f}"
+    if rule_type == "below":
+        return f"abaixo de {limit:.2f}"
+    if rule_type == "cross":
+        return f"cruzou {limit:.2f}"
+    if rule_type == "pct_from_buy":
+        return f"{rule['pct']:+.1f}% sobre o preco de compra ({limit:.2f})"
+    return f"trailing stop de {abs(rule['pct']):.1f}% ({limit:.2f})"
@@ -0,0 +1,134 @@
+import datetime
+import heapq
+import itertools
+import math
+from collections import deque
+
+# Pregao regular da B3 (horario de Brasilia, sem horario de verao desde 2019)
+B3_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-3))
+B3_OPEN = datetime.time(10, 0)
+B3_CLOSE = datetime.time(17, 0)
+
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "min_interval_minutes": 1,
+    # Sem volatilidade conhecida, usa settings.check_interval_minutes
+    "max_interval_minutes": None,
+    # Margem em desvios-padrao: o proximo check acontece antes de um movimento de z sigmas ate o limite
+    "z_score": 3.0,
+    # Quantidade de precos recentes usados para estimar a volatilidade
+    "history_size": 30,
+    # Ativos que vencem dentro desta janela sao verificados juntos (menos requisicoes)
+    "grouping_window_seconds": 30,
+    "b3_holidays": []
+}
+
+
+class AdaptiveScheduler:
+    # Agenda a proxima verificacao de cada ativo em um heap: ativos volateis ou perto de um
+    # limite de alerta voltam logo; ativos calmos e distantes esperam mais. Acoes da B3 so
+    # sao agendadas durante o pregao; criptos funcionam 24/7
+
+    def __init__(self, settings: dict, base_interval_minutes: float, rule_engine):
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.base_interval = base_interval_minutes * 60
+        self.min_interval = self.settings["min_interval_minutes"] * 60
+        max_minutes = self.settings["max_interval_minutes"] or base_interval_minutes * 4
+        self.max_interval = max(max_minutes * 60, self.min_interval)
+        self.rule_engine = rule_engine
+        self.holidays = {datetime.date.fromisoformat(day) for day in self.settings["b3_holidays"]}
+
+        self.heap = []
+        self.counter = itertools.count()
+        self.assets = {}
+        self.history = {}
+
+    def asset_key(self, asset: dict) -> tuple:
+        return ("crypto" if asset["type"] == "crypto" else "stock", asset["symbol"])
+
+    def add_assets(self, assets: list, now: float):
+        # Todos os ativos comecam vencidos (ou na proxima abertura da B3)
+        for asset in assets:
+            key = self.asset_key(asset)
+            self.assets[key] = asset
+            self.history.setdefault(key, deque(maxlen=self.settings["history_size"]))
+            self.push(key, self.next_allowed_time(asset, now))
+
+    def seed_history(self, asset: dict, timestamps, prices):
+        # Aproveita precos ja guardados (ex.: PriceStore) para estimar a volatilidade desde o inicio
+        history = self.history.setdefault(self.asset_key(asset), deque(maxlen=self.settings["history_size"]))
+        for timestamp, price in zip(timestamps, prices):
+            history.append((timestamp, price))
+
+    def push(self, key: tuple, when: float):
+        heapq.heappush(self.heap, (when, next(self.counter), key))
+
+    def next_due_time(self):
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now: float) -> list:
+        # Ativos vencidos (incluindo os que vencem dentro da janela de agrupamento)
+        due = []
+        limit = now + self.settings["grouping_window_seconds"]
+        while self.heap and self.heap[0][0] <= limit:
+            _, _, key = heapq.heappop(self.heap)
+            due.append(self.assets[key])
+        return due
+
+    def reschedule(self, asset: dict, price: float, now: float) -> float:
+        # Registra o preco observado e agenda o proximo check - RETORNA o intervalo em segundos
+        key = self.asset_key(asset)
+        if price and price > 0:
+            self.history[key].append((now, price))
+            interval = self.compute_interval(asset, price)
+        else:
+            # Falha ao obter preco: tenta de novo no intervalo padrao
+            interval = self.base_interval
+        self.push(key, self.next_allowed_time(asset, now + interval))
+        return interval
+
+    def volatility(self, key: tuple):
+        # Desvio-padrao dos retornos logaritmicos por raiz de segundo, ou None com poucos dados
+        points = self.history[key]
+        normalized = []
+        for (t0, p0), (t1, p1) in zip(points, itertools.islice(points, 1, None)):
+            if t1 > t0 and p0 > 0 and p1 > 0:
+                normalized.append(math.log(p1 / p0) / math.sqrt(t1 - t0))
+        if len(normalized) < 2:
+            return None
+        mean = sum(normalized) / len(normalized)
+        return math.sqrt(sum((value - mean) ** 2 for value in normalized) / (len(normalized) - 1))
+
+    def compute_interval(self, asset: dict, price: float) -> float:
+        # Tempo ate um movimento de z sigmas cobrir a distancia ao limite mais proximo
+        distance = self.rule_engine.nearest_distance(asset, price) if self.rule_engine else None
+        sigma = self.volatility(self.asset_key(asset))
+
+        if distance is None:
+            # Sem limites a vigiar: so o historico de precos interessa
+            interval = self.max_interval
+        elif sigma is None:
+            interval = self.base_interval
+        elif sigma == 0:
+            interval = self.max_interval
+        else:
+            interval = (distance / (self.settings["z_score"] * sigma)) ** 2
+
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def next_allowed_time(self, asset: dict, when: float) -> float:
+        # Acoes da B3 fora do pregao passam para a proxima abertura
+        if asset["type"] == "crypto":
+            return when
+
+        moment = datetime.datetime.fromtimestamp(when, B3_TIMEZONE)
+        for _ in range(15):
+            trading_day = moment.weekday() < 5 and moment.date() not in self.holidays
+            if trading_day and B3_OPEN <= moment.time() < B3_CLOSE:
+                return moment.timestamp()
+            if trading_day and moment.time() < B3_OPEN:
+                return datetime.datetime.combine(moment.date(), B3_OPEN, B3_TIMEZONE).timestamp()
+            next_day = moment.date() + datetime.timedelta(days=1)
+            moment = datetime.datetime.combine(next_day, B3_OPEN, B3_TIMEZONE)
+        return moment.timestamp()
@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+
+import pytest
+
+from dispatch import AlertDispatcher, LogSink, SoundSink, WebhookSink, create_dispatcher, format_alert
+
+
+def make_alert(symbol, price=10.0, rule="alert_price"):
+    return {"symbol": symbol, "name": symbol.lower(), "current_price": price, "currency": "BRL", "rule": rule}
+
+
+class RecordingSink:
+    # Guarda os lotes recebidos e avisa quando chega um
+
+    def __init__(self):
+        self.batches = []
+        self.received = threading.Event()
+
+    def send(self, alerts):
+        self.batches.append([alert["symbol"] for alert in alerts])
+        self.received.set()
+
+
+class FailingSink:
+    def send(self, alerts):
+        raise RuntimeError("fora do ar")
+
+
+@pytest.fixture
+def recorder():
+    return RecordingSink()
+
+
+def test_burst_is_coalesced_into_one_batch(recorder):
+    dispatcher = AlertDispatcher({"recorder": recorder}, coalesce_seconds=0.3)
+    for symbol in ("BTC", "ETH", "PETR4"):
+        dispatcher.dispatch(make_alert(symbol))
+    assert recorder.received.wait(2)
+    assert recorder.batches == [["BTC", "ETH", "PETR4"]]
+
+    # Depois da janela, um novo alerta vai em outro lote
+    recorder.received.clear()
+    dispatcher.dispatch(make_alert("VALE3"))
+    assert recorder.received.wait(2)
+    dispatcher.close()
+    assert recorder.batches == [["BTC", "ETH", "PETR4"], ["VALE3"]]
+
+
+def test_dispatch_does_not_wait_for_the_sinks(recorder):
+    dispatcher = AlertDispatcher({"recorder": recorder}, coalesce_seconds=5)
+    start = time.monotonic()
+    dispatcher.dispatch(make_alert("BTC"))
+    assert time.monotonic() - start < 0.5
+    assert recorder.batches == []
+    dispatcher.close()
+
+
+def test_close_delivers_pending_alerts_without_waiting_the_window(recorder):
+    dispatcher = AlertDispatcher({"recorder": recorder}, coalesce_seconds=30)
+    dispatcher.dispatch(make_alert("BTC"))
+    dispatcher.dispatch(make_alert("ETH"))
+
+    start = time.monotonic()
+    dispatcher.close()
+    assert time.monotonic() - start < 5
+    assert not dispatcher.worker.is_alive()
+    assert recorder.batches == [["BTC", "ETH"]]
+
+
+def test_failing_sink_does_not_block_the_others(recorder, capsys):
+    dispatcher = AlertDispatcher({"falha": FailingSink(), "recorder": recorder}, coalesce_seconds=0)
+    dispatcher.dispatch(make_alert("BTC"))
+    dispatcher.close()
+    assert recorder.batches == [["BTC"]]
+    assert "Erro ao notificar via falha" in capsys.readouterr().out
+
+
+def test_sound_plays_once_per_batch():
+    plays = []
+    dispatcher = AlertDispatcher({"sound": SoundSink(lambda: plays.append(1))}, coalesce_seconds=0.2)
+    for symbol in ("BTC", "ETH", "SOL"):
+        dispatcher.dispatch(make_alert(symbol))
+    dispatcher.close()
+    assert plays == [1]
+
+
+def test_log_sink_writes_one_line_per_alert(tmp_path):
+    path = tmp_path / "notifications.log"
+    LogSink({"notification_log": str(path)}).send([make_alert("BTC", 350000.5), make_alert("PETR4", rule="cross:35")])
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("ALERTA BTC (btc) a R$350000.50")
+    assert lines[1].endswith("[cross:35]")
+
+
+def test_webhook_posts_the_whole_batch():
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+    class FakeSession:
+        def __init__(self):
+            self.posts = []
+
+        def post(self, url, data, headers, timeout):
+            self.posts.append((url, json.loads(data.decode("utf-8"))))
+            return FakeResponse()
+
+    session = FakeSession()
+    alerts = [make_alert("BTC"), make_alert("ETH")]
+    WebhookSink({"webhook": {"url": "http://exemplo/hook"}}, session).send(alerts)
+
+    [(url, payload)] = session.posts
+    assert url == "http://exemplo/hook"
+    assert payload["alerts"] == alerts
+    assert payload["text"] == "\n".join(format_alert(alert) for alert in alerts)
+
+
+def test_create_dispatcher_builds_configured_sinks(tmp_path, capsys):
+    settings = {
+        "play_sound_alert": False,
+        "notifications": {"sinks": ["sound", "log", "pombo"], "coalesce_seconds": 0.5,
+                          "notification_log": str(tmp_path / "n.log")}
+    }
+    dispatcher = create_dispatcher(settings, play_function=lambda: None)
+    try:
+        assert list(dispatcher.sinks) == ["log"]
+        assert dispatcher.coalesce_seconds == 0.5
+        assert "Destino de notificacao desconhecido: pombo" in capsys.readouterr().out
+    finally:
+        dispatcher.close()
@@ -0,0 +1,101 @@
+import os
+import time
+
+import pytest
+
+from price_store import RECORD_SIZE, PriceStore
+
+HOUR = 3600
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore({"directory": str(tmp_path), "retention_days": 30,
+                        "downsample_after_days": 7, "downsample_minutes": 60})
+    yield store
+    store.close()
+
+
+def as_lists(series: tuple) -> tuple:
+    timestamps, prices = series
+    return list(timestamps), list(prices)
+
+
+def aligned_hour(days_ago: float) -> float:
+    # Inicio de uma hora cheia de alguns dias atras, para os testes nao dependerem do minuto atual
+    return (int((time.time() - days_ago * DAY) // HOUR)) * HOUR
+
+
+def test_record_load_and_flush(store):
+    store.record("crypto", " btc ", 100.0, "BRL", timestamp=1000)
+    store.record("crypto", "BTC", 101.0, "BRL", timestamp=2000)
+    # Ainda no buffer: load ja enxerga
+    assert as_lists(store.load("crypto", "BTC")) == ([1000, 2000], [100.0, 101.0])
+
+    store.flush()
+    assert os.path.getsize(store.series_path("crypto:BTC")) == 2 * RECORD_SIZE
+    assert as_lists(store.load("crypto", "BTC", start=1500)) == ([2000], [101.0])
+    assert store.series()["crypto:BTC"]["currency"] == "BRL"
+
+    # Os metadados sobrevivem a um novo processo
+    reopened = PriceStore({"directory": store.directory})
+    assert as_lists(reopened.load("crypto", "btc")) == ([1000, 2000], [100.0, 101.0])
+
+
+def test_incomplete_record_is_ignored(store):
+    store.record("stock", "PETR4", 38.5, "BRL", timestamp=1000)
+    store.flush()
+    with open(store.series_path("stock:PETR4"), 'ab') as f:
+        f.write(b"\x00" * (RECORD_SIZE - 3))
+    assert as_lists(store.load("stock", "PETR4")) == ([1000], [38.5])
+
+
+def test_maybe_flush_after_flush_every(tmp_path):
+    store = PriceStore({"directory": str(tmp_path), "flush_every": 3, "flush_interval_seconds": 3600})
+    # Sem compactacao pendente (ela tambem grava o buffer)
+    store.meta["last_compaction"] = time.time()
+    path = store.series_path("stock:VALE3")
+    for i in range(2):
+        store.record("stock", "VALE3", 60.0 + i, "BRL", timestamp=1000 + i)
+        store.maybe_flush()
+    assert not os.path.exists(path)
+
+    store.record("stock", "VALE3", 62.0, "BRL", timestamp=1002)
+    store.maybe_flush()
+    assert os.path.getsize(path) == 3 * RECORD_SIZE
+    assert store.buffered == 0
+
+
+def test_compact_applies_retention(store):
+    store.record("stock", "ITUB4", 30.0, "BRL", timestamp=aligned_hour(40))
+    store.record("stock", "ITUB4", 31.0, "BRL", timestamp=aligned_hour(1))
+    store.record("stock", "BBAS3", 25.0, "BRL", timestamp=aligned_hour(35))
+    store.compact()
+
+    assert as_lists(store.load("stock", "ITUB4")) == ([aligned_hour(1)], [31.0])
+    # Serie sem nenhuma observacao dentro da retencao some do disco e dos metadados
+    assert "stock:BBAS3" not in store.series()
+    assert not os.path.exists(store.series_path("stock:BBAS3"))
+
+
+def test_compact_downsamples_old_data_to_last_price_per_bucket(store):
+    old = aligned_hour(10)
+    recent = aligned_hour(1)
+    observations = [
+        (old, 1.0), (old + 600, 2.0), (old + 1800, 3.0),   # mesma hora: fica so o ultimo
+        (old + HOUR, 4.0),                                  # proxima hora
+        (recent, 5.0), (recent + 60, 6.0), (recent + 120, 7.0),  # recentes: tudo fica
+    ]
+    for timestamp, price in observations:
+        store.record("crypto", "ETH", price, "BRL", timestamp=timestamp)
+    store.compact()
+
+    timestamps, prices = store.load("crypto", "ETH")
+    assert list(timestamps) == [old + 1800, old + HOUR, recent, recent + 60, recent + 120]
+    assert list(prices) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert store.meta["last_compaction"] == pytest.approx(time.time(), abs=60)
+
+    # Compactar de novo nao muda nada
+    store.compact()
+    assert store.load("crypto", "ETH") == (timestamps, prices)
@@ -0,0 +1,109 @@
+import email.utils
+import time
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimitGovernor, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    # time.monotonic/time.sleep controlados pelo teste: sleep so avanca o relogio
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limit.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_bucket_allows_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(per_minute=60, burst=3)
+    # A rajada sai na hora; depois disso um pedido por intervalo (1s), em ordem de chegada
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([1, 2, 3])
+
+
+def test_bucket_refills_with_time(clock):
+    bucket = TokenBucket(per_minute=60, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(1)
+
+    # Parado tempo suficiente, a rajada inteira volta a estar disponivel
+    clock.now += 10
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() == pytest.approx(1)
+
+
+def test_bucket_refuses_reservation_after_deadline(clock):
+    bucket = TokenBucket(per_minute=60, burst=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve(deadline=clock.now + 0.5) is None
+    # A recusa nao consome a vaga: quem cabe no prazo continua sendo atendido
+    assert bucket.reserve(deadline=clock.now + 1) == pytest.approx(1)
+
+
+def test_bucket_block_delays_queued_requests(clock):
+    bucket = TokenBucket(per_minute=60, burst=5)
+    bucket.block(30)
+    assert bucket.reserve() == pytest.approx(30)
+    # Um bloqueio mais curto nao encurta o que ja esta valendo
+    bucket.block(5)
+    assert bucket.blocked_until == pytest.approx(clock.now + 30)
+
+
+def test_governor_acquire_waits_for_penalty(clock):
+    governor = RateLimitGovernor({"rate_limits": {"coingecko": {"per_minute": 60, "burst": 5}}})
+    governor.penalize("coingecko", 12)
+
+    assert governor.acquire("coingecko")
+    assert sum(clock.sleeps) == pytest.approx(12)
+    assert not governor.acquire("coingecko", deadline=clock.now - 1)
+
+
+def test_governor_unknown_provider_is_not_limited(clock):
+    governor = RateLimitGovernor()
+    assert all(governor.acquire("outro") for _ in range(100))
+    assert clock.sleeps == []
+
+
+def test_backoff_delay_is_bounded_and_respects_retry_after():
+    governor = RateLimitGovernor({"backoff_base_seconds": 1, "backoff_max_seconds": 8})
+    for attempt in range(10):
+        assert 0 <= governor.backoff_delay(attempt) <= min(8, 2 ** attempt)
+    assert governor.backoff_delay(0, retry_after=30) == 30
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    (" 5 ", 5.0),
+    ("0", 0.0),
+    (None, None),
+    ("", None),
+    ("amanha", None),
+    ("-3", None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    future = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert parse_retry_after(future) == pytest.approx(60, abs=2)
+
+    # Data no passado nao vira espera negativa
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
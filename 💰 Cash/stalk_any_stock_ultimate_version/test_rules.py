@@ -0,0 +1,91 @@
+import pytest
+
+from rules import LEGACY_RULE_ID, AlertRuleEngine, describe_rule
+
+
+def make_asset(rules, **fields):
+    return dict({"type": "stock", "symbol": "PETR4", "rules": rules}, **fields)
+
+
+def fired(engine, asset, price) -> list:
+    return sorted(rule["id"] for rule, _ in engine.evaluate(asset, price))
+
+
+def test_above_and_below_fire_on_every_tick_past_the_limit():
+    asset = make_asset([{"type": "above", "price": 40, "id": "alto"},
+                        {"type": "below", "price": 30, "id": "baixo"}])
+    engine = AlertRuleEngine([asset])
+    assert fired(engine, asset, 35) == []
+    assert fired(engine, asset, 40) == ["alto"]
+    assert fired(engine, asset, 41) == ["alto"]
+    assert fired(engine, asset, 30) == ["baixo"]
+
+
+def test_cross_fires_only_when_the_price_passes_the_limit():
+    asset = make_asset([{"type": "cross", "price": 35, "id": "c35"},
+                        {"type": "cross", "price": 38, "id": "c38"}])
+    engine = AlertRuleEngine([asset])
+    # Primeiro tick so guarda o preco
+    assert fired(engine, asset, 34) == []
+    assert fired(engine, asset, 35) == ["c35"]
+    assert fired(engine, asset, 36) == []
+    # Um salto atravessa os dois limites de uma vez
+    assert fired(engine, asset, 39) == ["c38"]
+    assert fired(engine, asset, 34) == ["c35", "c38"]
+    assert fired(engine, asset, 34) == []
+
+
+def test_pct_from_buy_and_trailing_stop():
+    asset = make_asset([{"type": "pct_from_buy", "pct": 10, "id": "ganho"},
+                        {"type": "pct_from_buy", "pct": -5, "id": "perda"},
+                        {"type": "trailing_stop", "pct": 8, "id": "stop"}], buy_price=100)
+    engine = AlertRuleEngine([asset])
+    assert fired(engine, asset, 100) == []
+    assert fired(engine, asset, 125) == ["ganho"]
+    # Pico em 125: o stop de 8% fica em 115
+    assert fired(engine, asset, 116) == ["ganho"]
+    hits = engine.evaluate(asset, 108)
+    assert [rule["id"] for rule, _ in hits] == ["stop"]
+    assert hits[0][1] == pytest.approx(115)
+    assert fired(engine, asset, 95) == ["perda", "stop"]
+
+
+def test_legacy_alert_price_and_default_ids():
+    asset = make_asset([{"type": "below", "price": 30}], alert_price=40)
+    engine = AlertRuleEngine([asset])
+    assert engine.rule_count(asset) == 2
+    assert fired(engine, asset, 45) == [LEGACY_RULE_ID]
+    assert fired(engine, asset, 29) == ["below:30"]
+
+
+def test_invalid_rules_are_skipped():
+    asset = make_asset([{"type": "sideways", "price": 1},
+                        {"type": "above"},
+                        {"type": "pct_from_buy", "pct": 10}])
+    assert AlertRuleEngine([asset]).rule_count(asset) == 0
+
+
+def test_duplicate_rule_id_is_rejected():
+    asset = make_asset([{"type": "above", "price": 40, "id": "alvo"},
+                        {"type": "below", "price": 30, "id": "alvo"}])
+    with pytest.raises(ValueError, match="PETR4.*alvo"):
+        AlertRuleEngine([asset])
+
+    # O id padrao "tipo:valor" tambem conta, assim como o alert_price
+    with pytest.raises(ValueError):
+        AlertRuleEngine([make_asset([{"type": "above", "price": 40}, {"type": "above", "price": 40}])])
+    with pytest.raises(ValueError):
+        AlertRuleEngine([make_asset([{"type": "above", "price": 41, "id": LEGACY_RULE_ID}], alert_price=40)])
+
+
+def test_nearest_distance():
+    asset = make_asset([{"type": "above", "price": 110}, {"type": "below", "price": 80}])
+    engine = AlertRuleEngine([asset])
+    assert engine.nearest_distance(asset, 100) == pytest.approx(0.10)
+    assert engine.nearest_distance(asset, 85) == pytest.approx(5 / 85)
+    assert engine.nearest_distance({"type": "stock", "symbol": "VALE3"}, 100) is None
+
+
+def test_describe_rule():
+    assert describe_rule({"type": "cross"}, 35) == "cruzou 35.00"
+    assert describe_rule({"type": "pct_from_buy", "pct": -5}, 95) == "-5.0% sobre o preco de compra (95.00)"
@@ -0,0 +1,129 @@
+import datetime
+
+import pytest
+
+from scheduler import B3_TIMEZONE, AdaptiveScheduler
+
+BTC = {"type": "crypto", "symbol": "BTC"}
+PETR4 = {"type": "stock", "symbol": "PETR4"}
+
+
+class FixedDistance:
+    # Rule engine falso: distancia relativa fixa ate o limite mais proximo
+
+    def __init__(self, distance):
+        self.distance = distance
+
+    def nearest_distance(self, asset, price):
+        return self.distance
+
+
+def b3_time(year, month, day, hour, minute=0) -> float:
+    return datetime.datetime(year, month, day, hour, minute, tzinfo=B3_TIMEZONE).timestamp()
+
+
+def make_scheduler(distance=None, **settings) -> AdaptiveScheduler:
+    # Intervalo base de 5 min: minimo 1 min e maximo 20 min (4x o base)
+    return AdaptiveScheduler(settings, 5, FixedDistance(distance))
+
+
+def seed_oscillating(scheduler, asset, points=10):
+    # Precos alternando 100/101 a cada minuto: volatilidade conhecida e diferente de zero
+    timestamps = [i * 60.0 for i in range(points)]
+    prices = [100.0 + i % 2 for i in range(points)]
+    scheduler.seed_history(asset, timestamps, prices)
+
+
+def test_intervals_from_settings():
+    scheduler = make_scheduler()
+    assert (scheduler.min_interval, scheduler.base_interval, scheduler.max_interval) == (60, 300, 1200)
+
+
+def test_interval_without_rules_or_history():
+    # Sem limites a vigiar, espera o maximo
+    scheduler = make_scheduler(distance=None)
+    scheduler.add_assets([BTC], now=0)
+    assert scheduler.compute_interval(BTC, 100) == 1200
+
+    # Com limite mas sem historico suficiente, usa o intervalo base
+    scheduler = make_scheduler(distance=0.05)
+    scheduler.add_assets([BTC], now=0)
+    assert scheduler.compute_interval(BTC, 100) == 300
+
+
+def test_interval_with_flat_prices_is_maximum():
+    scheduler = make_scheduler(distance=0.05)
+    scheduler.seed_history(BTC, [0, 60, 120, 180], [100, 100, 100, 100])
+    assert scheduler.compute_interval(BTC, 100) == 1200
+
+
+def test_interval_follows_distance_and_volatility():
+    scheduler = make_scheduler(distance=0.1)
+    seed_oscillating(scheduler, BTC)
+    sigma = scheduler.volatility(scheduler.asset_key(BTC))
+    assert sigma > 0
+
+    # Tempo ate um movimento de 3 sigmas cobrir a distancia: (d / (z * sigma)) ** 2
+    expected = (0.1 / (3.0 * sigma)) ** 2
+    assert 60 < expected < 1200
+    assert scheduler.compute_interval(BTC, 100) == pytest.approx(expected)
+
+    # Muito perto do limite: intervalo minimo; muito longe: maximo
+    scheduler.rule_engine.distance = 0.001
+    assert scheduler.compute_interval(BTC, 100) == 60
+    scheduler.rule_engine.distance = 1
+    assert scheduler.compute_interval(BTC, 100) == 1200
+
+
+def test_reschedule_failure_uses_base_interval():
+    scheduler = make_scheduler(distance=0.05)
+    scheduler.add_assets([BTC], now=1000)
+    assert scheduler.pop_due(1000) == [BTC]
+
+    assert scheduler.reschedule(BTC, None, now=1000) == 300
+    assert scheduler.next_due_time() == 1300
+
+
+def test_pop_due_groups_assets_inside_window():
+    scheduler = make_scheduler(grouping_window_seconds=30)
+    eth = {"type": "crypto", "symbol": "ETH"}
+    sol = {"type": "crypto", "symbol": "SOL"}
+    scheduler.add_assets([BTC, eth, sol], now=0)
+    scheduler.pop_due(0)
+    scheduler.push(scheduler.asset_key(BTC), 100)
+    scheduler.push(scheduler.asset_key(eth), 125)
+    scheduler.push(scheduler.asset_key(sol), 200)
+
+    assert scheduler.pop_due(100) == [BTC, eth]
+    assert scheduler.next_due_time() == 200
+
+
+def test_crypto_runs_around_the_clock():
+    scheduler = make_scheduler()
+    saturday_night = b3_time(2024, 6, 8, 23, 30)
+    assert scheduler.next_allowed_time(BTC, saturday_night) == saturday_night
+
+
+@pytest.mark.parametrize("when, expected", [
+    # Durante o pregao: sem mudanca
+    (b3_time(2024, 6, 5, 14, 15), b3_time(2024, 6, 5, 14, 15)),
+    # Antes da abertura: abertura do mesmo dia
+    (b3_time(2024, 6, 5, 8, 0), b3_time(2024, 6, 5, 10)),
+    # Depois do fechamento: abertura do dia seguinte
+    (b3_time(2024, 6, 5, 17, 0), b3_time(2024, 6, 6, 10)),
+    # Sexta depois do fechamento e fim de semana: segunda-feira
+    (b3_time(2024, 6, 7, 18, 0), b3_time(2024, 6, 10, 10)),
+    (b3_time(2024, 6, 9, 12, 0), b3_time(2024, 6, 10, 10)),
+])
+def test_stock_waits_for_b3_session(when, expected):
+    assert make_scheduler().next_allowed_time(PETR4, when) == expected
+
+
+def test_stock_skips_holidays():
+    # Corpus Christi 2024 (quinta) sem pregao: proxima abertura na sexta
+    scheduler = make_scheduler(b3_holidays=["2024-05-30"])
+    assert scheduler.next_allowed_time(PETR4, b3_time(2024, 5, 29, 17, 30)) == b3_time(2024, 5, 31, 10)
+
+    # add_assets tambem respeita o pregao
+    scheduler.add_assets([PETR4], now=b3_time(2024, 5, 30, 11))
+    assert scheduler.next_due_time() == b3_time(2024, 5, 31, 10)
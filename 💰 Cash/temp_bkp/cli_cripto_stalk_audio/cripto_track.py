@@ -2,7 +2,10 @@ import asciichartpy
 import requests
 import pygame
 from pathlib import Path
+import email.utils
+import random
 import sys
+import time
 
 
 class CryptoTracker:
@@ -16,6 +19,14 @@ class CryptoTracker:
     REFERENCE_PRICE = 106913       # Preço de referência para comparação (preço da venda)
     REFERENCE_DATE = "junho"        # Data de referência
     
+    # Limite de taxa da CoinGecko (plano gratuito: ~30 chamadas/minuto) e novas tentativas
+    # quando ela limita a taxa (429) ou está sobrecarregada (5xx)
+    MIN_REQUEST_INTERVAL = 2.5      # Segundos entre chamadas
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    MAX_RETRIES = 3
+    BACKOFF_BASE_SECONDS = 2
+    BACKOFF_MAX_SECONDS = 60
+    
     # Configurações de alerta de áudio
     AUDIO_ALERT_RULES = [
         {"threshold": 100000, "condition": ">", "file": "high_alert.mp3", "loops": 2},
@@ -26,6 +37,7 @@ class CryptoTracker:
     def __init__(self, audio_dir=None):
         self.audio_dir = Path(audio_dir) if audio_dir else None
         self._setup_encoding()
+        self.next_request_at = 0.0      # time.monotonic() a partir do qual a próxima chamada pode sair
 
     def _setup_encoding(self):
         try:
@@ -34,11 +46,51 @@ class CryptoTracker:
         except (AttributeError, Exception):
             pass
 
+    def _wait_turn(self):
+        # Respeita o intervalo mínimo entre chamadas e a pausa pedida pela CoinGecko
+        wait = self.next_request_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.next_request_at = time.monotonic() + self.MIN_REQUEST_INTERVAL
+
+    def _pause(self, seconds):
+        # Depois de um 429 todas as chamadas seguintes esperam, não só a nova tentativa
+        self.next_request_at = max(self.next_request_at, time.monotonic() + seconds)
+
+    def _retry_delay(self, response, attempt):
+        # Backoff exponencial com jitter; o Retry-After (segundos ou data HTTP) é o piso
+        delay = random.uniform(0, min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * 2 ** attempt))
+        retry_after = (response.headers.get("Retry-After") or "").strip()
+        if retry_after.isdigit():
+            return max(delay, float(retry_after))
+        try:
+            moment = email.utils.parsedate_to_datetime(retry_after)
+            return max(delay, moment.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return delay
+
+    def _get(self, url, params=None):
+        # GET respeitando o limite da CoinGecko; em 429/5xx espera o Retry-After ou o backoff
+        attempt = 0
+        while True:
+            self._wait_turn()
+            response = requests.get(url, params=params, timeout=10)
+            if response.status_code not in self.RETRY_STATUS or attempt >= self.MAX_RETRIES:
+                return response
+            
+            delay = self._retry_delay(response, attempt)
+            print(f"CoinGecko respondeu {response.status_code}; nova tentativa em {delay:.1f}s...")
+            if response.status_code == 429:
+                self._pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
     def get_current_price(self):
         url = f"{self.BASE_URL}/simple/price?ids={self.CRYPTO_ID}&vs_currencies=usd"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self._get(url)
             response.raise_for_status()
             price = response.json()[self.CRYPTO_ID]['usd']
             return float(price)
@@ -55,7 +107,7 @@ class CryptoTracker:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self._get(url, params=params)
             response.raise_for_status()
             data = response.json()
             return [price[1] for price in data['prices']]
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do Buscador de Texto
+Mede, sem acesso à rede, a vazão (MB/s) e o pico de memória (RSS) das etapas do
+TextSearcher sobre HTML sintético de 10 KB, 1 MB e 100 MB, indentado e minificado.
+Cada caso roda em um processo separado para que o pico de memória de um não contamine o outro.
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import subprocess
+import sys
+import time
+
+from colorama import Fore, init
+
+from html_searcher import EscritorResultados, IndiceHTML, TextSearcher
+
+try:
+    import resource
+except ImportError:
+    # Windows: sem getrusage, o pico de memória não é medido
+    resource = None
+
+init(autoreset=True)
+
+TAMANHOS = {'10KB': 10 * 1024, '1MB': 1024 ** 2, '100MB': 100 * 1024 ** 2}
+ESTILOS = ('indentado', 'minificado')
+OPERACOES = ('busca', 'contexto', 'elemento', 'relatorio')
+
+# Semente fixa: o mesmo corpus é gerado em qualquer máquina
+SEMENTE = 42
+SECOES_DISTINTAS = 64
+TERMO_PADRAO = 'python'
+
+# Corpora pequenos são executados em laço até somar este tempo, para reduzir o ruído da medição
+TEMPO_MINIMO = 0.2
+
+# Queda de vazão (fração) a partir da qual o --comparar acusa regressão
+TOLERANCIA_PADRAO = 0.20
+
+PALAVRAS = (
+    'lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+    'incididunt ut labore et dolore magna aliqua curso tutorial pagina produto preco '
+    'busca texto exemplo documento catalogo servidor cliente'
+).split()
+
+
+def gerar_secao(rng, termo):
+    """Uma <section> com cabeçalho, parágrafos, links, imagem, lista, tabela e script
+
+    Retorna pares (nível de indentação, linha) para que o mesmo conteúdo possa ser
+    serializado indentado ou minificado.
+    """
+    def frase(minimo, maximo):
+        palavras = [rng.choice(PALAVRAS) for _ in range(rng.randint(minimo, maximo))]
+        # Cerca de 1 em cada 4 frases menciona o termo, às vezes com outra capitalização
+        if rng.random() < 0.25:
+            palavras.insert(rng.randrange(len(palavras) + 1), rng.choice((termo, termo.capitalize(), termo.upper())))
+        return ' '.join(palavras)
+
+    linhas = [(2, '<section class="conteudo">'), (3, f'<h2>{frase(3, 6)}</h2>')]
+    for _ in range(rng.randint(2, 5)):
+        linhas.append((3, f'<p>{frase(20, 60)}</p>'))
+    linhas.append((3, f'<a href="/{rng.choice(PALAVRAS)}/{rng.randint(1, 9999)}" title="{frase(2, 4)}">{frase(2, 5)}</a>'))
+    linhas.append((3, f'<img src="/img/{rng.choice(PALAVRAS)}.png" alt="{frase(2, 5)}">'))
+    linhas.append((3, '<ul>'))
+    for _ in range(rng.randint(2, 6)):
+        linhas.append((4, f'<li>{frase(3, 10)}</li>'))
+    linhas.append((3, '</ul>'))
+    linhas.append((3, '<table>'))
+    for _ in range(rng.randint(1, 3)):
+        linhas.append((4, f'<tr><td>{frase(1, 3)}</td><td>{rng.randint(1, 999)},{rng.randint(0, 99):02d}</td></tr>'))
+    linhas.append((3, '</table>'))
+    linhas.append((3, f'<script>var dados = {{"chave": "{frase(2, 4)}"}};</script>'))
+    linhas.append((2, '</section>'))
+    return linhas
+
+
+def gerar_html(tamanho, estilo, termo=TERMO_PADRAO):
+    """HTML sintético determinístico com aproximadamente `tamanho` caracteres"""
+    rng = random.Random(SEMENTE)
+    separador = '\n' if estilo == 'indentado' else ''
+
+    def serializar(linhas):
+        if estilo == 'indentado':
+            return separador.join('  ' * nivel + linha for nivel, linha in linhas) + separador
+        return ''.join(linha for _, linha in linhas)
+
+    # Um conjunto fixo de seções distintas é repetido até atingir o tamanho (rápido mesmo para 100 MB)
+    secoes = [serializar(gerar_secao(rng, termo)) for _ in range(SECOES_DISTINTAS)]
+    inicio = serializar([(0, '<!DOCTYPE html>'), (0, '<html lang="pt-BR">'), (1, '<head>'),
+                         (2, f'<title>Corpus de benchmark {termo}</title>'), (1, '</head>'), (1, '<body>')])
+    fim = serializar([(1, '</body>'), (0, '</html>')])
+
+    partes = [inicio]
+    total = len(inicio) + len(fim)
+    i = 0
+    while total < tamanho:
+        secao = secoes[i % len(secoes)]
+        partes.append(secao)
+        total += len(secao)
+        i += 1
+    partes.append(fim)
+    return ''.join(partes)
+
+
+def rss_atual_kb():
+    """RSS atual do processo em KB (Linux); None quando não disponível"""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            paginas_residentes = int(arquivo.read().split()[1])
+        return paginas_residentes * resource.getpagesize() // 1024
+    except (OSError, AttributeError):
+        return None
+
+
+def pico_rss_kb():
+    """Pico de RSS do processo em KB (None no Windows)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa em bytes; Linux em KB
+    return pico // 1024 if sys.platform == 'darwin' else pico
+
+
+def medir_caso(nome_tamanho, estilo, operacao, termo, modo, repeticoes):
+    """Executa uma operação sobre o corpus e retorna tempo, bytes processados e memória"""
+    html_content = gerar_html(TAMANHOS[nome_tamanho], estilo, termo)
+    searcher = TextSearcher(modo=modo)
+    silencio = io.StringIO()
+
+    # Preparação fora da medição: a entrada de cada operação
+    tamanho_bytes = len(html_content.encode('utf-8'))
+    if operacao == 'relatorio':
+        with contextlib.redirect_stdout(silencio):
+            resultados, _ = searcher.buscar_texto_na_pagina(html_content, termo)
+    elif operacao in ('contexto', 'elemento'):
+        # Offsets das ocorrências no documento inteiro, como a busca entrega a essas etapas
+        automato = searcher.criar_buscador([termo])
+        spans = [(inicio, fim) for inicio, fim, _ in automato.buscar(html_content)]
+
+    def executar():
+        if operacao == 'busca':
+            with contextlib.redirect_stdout(silencio):
+                ocorrencias, _ = searcher.buscar_texto_na_pagina(html_content, termo)
+            return tamanho_bytes, len(ocorrencias)
+        if operacao == 'contexto':
+            return tamanho_bytes, len(searcher.destacar_ocorrencias(html_content, spans))
+        if operacao == 'elemento':
+            return tamanho_bytes, len(classificar_ocorrencias(searcher, html_content, spans))
+        destino = io.BytesIO()
+        escritor = EscritorResultados(searcher, destino)
+        escritor.escrever_relatorio(resultados, termo, 'benchmark://corpus')
+        # No relatório a vazão é medida sobre os bytes gravados
+        return escritor.bytes_escritos, len(resultados)
+
+    rss_antes = rss_atual_kb()
+    tempos = []
+    for _ in range(repeticoes):
+        execucoes = 0
+        inicio = time.perf_counter()
+        while True:
+            silencio.seek(0)
+            silencio.truncate()
+            bytes_processados, itens = executar()
+            execucoes += 1
+            decorrido = time.perf_counter() - inicio
+            if decorrido >= TEMPO_MINIMO:
+                break
+        tempos.append(decorrido / execucoes)
+
+    pico = pico_rss_kb()
+    return {
+        'tamanho': nome_tamanho,
+        'estilo': estilo,
+        'operacao': operacao,
+        'bytes': bytes_processados,
+        'itens': itens,
+        # O melhor tempo é o menos afetado por ruído do sistema
+        'segundos': min(tempos),
+        'mb_s': bytes_processados / (1024 ** 2) / min(tempos) if min(tempos) > 0 else float('inf'),
+        'pico_rss_kb': pico,
+        'acrescimo_rss_kb': max(0, pico - rss_antes) if pico is not None and rss_antes is not None else None,
+    }
+
+
+def classificar_ocorrencias(searcher, html_content, spans):
+    """Indexa as tags do documento e classifica o elemento de cada ocorrência"""
+    indice_html = IndiceHTML(html_content)
+    tipos = []
+    for inicio, _ in spans:
+        indice_elemento = indice_html.elemento_em(inicio)
+        tipos.append(searcher.classificar_tag(indice_html.nomes[indice_elemento])
+                     if indice_elemento >= 0 else "Texto/Conteúdo")
+    return tipos
+
+
+def executar_em_subprocesso(nome_tamanho, estilo, operacao, args):
+    """Roda um caso em um processo novo e lê o resultado em JSON da saída padrão"""
+    comando = [sys.executable, __file__, '--caso', nome_tamanho, estilo, operacao,
+               '--termo', args.termo, '--modo', args.modo, '--repeticoes', str(args.repeticoes)]
+    processo = subprocess.run(comando, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else 'falha no caso')
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def formatar_kb(valor):
+    if valor is None:
+        return 'n/d'
+    return f"{valor / 1024:.1f} MB"
+
+
+def exibir_tabela(resultados):
+    print(f"\n{Fore.CYAN}{'='*92}")
+    print(f"{Fore.CYAN}{'Tamanho':<8} {'Estilo':<11} {'Operação':<10} {'Tempo (s)':>10} {'MB/s':>10} "
+          f"{'Itens':>9} {'Pico RSS':>12} {'Acréscimo':>12}")
+    print(f"{Fore.CYAN}{'='*92}")
+    for r in resultados:
+        print(f"{Fore.WHITE}{r['tamanho']:<8} {r['estilo']:<11} {r['operacao']:<10} {r['segundos']:>10.4f} "
+              f"{Fore.GREEN}{r['mb_s']:>10.2f} {Fore.WHITE}{r['itens']:>9} "
+              f"{formatar_kb(r['pico_rss_kb']):>12} {formatar_kb(r['acrescimo_rss_kb']):>12}")
+    print(f"{Fore.CYAN}{'='*92}")
+    print(f"{Fore.WHITE}MB/s: HTML de entrada (busca, contexto, elemento) ou bytes gravados (relatório).")
+
+
+def comparar(resultados, caminho_base, tolerancia):
+    """Compara a vazão com uma execução anterior; retorna o número de regressões"""
+    with open(caminho_base, 'r', encoding='utf-8') as arquivo:
+        base = {(r['tamanho'], r['estilo'], r['operacao']): r for r in json.load(arquivo)['resultados']}
+
+    regressoes = 0
+    print(f"\n{Fore.MAGENTA}📊 Comparação com {caminho_base} (tolerância de {tolerancia:.0%}):")
+    for r in resultados:
+        anterior = base.get((r['tamanho'], r['estilo'], r['operacao']))
+        if not anterior:
+            continue
+        variacao = r['mb_s'] / anterior['mb_s'] - 1
+        if variacao < -tolerancia:
+            regressoes += 1
+            print(f"{Fore.RED}❌ {r['tamanho']} {r['estilo']} {r['operacao']}: "
+                  f"{anterior['mb_s']:.2f} → {r['mb_s']:.2f} MB/s ({variacao:+.0%})")
+        else:
+            print(f"{Fore.GREEN}✅ {r['tamanho']} {r['estilo']} {r['operacao']}: {variacao:+.0%}")
+    return regressoes
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark offline do TextSearcher sobre HTML sintético"
+    )
+    parser.add_argument('--tamanhos', nargs='+', choices=TAMANHOS, default=list(TAMANHOS),
+                        help="Tamanhos do corpus (padrão: todos)")
+    parser.add_argument('--estilos', nargs='+', choices=ESTILOS, default=list(ESTILOS),
+                        help="HTML indentado e/ou minificado (padrão: ambos)")
+    parser.add_argument('--operacoes', nargs='+', choices=OPERACOES, default=list(OPERACOES),
+                        help="Etapas medidas (padrão: todas)")
+    parser.add_argument('--termo', default=TERMO_PADRAO, help=f"Termo buscado (padrão: {TERMO_PADRAO})")
+    parser.add_argument('--modo', choices=('exato', 'regex', 'aproximado'), default='exato',
+                        help="Modo de busca do TextSearcher (padrão: exato)")
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help="Medições por caso; vale o melhor tempo (padrão: 3)")
+    parser.add_argument('--salvar', metavar='ARQUIVO', help="Grava os resultados em JSON (linha de base)")
+    parser.add_argument('--comparar', metavar='ARQUIVO',
+                        help="Compara com uma linha de base e sai com código 1 se houver regressão")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help=f"Queda de vazão tolerada no --comparar (padrão: {TOLERANCIA_PADRAO})")
+    # Uso interno: execução de um único caso no processo filho
+    parser.add_argument('--caso', nargs=3, help=argparse.SUPPRESS)
+    return parser
+
+
+def main():
+    args = criar_parser().parse_args()
+
+    if args.caso:
+        nome_tamanho, estilo, operacao = args.caso
+        print(json.dumps(medir_caso(nome_tamanho, estilo, operacao, args.termo, args.modo, args.repeticoes)))
+        return
+
+    print(f"{Fore.BLUE}⏱️  Benchmark do TextSearcher (termo '{args.termo}', modo {args.modo}, "
+          f"melhor de {args.repeticoes})")
+    resultados = []
+    for nome_tamanho in args.tamanhos:
+        for estilo in args.estilos:
+            for operacao in args.operacoes:
+                print(f"{Fore.WHITE}• {nome_tamanho} {estilo} {operacao}...", flush=True)
+                try:
+                    resultados.append(executar_em_subprocesso(nome_tamanho, estilo, operacao, args))
+                except RuntimeError as e:
+                    print(f"{Fore.RED}❌ {e}")
+
+    exibir_tabela(resultados)
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as arquivo:
+            json.dump({'python': sys.version.split()[0], 'termo': args.termo, 'modo': args.modo,
+                       'resultados': resultados}, arquivo, ensure_ascii=False, indent=2)
+        print(f"{Fore.GREEN}💾 Resultados salvos em: {args.salvar}")
+
+    if args.comparar and comparar(resultados, args.comparar, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
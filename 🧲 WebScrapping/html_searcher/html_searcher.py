@@ -5,22 +5,891 @@ Script de Busca de Texto em Páginas Web
 Permite buscar texto específico na estrutura HTML de qualquer página web
 """
 import requests
-from bs4 import BeautifulSoup
 import sys
 import re
+import codecs
+import argparse
+import threading
+import hashlib
+import json
+import os
+import time
+import csv
+import datetime
+import mmap
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 from colorama import Fore, Style, init
 
 # Inicializar colorama para Windows
 init(autoreset=True)
 
-class TextSearcher:
+# Caracteres exibidos antes e depois de cada ocorrência no contexto
+TAMANHO_CONTEXTO = 30
+
+# Caracteres do elemento guardados em cada resultado (o HTML completo nunca é copiado)
+TAMANHO_TRECHO = 120
+
+# Tipo de elemento exibido para cada tag HTML
+TIPOS_ELEMENTO = {
+    **{f'h{nivel}': "Cabeçalho" for nivel in range(1, 7)},
+    'p': "Parágrafo",
+    'a': "Link",
+    'div': "Div",
+    'span': "Span",
+    'title': "Título da Página",
+    'meta': "Meta Tag",
+    'img': "Imagem",
+    'script': "Script",
+    'style': "CSS/Style",
+}
+
+# Elementos sem conteúdo nem tag de fechamento
+ELEMENTOS_VAZIOS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+# Elementos cujo conteúdo é texto bruto (pode conter '<' sem ser tag)
+ELEMENTOS_TEXTO_BRUTO = {'script', 'style'}
+
+REGEX_TAG = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9:-]*)[^>]*>?')
+
+# Tamanho de cada bloco lido no modo streaming (bytes)
+TAMANHO_BLOCO_STREAM = 64 * 1024
+
+# Modo lote: threads simultâneas no total e requisições simultâneas por host
+MAX_WORKERS_LOTE = 16
+LIMITE_POR_HOST = 4
+
+# Modo monitoramento: intervalo padrão entre verificações (segundos)
+INTERVALO_MONITORAMENTO = 300
+
+# Modo diretório: extensões analisadas e arquivos enviados por vez a cada processo
+EXTENSOES_HTML = ('.html', '.htm')
+ARQUIVOS_POR_TAREFA = 8
+
+REGEX_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([a-zA-Z0-9_-]+)', re.IGNORECASE)
+
+# Diretório padrão do cache de respostas HTTP
+DIRETORIO_CACHE = '.cache_html_searcher'
+
+# Tags incompletas maiores que isso no fim de um bloco são descartadas em vez de acumuladas
+LIMITE_TAG_INCOMPLETA = 4096
+
+# Modos de busca: texto exato, expressão regular ou aproximada (distância de edição)
+MODOS_BUSCA = ('exato', 'regex', 'aproximado')
+MAX_ERROS_PADRAO = 1
+
+# Modo regex em blocos: caracteres do bloco anterior revistos para achar ocorrências na divisa
+SOBREPOSICAO_REGEX = 1024
+
+
+class Buscador(ABC):
+    """Base dos buscadores: termos, normalização de caixa e contagem
+    
+    Todo buscador gera (início, fim, índice do termo) com buscar(texto) e oferece
+    iniciar_busca() para receber o texto em blocos. O atributo alcance limita o
+    tamanho de uma ocorrência (usado para decidir quanto texto manter entre blocos).
+    """
+
+    # Buscadores incrementais mantêm estado entre blocos sem reprocessar texto
+    incremental = False
+
+    def __init__(self, termos, case_sensitive=False):
+        # Remove termos vazios e duplicados preservando a ordem original
+        self.termos = list(dict.fromkeys(termo for termo in termos if termo))
+        self.case_sensitive = case_sensitive
+        self.alcance = max((len(termo) for termo in self.termos), default=0)
+
+    def normalizar(self, texto):
+        """Aplica a normalização de caixa preservando o tamanho do texto (offsets continuam válidos)"""
+        if self.case_sensitive:
+            return texto
+        texto_lower = texto.lower()
+        if len(texto_lower) == len(texto):
+            return texto_lower
+        # Alguns caracteres (ex.: 'İ') mudam de tamanho ao converter; esses são mantidos como estão
+        return ''.join(c.lower() if len(c.lower()) == 1 else c for c in texto)
+
+    @abstractmethod
+    def buscar(self, texto, inicios=None):
+        """Gera (início, fim, índice do termo) das ocorrências no texto, ordenadas pelo fim
+        
+        inicios (opcional, alinhado com self.termos) indica a posição a partir da qual cada termo
+        é buscado, para continuar uma busca anterior sem repetir nem sobrepor ocorrências.
+        """
+
+    def iniciar_busca(self):
+        """Busca em blocos revendo o fim do bloco anterior (para buscadores sem estado)"""
+        return BuscaPorJanela(self, self.alcance)
+
+    def contar(self, texto):
+        """Conta as ocorrências de cada termo no texto (lista alinhada com self.termos)"""
+        contagens = [0] * len(self.termos)
+        for _, _, indice in self.buscar(texto):
+            contagens[indice] += 1
+        return contagens
+
+
+class AhoCorasick(Buscador):
+    """Autômato de Aho-Corasick: localiza vários termos em uma única varredura do texto"""
+
+    incremental = True
+
+    def __init__(self, termos, case_sensitive=False):
+        super().__init__(termos, case_sensitive)
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saidas = [[]]
+
+        for indice, termo in enumerate(self.termos):
+            self._adicionar(self.normalizar(termo), indice)
+        self._construir_falhas()
+
+    def _adicionar(self, termo, indice):
+        """Insere um termo na trie"""
+        estado = 0
+        for caractere in termo:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes[estado][caractere] = proximo
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+            estado = proximo
+        self._saidas[estado].append((indice, len(termo)))
+
+    def _construir_falhas(self):
+        """Calcula os links de falha em largura e propaga as saídas"""
+        fila = list(self._transicoes[0].values())
+        for estado in fila:
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                self._falha[proximo] = self._transicoes[falha].get(caractere, 0)
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[self._falha[proximo]]
+
+    def buscar(self, texto, inicios=None):
+        """Gera (início, fim, índice do termo) sem sobreposição entre ocorrências do mesmo termo"""
+        busca = self.iniciar_busca()
+        if inicios:
+            busca.ultimo_fim = list(inicios)
+        return busca.alimentar(texto)
+
+    def iniciar_busca(self):
+        """Cria uma busca incremental que mantém o estado do autômato entre blocos de texto"""
+        return BuscaIncremental(self)
+
+
+class BuscadorRegex(Buscador):
+    """Cada termo é uma expressão regular, compilada uma única vez"""
+
+    def __init__(self, termos, case_sensitive=False):
+        super().__init__(termos, case_sensitive)
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            self.padroes = [re.compile(termo, flags) for termo in self.termos]
+        except re.error as e:
+            raise ValueError(f"Expressão regular inválida: {e}") from e
+        self.alcance = SOBREPOSICAO_REGEX
+
+    def buscar(self, texto, inicios=None):
+        """Ocorrências de todos os padrões, ordenadas pelo fim (ocorrências vazias são ignoradas)"""
+        ocorrencias = [
+            (match.start(), match.end(), indice)
+            for indice, padrao in enumerate(self.padroes)
+            for match in padrao.finditer(texto, inicios[indice] if inicios else 0)
+            if match.end() > match.start()
+        ]
+        if len(self.padroes) > 1:
+            ocorrencias.sort(key=lambda ocorrencia: (ocorrencia[1], ocorrencia[0]))
+        return iter(ocorrencias)
+
+
+class BuscadorAproximado(Buscador):
+    """Busca tolerante a erros de digitação: até max_erros inserções, remoções ou trocas
+    
+    Usa o algoritmo bit-paralelo de Wu-Manber (bitap com k erros). Para não percorrer
+    o texto inteiro caractere a caractere, cada termo é dividido em max_erros + 1 pedaços:
+    toda ocorrência aproximada contém ao menos um pedaço exato, então um Aho-Corasick
+    sobre os pedaços encontra as regiões candidatas e o bitap roda só nelas.
+    """
+
+    def __init__(self, termos, case_sensitive=False, max_erros=MAX_ERROS_PADRAO):
+        super().__init__(termos, case_sensitive)
+        # Com max_erros >= tamanho do termo, qualquer caractere isolado seria uma ocorrência
+        curtos = [termo for termo in self.termos if len(termo) <= max_erros]
+        if max_erros < 0 or curtos:
+            raise ValueError(f"max_erros ({max_erros}) deve ser entre 0 e o tamanho do menor termo menos 1"
+                             + (f" ('{curtos[0]}' tem {len(curtos[0])} caractere(s))" if curtos else ""))
+        self.max_erros = max_erros
+        self.alcance += max_erros
+        self._termos_normalizados = [self.normalizar(termo) for termo in self.termos]
+        self._mascaras = [self._criar_mascaras(termo) for termo in self._termos_normalizados]
+
+        # Pedaços de cada termo: (texto do pedaço, índice do termo, deslocamento no termo)
+        self._pedacos = {}
+        self._sem_filtro = []
+        for indice, termo in enumerate(self._termos_normalizados):
+            tamanho_pedaco = len(termo) // (max_erros + 1)
+            if tamanho_pedaco == 0:
+                # Termo curto demais para o filtro: varre o texto inteiro
+                self._sem_filtro.append(indice)
+                continue
+            for parte in range(max_erros + 1):
+                deslocamento = parte * tamanho_pedaco
+                fim = len(termo) if parte == max_erros else deslocamento + tamanho_pedaco
+                self._pedacos.setdefault(termo[deslocamento:fim], []).append((indice, deslocamento))
+        self._filtro = AhoCorasick(list(self._pedacos), case_sensitive=True)
+
+    def _criar_mascaras(self, termo):
+        mascaras = {}
+        for posicao, caractere in enumerate(termo):
+            mascaras[caractere] = mascaras.get(caractere, 0) | (1 << posicao)
+        return mascaras
+
+    def buscar(self, texto, inicios=None):
+        """Ocorrências aproximadas de todos os termos, ordenadas pelo fim"""
+        texto_normalizado = self.normalizar(texto)
+        regioes = [[] for _ in self.termos]
+
+        for indice in self._sem_filtro:
+            regioes[indice].append((0, len(texto)))
+        for inicio, _, indice_pedaco in self._candidatos(texto_normalizado):
+            pedaco = self._filtro.termos[indice_pedaco]
+            for indice, deslocamento in self._pedacos[pedaco]:
+                tamanho = len(self._termos_normalizados[indice])
+                regioes[indice].append((max(0, inicio - deslocamento - self.max_erros),
+                                        min(len(texto), inicio - deslocamento + tamanho + self.max_erros)))
+
+        ocorrencias = []
+        for indice, regioes_termo in enumerate(regioes):
+            ultimo_fim = inicios[indice] if inicios else 0
+            for inicio, fim in self._unir_regioes(regioes_termo):
+                for ocorrencia in self._bitap(texto_normalizado, indice, max(inicio, ultimo_fim), fim):
+                    ocorrencias.append(ocorrencia)
+                    ultimo_fim = ocorrencia[1]
+        ocorrencias.sort(key=lambda ocorrencia: (ocorrencia[1], ocorrencia[0]))
+        return iter(ocorrencias)
+
+    def _candidatos(self, texto_normalizado):
+        """Ocorrências exatas dos pedaços, incluindo as sobrepostas"""
+        busca = self._filtro.iniciar_busca()
+        busca.sobrepor = True
+        return busca.alimentar(texto_normalizado)
+
+    def _unir_regioes(self, regioes):
+        """Ordena e une regiões candidatas que se sobrepõem"""
+        unidas = []
+        for inicio, fim in sorted(regioes):
+            if unidas and inicio <= unidas[-1][1]:
+                unidas[-1][1] = max(unidas[-1][1], fim)
+            else:
+                unidas.append([inicio, fim])
+        return unidas
+
+    def _bitap(self, texto, indice, inicio, fim):
+        """Wu-Manber sobre texto[inicio:fim]; gera a melhor ocorrência de cada grupo de finais próximos"""
+        termo = self._termos_normalizados[indice]
+        mascaras = self._mascaras[indice]
+        k = self.max_erros
+        aceita = 1 << (len(termo) - 1)
+        estados = [(1 << erros) - 1 for erros in range(k + 1)]
+        melhor = None
+        # Ocorrências do mesmo termo não se sobrepõem: nenhuma começa antes do fim da anterior
+        limite_inicio = inicio
+        posicao = inicio
+
+        while posicao < fim:
+            mascara = mascaras.get(texto[posicao], 0)
+            anterior = estados[0]
+            estados[0] = ((anterior << 1) | 1) & mascara
+            for erros in range(1, k + 1):
+                atual = estados[erros]
+                # casamento | troca | inserção no texto | remoção no texto
+                estados[erros] = ((((atual << 1) | 1) & mascara) | (anterior << 1) | 1
+                                  | anterior | (estados[erros - 1] << 1))
+                anterior = atual
+            posicao += 1
+
+            erros_aqui = next((erros for erros in range(k + 1) if estados[erros] & aceita), None)
+            if erros_aqui is not None:
+                if melhor is None or erros_aqui < melhor[0]:
+                    melhor = (erros_aqui, posicao)
+            elif melhor is not None:
+                yield self._delimitar(texto, termo, melhor[1], limite_inicio), melhor[1], indice
+                # Recomeça logo após a ocorrência (os caracteres já lidos depois dela podem iniciar outra)
+                limite_inicio = posicao = melhor[1]
+                melhor = None
+                estados = [(1 << erros) - 1 for erros in range(k + 1)]
+
+        if melhor is not None:
+            yield self._delimitar(texto, termo, melhor[1], limite_inicio), melhor[1], indice
+
+    def _delimitar(self, texto, termo, fim, limite_inicio=0):
+        """Encontra o início (a partir de limite_inicio) que minimiza a distância de edição para uma ocorrência terminada em fim"""
+        inicio_trecho = max(limite_inicio, fim - len(termo) - self.max_erros)
+        trecho = texto[inicio_trecho:fim][::-1]
+        termo_invertido = termo[::-1]
+
+        # Programação dinâmica sobre as strings invertidas: prefixos do trecho contra o termo
+        linha = list(range(len(trecho) + 1))
+        for i, caractere in enumerate(termo_invertido, 1):
+            nova = [i]
+            for j, outro in enumerate(trecho, 1):
+                nova.append(min(linha[j] + 1, nova[j - 1] + 1, linha[j - 1] + (caractere != outro)))
+            linha = nova
+
+        tamanho = min(range(len(linha)), key=lambda j: (linha[j], abs(j - len(termo))))
+        return fim - tamanho
+
+
+class BuscaPorJanela:
+    """Busca em blocos para buscadores sem estado: cada bloco é buscado junto com o fim do anterior
+    
+    Ocorrências que terminam nos últimos `sobreposicao` caracteres ainda podem crescer ou mudar
+    com o próximo bloco: ficam retidas e são reavaliadas na chamada seguinte (ou em finalizar()).
+    """
+
+    def __init__(self, buscador, sobreposicao):
+        self.buscador = buscador
+        self.sobreposicao = sobreposicao
+        self._cauda = ''
+        self._inicio_cauda = 0
+        self._reportado_ate = [0] * len(buscador.termos)
+
+    @property
+    def inicio_retido(self):
+        """Nenhuma ocorrência ainda não reportada começa antes deste offset"""
+        return self._inicio_cauda
+
+    def alimentar(self, bloco):
+        texto = self._cauda + bloco
+        base = self._inicio_cauda
+        limite = len(texto) - self.sobreposicao
+        retidas = []
+
+        # Cada termo continua de onde terminou a última ocorrência reportada
+        inicios = [max(0, reportado - base) for reportado in self._reportado_ate]
+        for inicio, fim, indice in self.buscador.buscar(texto, inicios):
+            if fim > limite:
+                retidas.append(inicio)
+                continue
+            self._reportado_ate[indice] = base + fim
+            yield base + inicio, base + fim, indice
+
+        # A cauda guarda a sobreposição e o início das ocorrências retidas (limitada a duas
+        # sobreposições: ocorrências maiores que o alcance do buscador não são garantidas)
+        corte = max(0, min([limite] + retidas), len(texto) - 2 * self.sobreposicao)
+        self._cauda = texto[corte:]
+        self._inicio_cauda = base + corte
+
+    def finalizar(self):
+        """Fim do texto: reporta as ocorrências que estavam retidas"""
+        base = self._inicio_cauda
+        inicios = [max(0, reportado - base) for reportado in self._reportado_ate]
+        for inicio, fim, indice in self.buscador.buscar(self._cauda, inicios):
+            self._reportado_ate[indice] = base + fim
+            yield base + inicio, base + fim, indice
+        self._inicio_cauda = base + len(self._cauda)
+        self._cauda = ''
+
+
+@lru_cache(maxsize=32)
+def _compilar_buscador(termos, case_sensitive, modo, max_erros):
+    if modo == 'regex':
+        return BuscadorRegex(termos, case_sensitive)
+    if modo == 'aproximado':
+        return BuscadorAproximado(termos, case_sensitive, max_erros)
+    return AhoCorasick(termos, case_sensitive)
+
+
+@lru_cache(maxsize=256)
+def _compilar_literal(texto, flags):
+    return re.compile(re.escape(texto), flags)
+
+
+def criar_buscador(termos, case_sensitive=False, modo='exato', max_erros=MAX_ERROS_PADRAO):
+    """Retorna o buscador dos termos, compilado uma única vez e reaproveitado entre páginas"""
+    if modo not in MODOS_BUSCA:
+        raise ValueError(f"Modo de busca inválido: {modo}")
+    return _compilar_buscador(tuple(termos), case_sensitive, modo, max_erros)
+
+
+class BuscaIncremental:
+    """Estado de uma varredura do autômato que pode receber o texto em vários blocos"""
+
+    def __init__(self, automato):
+        self.automato = automato
+        self.estado = 0
+        self.posicao = 0
+        self.ultimo_fim = [0] * len(automato.termos)
+        # Com sobrepor=True todas as ocorrências são geradas, mesmo as sobrepostas
+        self.sobrepor = False
+
+    def alimentar(self, bloco):
+        """Processa o próximo bloco; offsets são relativos ao início do primeiro bloco"""
+        transicoes, falha, saidas = self.automato._transicoes, self.automato._falha, self.automato._saidas
+        ultimo_fim = self.ultimo_fim
+        sobrepor = self.sobrepor
+        estado = self.estado
+        base = self.posicao + 1
+
+        for posicao, caractere in enumerate(self.automato.normalizar(bloco), base):
+            while estado and caractere not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(caractere, 0)
+
+            for indice, tamanho in saidas[estado]:
+                inicio = posicao - tamanho
+                # Mesmo comportamento de re.finditer/str.count: ocorrências não se sobrepõem
+                if sobrepor or inicio >= ultimo_fim[indice]:
+                    ultimo_fim[indice] = posicao
+                    yield inicio, posicao, indice
+
+        self.estado = estado
+        self.posicao = base - 1 + len(bloco)
+
+    def finalizar(self):
+        """O autômato reporta cada ocorrência assim que ela termina: nada fica retido"""
+        return iter(())
+
+    @property
+    def inicio_retido(self):
+        """Nenhuma ocorrência ainda não reportada começa antes deste offset"""
+        return max(0, self.posicao - self.automato.alcance + 1)
+
+
+class ExtratorTextoVisivel(HTMLParser):
+    """Extrai o texto visível em fluxo (sem montar a árvore do documento), ignorando script e style
+    
+    Recebe o HTML em blocos via feed() e conta as ocorrências de cada termo do autômato
+    à medida que o texto aparece; opcionalmente guarda o texto para o cache.
+    """
+
+    def __init__(self, automato, guardar_texto=False):
+        super().__init__(convert_charrefs=True)
+        self.busca = automato.iniciar_busca()
+        self.contagens = [0] * len(automato.termos)
+        self._partes = [] if guardar_texto else None
+        self._ignorando = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ELEMENTOS_TEXTO_BRUTO:
+            self._ignorando += 1
+
+    def handle_endtag(self, tag):
+        if tag in ELEMENTOS_TEXTO_BRUTO and self._ignorando:
+            self._ignorando -= 1
+
+    def handle_data(self, data):
+        if self._ignorando:
+            return
+        if self._partes is not None:
+            self._partes.append(data)
+        # O estado do autômato continua entre trechos: "<b>Py</b>thon" conta como "Python"
+        for _, _, indice in self.busca.alimentar(data):
+            self.contagens[indice] += 1
+
+    def finalizar(self):
+        """Processa o texto pendente e retorna as contagens (alinhadas com automato.termos)"""
+        self.close()
+        for _, _, indice in self.busca.finalizar():
+            self.contagens[indice] += 1
+        return self.contagens
+
+    def texto(self):
+        """Texto visível acumulado (somente com guardar_texto=True)"""
+        return ''.join(self._partes or [])
+
+
+class IndiceHTML:
+    """Índice de posições de um documento HTML: limites de tags, elemento envolvente e linha/coluna"""
+
+    def __init__(self, html_content):
+        self.html = html_content
+        # Listas paralelas, uma entrada por tag de abertura (em ordem de posição)
+        self.inicios = []
+        self.fins_tag = []
+        self.fins_elemento = []
+        self.nomes = []
+        self.pais = []
+        self._indexar_tags()
+        # Cursor para converter offsets em linhas sem guardar a posição de cada quebra de linha
+        self._cursor_posicao = 0
+        self._cursor_linha = 1
+        self._cursor_quebra = -1
+
+    def _indexar_tags(self):
+        """Percorre o HTML uma vez montando a árvore de elementos como listas de offsets"""
+        html = self.html
+        pilha = []
+        posicao = 0
+
+        while True:
+            match = REGEX_TAG.search(html, posicao)
+            if not match:
+                break
+            nome = match.group(2).lower()
+            posicao = match.end()
+
+            if match.group(1):
+                # Tag de fechamento: fecha o elemento correspondente e os que ficaram abertos dentro dele
+                if nome in (self.nomes[i] for i in pilha):
+                    while pilha:
+                        indice = pilha.pop()
+                        self.fins_elemento[indice] = posicao if self.nomes[indice] == nome else match.start()
+                        if self.nomes[indice] == nome:
+                            break
+                continue
+
+            indice = len(self.inicios)
+            self.inicios.append(match.start())
+            self.fins_tag.append(posicao)
+            self.nomes.append(nome)
+            self.pais.append(pilha[-1] if pilha else -1)
+
+            if nome in ELEMENTOS_VAZIOS or match.group(0).endswith('/>'):
+                self.fins_elemento.append(posicao)
+                continue
+
+            self.fins_elemento.append(len(html))
+            pilha.append(indice)
+
+            # Conteúdo de script/style não é HTML: pula direto para a tag de fechamento
+            if nome in ELEMENTOS_TEXTO_BRUTO:
+                fechamento = re.compile(rf'</{nome}\s*>', re.IGNORECASE).search(html, posicao)
+                posicao = fechamento.start() if fechamento else len(html)
+
+    def elemento_em(self, posicao):
+        """Retorna o índice do elemento mais interno que contém a posição (ou -1)"""
+        indice = bisect_right(self.inicios, posicao) - 1
+        while indice >= 0 and self.fins_elemento[indice] <= posicao:
+            indice = self.pais[indice]
+        return indice
+
+    def trecho(self, indice_elemento):
+        """Início do código HTML do elemento, limitado a TAMANHO_TRECHO caracteres"""
+        inicio = self.inicios[indice_elemento]
+        return self.html[inicio:inicio + TAMANHO_TRECHO]
+
+    def linha_coluna(self, posicao):
+        """Converte um offset em (linha, coluna), ambos a partir de 1"""
+        if posicao < self._cursor_posicao:
+            self._cursor_posicao, self._cursor_linha, self._cursor_quebra = 0, 1, -1
+        self._cursor_linha += self.html.count('\n', self._cursor_posicao, posicao)
+        # Só o trecho desde o cursor é procurado: sem quebras nele (ex.: HTML minificado), vale a última conhecida
+        quebra = self.html.rfind('\n', self._cursor_posicao, posicao)
+        if quebra != -1:
+            self._cursor_quebra = quebra
+        self._cursor_posicao = posicao
+        return self._cursor_linha, posicao - self._cursor_quebra
+
+
+class RastreadorTags:
+    """Acompanha a pilha de elementos abertos enquanto o HTML chega em blocos
+    
+    Lê as tags direto da JanelaStream (uma tag ou trecho cortado entre blocos é lido inteiro
+    quando o resto chega) e responde com o mesmo critério do IndiceHTML.elemento_em.
+    """
+
     def __init__(self):
+        # (tag, trecho) dos elementos abertos
+        self.pilha = []
+        # Offset global até onde as tags já foram aplicadas à pilha
+        self.posicao = 0
+        self._texto_bruto = None
+        # Próxima tag já lida e offset a partir do qual a próxima busca recomeça
+        self._proxima = None
+        self._busca_desde = 0
+
+    def localizar(self, janela, consultas, final=False):
+        """(tag, trecho) do elemento em cada posição consultada (em ordem crescente), ou None fora de elementos
+        
+        Responde só as consultas que o texto recebido já permite; as seguintes dependem de uma
+        tag ainda incompleta e devem ser repetidas depois (final=True responde todas).
+        """
+        respostas = []
+        for consulta in consultas:
+            pronta, resposta = self._localizar(janela, consulta, final)
+            if not pronta:
+                break
+            respostas.append(resposta)
+        return respostas
+
+    def _localizar(self, janela, consulta, final):
+        while True:
+            evento = self._proxima_tag(janela, final)
+            if evento is False or (evento is None and not final):
+                # A tag seguinte ainda não chegou inteira: só responde antes do início dela
+                if consulta >= self._busca_desde:
+                    return False, None
+                evento = None
+
+            if evento is None or evento[0] > consulta:
+                return True, self.pilha[-1] if self.pilha else None
+
+            inicio, fim, nome, fechamento, trecho, auto_fechada = evento
+            if fim > consulta:
+                # A posição está dentro da própria tag (ex.: em um atributo)
+                if not fechamento:
+                    return True, (nome, trecho)
+                # Na tag de fechamento, o elemento é o que ela fecha
+                abertos = [aberto for aberto in self.pilha if aberto[0] == nome]
+                return True, abertos[-1] if abertos else (self.pilha[-1] if self.pilha else None)
+
+            self._aplicar(evento)
+            self.posicao = self._busca_desde = fim
+            self._proxima = None
+            if not fechamento and not auto_fechada and nome in ELEMENTOS_TEXTO_BRUTO:
+                self._texto_bruto = nome
+
+    def _proxima_tag(self, janela, final):
+        """Próxima tag a partir de self.posicao: (início, fim, tag, fechamento, trecho, auto_fechada),
+        None se não há tag no texto recebido ou False se ela (ou o trecho dela) ainda está incompleta"""
+        if self._proxima:
+            return self._proxima
+
+        texto = janela.texto
+        fim_janela = janela.inicio + len(texto)
+        desde = self._busca_desde - janela.inicio
+
+        if self._texto_bruto:
+            # Conteúdo de script/style não é HTML: pula direto para a tag de fechamento
+            fechamento = re.compile(rf'</{self._texto_bruto}\s*>', re.IGNORECASE).search(texto, desde)
+            if not fechamento:
+                # Guarda só o suficiente para reconhecer a tag de fechamento cortada entre blocos
+                self._busca_desde = max(self.posicao, fim_janela - len(self._texto_bruto) - 8)
+                return None
+            self._texto_bruto = None
+            desde = fechamento.start()
+            self.posicao = self._busca_desde = janela.inicio + desde
+
+        match = REGEX_TAG.search(texto, desde)
+        if not match:
+            # Um '<' no fim do texto ainda pode começar uma tag
+            self._busca_desde = max(self.posicao, fim_janela - 1)
+            return None
+
+        inicio = janela.inicio + match.start()
+        fechamento = bool(match.group(1))
+        incompleta = not match.group(0).endswith('>') and fim_janela - inicio < LIMITE_TAG_INCOMPLETA
+        sem_trecho = not fechamento and inicio + TAMANHO_TRECHO > fim_janela
+        if not final and (incompleta or sem_trecho):
+            self._busca_desde = inicio
+            return False
+
+        self._proxima = (inicio, janela.inicio + match.end(), match.group(2).lower(), fechamento,
+                         texto[match.start():match.start() + TAMANHO_TRECHO], match.group(0).endswith('/>'))
+        return self._proxima
+
+    def _aplicar(self, evento):
+        """Atualiza a pilha de elementos abertos com uma tag"""
+        _, _, nome, fechamento, trecho, auto_fechada = evento
+        if not fechamento:
+            if nome not in ELEMENTOS_VAZIOS and not auto_fechada:
+                self.pilha.append((nome, trecho))
+        elif any(aberto == nome for aberto, _ in self.pilha):
+            while self.pilha.pop()[0] != nome:
+                pass
+
+
+class JanelaStream:
+    """Janela deslizante sobre o texto recebido: recortes de contexto e linha/coluna sem guardar a página"""
+
+    def __init__(self):
+        self.texto = ''
+        self.inicio = 0
+        self._linhas_antes = 0
+        self._ultima_quebra = -1
+        # Cursor (posição relativa, linhas até ela, última quebra) para não recontar a janela a cada ocorrência
+        self._cursor = (0, 0, -1)
+
+    def adicionar(self, bloco):
+        self.texto += bloco
+
+    def descartar_ate(self, posicao):
+        """Remove da janela tudo antes da posição global informada"""
+        corte = posicao - self.inicio
+        if corte <= 0:
+            return
+        descartado = self.texto[:corte]
+        quebras = descartado.count('\n')
+        if quebras:
+            self._linhas_antes += quebras
+            self._ultima_quebra = self.inicio + descartado.rfind('\n')
+        self.texto = self.texto[corte:]
+        self.inicio = posicao
+        self._cursor = (0, 0, self._ultima_quebra)
+
+    def linha_coluna(self, posicao):
+        """Converte um offset global (dentro da janela) em (linha, coluna)"""
+        relativa = posicao - self.inicio
+        cursor, linhas, ultima_quebra = self._cursor if relativa >= self._cursor[0] else (0, 0, self._ultima_quebra)
+        linhas += self.texto.count('\n', cursor, relativa)
+        quebra = self.texto.rfind('\n', cursor, relativa)
+        if quebra != -1:
+            ultima_quebra = self.inicio + quebra
+        self._cursor = (relativa, linhas, ultima_quebra)
+        return self._linhas_antes + linhas + 1, posicao - ultima_quebra
+
+
+class CacheHTTP:
+    """Cache de respostas em disco, revalidado com If-None-Match / If-Modified-Since
+    
+    Cada URL ocupa até três arquivos nomeados pelo hash da URL: metadados (.json),
+    corpo da página (.html) e texto visível derivado (.txt).
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, url, extensao):
+        nome = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.diretorio, f"{nome}.{extensao}")
+
+    def _ler(self, caminho):
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _escrever(self, caminho, conteudo):
+        """Escrita atômica: leitores nunca veem um arquivo pela metade"""
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+    def metadados(self, url):
+        """Metadados da última resposta salva para a URL (ou None)"""
+        conteudo = self._ler(self._caminho(url, 'json'))
+        return json.loads(conteudo) if conteudo else None
+
+    def cabecalhos_condicionais(self, url):
+        """Cabeçalhos para revalidar a cópia em cache com o servidor"""
+        metadados = self.metadados(url)
+        if not metadados:
+            return {}
+        
+        cabecalhos = {}
+        if metadados.get('etag'):
+            cabecalhos['If-None-Match'] = metadados['etag']
+        if metadados.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = metadados['last_modified']
+        return cabecalhos
+
+    def corpo(self, url):
+        """Corpo da página em cache (ou None)"""
+        return self._ler(self._caminho(url, 'html'))
+
+    def salvar(self, url, response):
+        """Guarda uma resposta 200; o texto visível anterior deixa de valer"""
+        corpo = response.text
+        self._escrever(self._caminho(url, 'html'), corpo)
+        self._escrever(self._caminho(url, 'json'), json.dumps({
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('content-type', ''),
+            'hash_corpo': self._hash(corpo),
+            'salvo_em': time.time()
+        }))
+
+    def texto_visivel(self, url, html_content):
+        """Texto visível em cache, se foi derivado exatamente deste HTML"""
+        metadados = self.metadados(url)
+        if not metadados or metadados.get('hash_texto_visivel') != self._hash(html_content):
+            return None
+        return self._ler(self._caminho(url, 'txt'))
+
+    def salvar_texto_visivel(self, url, html_content, texto_visivel):
+        """Guarda o texto visível derivado do HTML informado"""
+        metadados = self.metadados(url)
+        if not metadados or metadados.get('hash_corpo') != self._hash(html_content):
+            return
+        self._escrever(self._caminho(url, 'txt'), texto_visivel)
+        metadados['hash_texto_visivel'] = metadados['hash_corpo']
+        self._escrever(self._caminho(url, 'json'), json.dumps(metadados))
+
+    def _hash(self, conteudo):
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+class EscritorResultados:
+    """Grava o relatório em uma única passada, contando os bytes à medida que escreve
+    
+    Formatos: 'txt' (relatório legível), 'ndjson' (um objeto JSON por ocorrência)
+    e 'csv' (uma linha por ocorrência), os dois últimos para uso em pipelines.
+    """
+
+    FORMATOS = ('txt', 'ndjson', 'csv')
+    CAMPOS = ('url', 'termo', 'linha', 'coluna', 'inicio', 'fim', 'elemento', 'tag', 'trecho', 'contexto')
+
+    def __init__(self, searcher, arquivo, formato='txt'):
+        self.searcher = searcher
+        self.arquivo = arquivo
+        self.formato = formato
+        self.bytes_escritos = 0
+        self._csv = None
+        if formato == 'csv':
+            # O próprio escritor serve de destino para o csv.writer (tem o método write)
+            self._csv = csv.writer(self, lineterminator='\n')
+            self._csv.writerow(self.CAMPOS)
+
+    def write(self, texto):
+        dados = texto.encode('utf-8')
+        self.arquivo.write(dados)
+        self.bytes_escritos += len(dados)
+
+    def escrever_relatorio(self, resultados, texto_busca, url):
+        """Escreve os resultados de uma URL (mesmos argumentos de TextSearcher.gerar_relatorio)"""
+        if self.formato == 'txt':
+            for trecho in self.searcher.gerar_relatorio(resultados, texto_busca, url):
+                self.write(trecho)
+            return
+        
+        if texto_busca is None:
+            resultados_por_termo = {termo: res for termo, (res, _) in resultados.items()}
+        else:
+            resultados_por_termo = {texto_busca: resultados}
+        
+        for termo, resultados_termo in resultados_por_termo.items():
+            for resultado in resultados_termo:
+                registro = {'url': url, 'termo': termo, **{campo: resultado.get(campo) for campo in self.CAMPOS[2:]}}
+                if self.formato == 'ndjson':
+                    self.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                else:
+                    self._csv.writerow([registro[campo] for campo in self.CAMPOS])
+
+    def separar(self):
+        """Separador entre URLs (apenas no relatório de texto)"""
+        if self.formato == 'txt':
+            self.write("\n" + "="*50 + "\n\n")
+
+
+class TextSearcher:
+    def __init__(self, diretorio_cache=None, modo='exato', max_erros=MAX_ERROS_PADRAO):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        self.cache = CacheHTTP(diretorio_cache) if diretorio_cache else None
+        self.modo = modo
+        self.max_erros = max_erros
     
     def solicitar_inputs(self):
         """Solicita URL e texto de busca do usuário"""
@@ -36,8 +905,8 @@ class TextSearcher:
                 break
             print(f"{Fore.RED}❌ URL inválida! Tente novamente.{Style.RESET_ALL}")
         
-        # Solicitar texto de busca
-        texto_busca = input(f"{Fore.YELLOW}Digite o texto a ser buscado: {Style.RESET_ALL}").strip()
+        # Solicitar texto de busca (ou @arquivo com uma lista de termos)
+        texto_busca = input(f"{Fore.YELLOW}Digite o texto a ser buscado (ou @arquivo.txt para vários termos): {Style.RESET_ALL}").strip()
         
         # Opções de busca
         print(f"\n{Fore.MAGENTA}Opções de busca:")
@@ -47,8 +916,41 @@ class TextSearcher:
         opcao = input(f"{Fore.YELLOW}Escolha uma opção (1 ou 2, padrão=2): {Style.RESET_ALL}").strip()
         case_sensitive = opcao == "1"
         
+        # Modo de busca
+        print(f"\n{Fore.MAGENTA}Modo de busca:")
+        print(f"{Fore.WHITE}1. Texto exato")
+        print(f"{Fore.WHITE}2. Expressão regular")
+        print(f"{Fore.WHITE}3. Aproximada (tolera {self.max_erros} erro(s) de digitação)")
+        
+        opcao = input(f"{Fore.YELLOW}Escolha uma opção (1, 2 ou 3, padrão=1): {Style.RESET_ALL}").strip()
+        self.modo = {'2': 'regex', '3': 'aproximado'}.get(opcao, 'exato')
+        
         return url, texto_busca, case_sensitive
     
+    def criar_buscador(self, termos, case_sensitive=False):
+        """Buscador dos termos no modo configurado (compilado uma vez por execução)"""
+        return criar_buscador(termos, case_sensitive, self.modo, self.max_erros)
+    
+    def carregar_termos(self, caminho):
+        """Lê um arquivo com um termo por linha (linhas vazias e iniciadas por # são ignoradas)"""
+        return self.ler_linhas(caminho)
+    
+    def carregar_urls(self, caminho):
+        """Lê um arquivo com uma URL por linha, descartando URLs inválidas"""
+        urls = []
+        for url in self.ler_linhas(caminho):
+            if self.validar_url(url):
+                urls.append(url)
+            else:
+                print(f"{Fore.YELLOW}⚠️  URL inválida ignorada: {url}")
+        return urls
+    
+    def ler_linhas(self, caminho):
+        """Lê as linhas não vazias de um arquivo, ignorando comentários (#)"""
+        with open(caminho, 'r', encoding='utf-8') as f:
+            linhas = [linha.strip() for linha in f]
+        return [linha for linha in linhas if linha and not linha.startswith('#')]
+    
     def validar_url(self, url):
         """Valida se a URL está no formato correto"""
         try:
@@ -61,82 +963,504 @@ class TextSearcher:
         """Faz a requisição HTTP e retorna o conteúdo da página"""
         try:
             print(f"\n{Fore.BLUE}🌐 Acessando a página...")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            response, html_content, do_cache = self.requisitar_pagina(url)
             
             # Verificar se é HTML
             content_type = response.headers.get('content-type', '').lower()
+            if do_cache:
+                content_type = self.cache.metadados(url).get('content_type', '').lower()
             if 'html' not in content_type:
                 print(f"{Fore.RED}⚠️  Aviso: Esta página pode não ser HTML puro.")
             
             # Verificar se é uma página dinâmica/SPA
-            self.verificar_pagina_dinamica(response.text, url)
+            self.verificar_pagina_dinamica(html_content, url)
             
-            print(f"{Fore.GREEN}✅ Página carregada com sucesso!")
-            return response.text
+            if do_cache:
+                print(f"{Fore.GREEN}♻️  Página não modificada desde a última visita; usando a cópia em cache.")
+            else:
+                print(f"{Fore.GREEN}✅ Página carregada com sucesso!")
+            return html_content
             
         except requests.exceptions.RequestException as e:
             print(f"{Fore.RED}❌ Erro ao acessar a página: {e}")
             return None
     
-    def buscar_texto_na_pagina(self, html_content, texto_busca, case_sensitive=False):
+    def requisitar_pagina(self, url):
+        """GET revalidando a cópia em cache; retorna (response, html, veio_do_cache)"""
+        if not self.cache:
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+            return response, response.text, False
+        
+        response = self.session.get(url, timeout=15, headers=self.cache.cabecalhos_condicionais(url))
+        if response.status_code == 304:
+            html_content = self.cache.corpo(url)
+            if html_content is not None:
+                return response, html_content, True
+            # Cópia local perdida: baixa de novo sem condições
+            response = self.session.get(url, timeout=15)
+        
+        response.raise_for_status()
+        self.cache.salvar(url, response)
+        return response, response.text, False
+    
+    def buscar_texto_na_pagina(self, html_content, texto_busca, case_sensitive=False, url=None):
         """Busca o texto na estrutura HTML e retorna os resultados"""
+        resultados_por_termo = self.buscar_multiplos_termos(html_content, [texto_busca], case_sensitive, url)
+        return resultados_por_termo.get(texto_busca, ([], 0))
+    
+    def buscar_multiplos_termos(self, html_content, termos, case_sensitive=False, url=None):
+        """Busca vários termos em uma única varredura do HTML e agrupa os resultados por termo"""
         print(f"\n{Fore.BLUE}🔍 Analisando estrutura HTML...")
+        return self.analisar_html(html_content, self.criar_buscador(termos, case_sensitive), url)
+    
+    def analisar_html(self, html_content, automato, url=None, texto_visivel=None):
+        """Busca com um autômato já construído (somente leitura, pode ser compartilhado entre threads)
         
-        # Dividir HTML em linhas para análise
-        linhas_html = html_content.splitlines()
-        resultados = []
+        Com cache habilitado e a URL informada, o texto visível de páginas inalteradas vem do cache;
+        texto_visivel pode ser passado quando já é conhecido (ex.: páginas do índice local).
+        """
+        indice_html = IndiceHTML(html_content)
+        resultados = [[] for _ in automato.termos]
         
-        # Configurar padrão de busca
-        flags = 0 if case_sensitive else re.IGNORECASE
-        padrao = re.escape(texto_busca)
-        
-        # Buscar em cada linha
-        for num_linha, linha in enumerate(linhas_html, 1):
-            if re.search(padrao, linha, flags):
-                # Extrair contexto e elemento HTML
-                contexto = self.extrair_contexto(linha, texto_busca, case_sensitive)
-                elemento = self.identificar_elemento_html(linha)
+        # Regex e busca aproximada precisam do documento inteiro para não perder ocorrências longas
+        busca = automato.iniciar_busca() if automato.incremental else None
+        if busca is None:
+            for inicio, fim, indice in automato.buscar(html_content):
+                resultados[indice].append(self.montar_resultado(indice_html, inicio, fim))
+        guardar_no_cache = bool(self.cache and url) and texto_visivel is None
+        
+        if guardar_no_cache:
+            texto_visivel = self.cache.texto_visivel(url, html_content)
+        extrator = None if texto_visivel is not None else ExtratorTextoVisivel(automato, guardar_no_cache)
+        
+        # Uma única passada em blocos: ocorrências no HTML bruto e no texto visível ao mesmo tempo.
+        # Cada ocorrência guarda apenas offsets e recortes curtos, nunca a linha inteira
+        for inicio_bloco in range(0, len(html_content), TAMANHO_BLOCO_STREAM):
+            bloco = html_content[inicio_bloco:inicio_bloco + TAMANHO_BLOCO_STREAM]
+            if busca:
+                for inicio, fim, indice in busca.alimentar(bloco):
+                    resultados[indice].append(self.montar_resultado(indice_html, inicio, fim))
+            if extrator:
+                extrator.feed(bloco)
+        
+        if extrator:
+            contagens_visiveis = extrator.finalizar()
+            if guardar_no_cache:
+                self.cache.salvar_texto_visivel(url, html_content, extrator.texto())
+        else:
+            contagens_visiveis = automato.contar(texto_visivel)
+        
+        return {
+            termo: (resultados[indice], contagens_visiveis[indice])
+            for indice, termo in enumerate(automato.termos)
+        }
+    
+    def buscar_em_lote(self, urls, termos, case_sensitive=False,
+                       max_workers=MAX_WORKERS_LOTE, limite_por_host=LIMITE_POR_HOST):
+        """Baixa várias URLs em paralelo e analisa cada página assim que ela chega
+        
+        Usa a mesma sessão (pool de conexões compartilhado) com no máximo
+        limite_por_host requisições simultâneas para cada host.
+        Retorna {url: resultados_por_termo ou None} na ordem das URLs.
+        """
+        automato = self.criar_buscador(termos, case_sensitive)
+        semaforos = self.preparar_lote(urls, max_workers, limite_por_host)
+        
+        print(f"\n{Fore.BLUE}🌐 Buscando {len(urls)} página(s) em {len(semaforos)} host(s) "
+              f"({max_workers} threads, até {limite_por_host} por host)...")
+        
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {
+                executor.submit(self._processar_url_do_lote, url, automato, semaforos): url
+                for url in urls
+            }
+            for concluidas, futuro in enumerate(as_completed(futuros), 1):
+                url = futuros[futuro]
+                try:
+                    resultados[url] = futuro.result()
+                    total = sum(len(res) for res, _ in resultados[url].values())
+                    print(f"{Fore.GREEN}[{concluidas}/{len(urls)}] ✅ {url} - {total} ocorrência(s)")
+                except requests.exceptions.RequestException as e:
+                    resultados[url] = None
+                    print(f"{Fore.RED}[{concluidas}/{len(urls)}] ❌ {url} - {e}")
+        
+        return {url: resultados[url] for url in urls}
+    
+    def preparar_lote(self, urls, max_workers, limite_por_host):
+        """Dimensiona o pool de conexões da sessão e cria um semáforo por host"""
+        hosts = {urlparse(url).netloc.lower() for url in urls}
+        
+        # Um pool por host com conexões suficientes para todas as threads
+        adapter = HTTPAdapter(pool_connections=max(len(hosts), 1),
+                              pool_maxsize=min(max_workers, limite_por_host))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        return {host: threading.BoundedSemaphore(limite_por_host) for host in hosts}
+    
+    def _processar_url_do_lote(self, url, automato, semaforos):
+        """Baixa e analisa uma URL do lote (executado nas threads do pool)"""
+        with semaforos[urlparse(url).netloc.lower()]:
+            _, html_content, _ = self.requisitar_pagina(url)
+        return self.analisar_html(html_content, automato, url)
+    
+    def monitorar(self, urls, termos, case_sensitive=False, intervalo=INTERVALO_MONITORAMENTO,
+                  arquivo_estado=None, max_workers=MAX_WORKERS_LOTE, limite_por_host=LIMITE_POR_HOST):
+        """Verifica as URLs periodicamente e avisa quando ocorrências aparecem ou desaparecem
+        
+        Guarda um hash do conteúdo de cada página: páginas inalteradas custam só a
+        comparação do hash (ou nem isso, com cache e resposta 304) e não são analisadas.
+        """
+        automato = self.criar_buscador(termos, case_sensitive)
+        semaforos = self.preparar_lote(urls, max_workers, limite_por_host)
+        estado = self.carregar_estado_monitoramento(arquivo_estado)
+        
+        print(f"\n{Fore.BLUE}👀 Monitorando {len(urls)} página(s) a cada {intervalo}s (Ctrl+C para parar)...")
+        try:
+            while True:
+                self.verificar_mudancas(urls, automato, semaforos, estado, max_workers)
+                if arquivo_estado:
+                    self.salvar_estado_monitoramento(arquivo_estado, estado)
+                time.sleep(intervalo)
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}⏹️  Monitoramento encerrado.")
+    
+    def verificar_mudancas(self, urls, automato, semaforos, estado, max_workers=MAX_WORKERS_LOTE):
+        """Executa um ciclo do monitoramento; atualiza o estado e retorna {url: (novas, removidas)}"""
+        print(f"\n{Fore.CYAN}🔄 Verificação {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        
+        mudancas = {}
+        inalteradas = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {
+                executor.submit(self._verificar_url, url, automato, semaforos,
+                                estado.get(url, {}).get('hash')): url
+                for url in urls
+            }
+            for futuro in as_completed(futuros):
+                url = futuros[futuro]
+                try:
+                    hash_conteudo, ocorrencias = futuro.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"{Fore.RED}❌ {url} - {e}")
+                    continue
+                
+                if ocorrencias is None:
+                    inalteradas += 1
+                    continue
+                
+                anterior = estado.get(url)
+                estado[url] = {'hash': hash_conteudo, 'ocorrencias': ocorrencias}
+                if anterior is None:
+                    print(f"{Fore.WHITE}📌 {url}: linha de base com {sum(ocorrencias.values())} ocorrência(s)")
+                    continue
+                
+                novas = ocorrencias - anterior['ocorrencias']
+                removidas = anterior['ocorrencias'] - ocorrencias
+                if novas or removidas:
+                    mudancas[url] = (novas, removidas)
+                    self.exibir_mudancas(url, novas, removidas)
+        
+        print(f"{Fore.LIGHTBLACK_EX}   {inalteradas} página(s) inalterada(s), {len(mudancas)} com mudanças nas ocorrências")
+        return mudancas
+    
+    def _verificar_url(self, url, automato, semaforos, hash_anterior):
+        """Baixa a página; só analisa se o hash mudou. Retorna (hash, ocorrências ou None)"""
+        with semaforos[urlparse(url).netloc.lower()]:
+            response, html_content, do_cache = self.requisitar_pagina(url)
+        
+        # Resposta 304 do cache: nem é preciso calcular o hash
+        if do_cache and hash_anterior:
+            return hash_anterior, None
+        
+        hash_conteudo = hashlib.blake2b(html_content.encode('utf-8'), digest_size=16).hexdigest()
+        if hash_conteudo == hash_anterior:
+            return hash_conteudo, None
+        
+        ocorrencias = Counter()
+        for termo, (resultados, _) in self.analisar_html(html_content, automato, url).items():
+            for resultado in resultados:
+                ocorrencias[(termo, resultado['elemento'], resultado['contexto'])] += 1
+        return hash_conteudo, ocorrencias
+    
+    def exibir_mudancas(self, url, novas, removidas):
+        """Exibe as ocorrências que apareceram e desapareceram em uma página"""
+        print(f"\n{Fore.YELLOW}🔔 {url}")
+        for (termo, elemento, contexto), quantidade in novas.items():
+            print(f"{Fore.GREEN}   + '{termo}' ({elemento}) x{quantidade}: {contexto}")
+        for (termo, elemento, contexto), quantidade in removidas.items():
+            print(f"{Fore.RED}   - '{termo}' ({elemento}) x{quantidade}: {contexto}")
+    
+    def carregar_estado_monitoramento(self, arquivo_estado):
+        """Lê o estado salvo de um monitoramento anterior (hash e ocorrências por URL)"""
+        if not arquivo_estado or not os.path.exists(arquivo_estado):
+            return {}
+        with open(arquivo_estado, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return {
+            url: {'hash': item['hash'],
+                  'ocorrencias': Counter({tuple(chave): qtd for chave, qtd in item['ocorrencias']})}
+            for url, item in dados.items()
+        }
+    
+    def salvar_estado_monitoramento(self, arquivo_estado, estado):
+        """Grava o estado do monitoramento para continuar de onde parou"""
+        dados = {
+            url: {'hash': item['hash'], 'ocorrencias': [[list(chave), qtd] for chave, qtd in item['ocorrencias'].items()]}
+            for url, item in estado.items()
+        }
+        with open(arquivo_estado, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+    
+    def buscar_em_diretorio(self, diretorio, termos, case_sensitive=False, processos=None):
+        """Busca os termos em todos os arquivos .html/.htm do diretório (recursivo)
+        
+        Os arquivos são lidos por mapeamento de memória e distribuídos entre processos;
+        o resultado segue a ordem alfabética dos caminhos. Retorna {caminho: resultados_por_termo}
+        apenas dos arquivos com ocorrências.
+        """
+        arquivos = sorted(
+            os.path.join(raiz, nome)
+            for raiz, _, nomes in os.walk(diretorio)
+            for nome in nomes if nome.lower().endswith(EXTENSOES_HTML)
+        )
+        print(f"\n{Fore.BLUE}📂 Analisando {len(arquivos)} arquivo(s) HTML em {diretorio}...")
+        
+        resultados = {}
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo_diretorio,
+                                 initargs=(termos, case_sensitive, self.modo, self.max_erros)) as executor:
+            # map preserva a ordem de entrada: o resultado é estável independente do paralelismo
+            for caminho, resultados_por_termo in zip(
+                arquivos, executor.map(_buscar_arquivo, arquivos, chunksize=ARQUIVOS_POR_TAREFA)
+            ):
+                if resultados_por_termo and any(res or vis for res, vis in resultados_por_termo.values()):
+                    resultados[caminho] = resultados_por_termo
+        
+        duracao = time.perf_counter() - inicio
+        print(f"{Fore.GREEN}✅ {len(arquivos)} arquivo(s) analisados em {duracao:.1f}s, "
+              f"{len(resultados)} com ocorrências")
+        return resultados
+    
+    def buscar_em_arquivo(self, caminho, automato, filtro_bytes=None):
+        """Lê um arquivo HTML por mmap e busca os termos; None se o filtro descartar o arquivo"""
+        with open(caminho, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                # Filtro rápido em bytes: arquivos sem nenhum termo nem são decodificados
+                if filtro_bytes is not None and not filtro_bytes.search(mapa):
+                    return None
                 
-                resultados.append({
-                    'linha': num_linha,
-                    'conteudo_linha': linha.strip(),
-                    'contexto': contexto,
-                    'elemento': elemento
-                })
-        
-        # Também buscar no texto visível da página
+                charset = REGEX_CHARSET.search(mapa[:2048])
+                encoding = charset.group(1).decode('ascii') if charset else 'utf-8'
+                try:
+                    html_content = str(mapa, encoding, 'replace')
+                except LookupError:
+                    html_content = str(mapa, 'utf-8', 'replace')
+        
+        return self.analisar_html(html_content, automato)
+    
+    def montar_resultado(self, indice_html, inicio, fim):
+        """Monta o resultado de uma ocorrência a partir dos offsets no documento"""
+        linha, coluna = indice_html.linha_coluna(inicio)
+        indice_elemento = indice_html.elemento_em(inicio)
+        
+        if indice_elemento >= 0:
+            tag = indice_html.nomes[indice_elemento]
+            elemento = self.classificar_tag(tag)
+            trecho = indice_html.trecho(indice_elemento)
+        else:
+            tag = None
+            elemento = "Texto/Conteúdo"
+            trecho = indice_html.html[inicio:inicio + TAMANHO_TRECHO]
+        
+        contexto = self.destacar_ocorrencias(indice_html.html, [(inicio, fim)])[0]
+        
+        # Recortes podem atravessar várias linhas; compactar espaços para exibição
+        return {
+            'inicio': inicio,
+            'fim': fim,
+            'linha': linha,
+            'coluna': coluna,
+            'tag': tag,
+            'elemento': elemento,
+            'trecho': re.sub(r'\s+', ' ', trecho).strip(),
+            'contexto': re.sub(r'\s+', ' ', contexto)
+        }
+    
+    def buscar_em_stream(self, url, termos, case_sensitive=False, max_ocorrencias=None):
+        """Baixa a página em blocos e busca os termos à medida que o conteúdo chega
+        
+        A memória usada fica limitada ao tamanho do bloco mais a janela de contexto,
+        e a leitura é interrompida assim que max_ocorrencias forem encontradas.
+        Retorna o mesmo formato de buscar_multiplos_termos, ou None em caso de erro.
+        """
+        automato = self.criar_buscador(termos, case_sensitive)
+        busca = automato.iniciar_busca()
+        extrator = ExtratorTextoVisivel(automato)
+        rastreador = RastreadorTags()
+        janela = JanelaStream()
+        resultados = [[] for _ in automato.termos]
+        # Ocorrências à espera do elemento (ordenadas pelo início) e resultados à espera do contexto
+        aguardando = []
+        pendentes = []
+        total = 0
+        
+        def receber(ocorrencias):
+            """Enfileira as ocorrências novas e retorna False ao atingir max_ocorrencias"""
+            nonlocal total
+            ocorrencias = list(ocorrencias)
+            if max_ocorrencias:
+                ocorrencias = ocorrencias[:max_ocorrencias - total]
+            total += len(ocorrencias)
+            aguardando.extend(ocorrencias)
+            aguardando.sort(key=lambda ocorrencia: ocorrencia[0])
+            if max_ocorrencias and total >= max_ocorrencias:
+                print(f"{Fore.YELLOW}⏹️  Limite de {max_ocorrencias} ocorrência(s) atingido; download interrompido.")
+                return False
+            return True
+        
+        def registrar(final=False):
+            """Monta o resultado das ocorrências cujo elemento já pode ser localizado"""
+            # Nenhuma ocorrência futura começa antes de inicio_retido: o rastreador pode avançar até lá
+            limite = None if final else busca.inicio_retido
+            prontas = [ocorrencia for ocorrencia in aguardando if limite is None or ocorrencia[0] < limite]
+            elementos = rastreador.localizar(janela, [inicio for inicio, _, _ in prontas], final)
+            for (inicio, fim, indice), elemento in zip(prontas, elementos):
+                resultado = self.montar_resultado_stream(janela, inicio, fim, elemento)
+                resultados[indice].append(resultado)
+                pendentes.append(resultado)
+            del aguardando[:len(elementos)]
+        
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            texto_visivel = soup.get_text()
+            print(f"\n{Fore.BLUE}🌐 Acessando a página (streaming)...")
+            response = self.session.get(url, timeout=15, stream=True)
+        except requests.exceptions.RequestException as e:
+            print(f"{Fore.RED}❌ Erro ao acessar a página: {e}")
+            return None
+        
+        try:
+            response.raise_for_status()
+            
+            content_type = response.headers.get('content-type', '').lower()
+            if 'html' not in content_type:
+                print(f"{Fore.RED}⚠️  Aviso: Esta página pode não ser HTML puro.")
+            
+            print(f"{Fore.BLUE}🔍 Analisando estrutura HTML enquanto a página é baixada...")
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            primeiro_bloco = True
+            
+            for dados in response.iter_content(chunk_size=TAMANHO_BLOCO_STREAM):
+                bloco = decoder.decode(dados)
+                if not bloco:
+                    continue
+                
+                # Indicadores de SPA ficam no início do documento
+                if primeiro_bloco:
+                    self.verificar_pagina_dinamica(bloco, url)
+                    primeiro_bloco = False
+                
+                janela.adicionar(bloco)
+                extrator.feed(bloco)
+                if not receber(busca.alimentar(bloco)):
+                    registrar(final=True)
+                    break
+                registrar()
+                
+                # Completa o contexto das ocorrências que já têm texto suficiente depois delas
+                fim_janela = janela.inicio + len(janela.texto)
+                pendentes = [r for r in pendentes if not self.completar_contexto(janela, r, fim_janela)]
+                
+                # Mantém só o necessário para ocorrências cortadas ou retidas entre blocos,
+                # as tags ainda não rastreadas e os contextos pendentes
+                manter = min(busca.inicio_retido - TAMANHO_CONTEXTO, rastreador.posicao)
+                if aguardando:
+                    manter = min(manter, aguardando[0][0] - TAMANHO_CONTEXTO)
+                if pendentes:
+                    manter = min(manter, pendentes[0]['inicio'] - TAMANHO_CONTEXTO)
+                janela.descartar_ate(max(janela.inicio, manter))
+            else:
+                resto = decoder.decode(b'', final=True)
+                janela.adicionar(resto)
+                extrator.feed(resto)
+                if receber(busca.alimentar(resto)):
+                    receber(busca.finalizar())
+                registrar(final=True)
+            
+            for resultado in pendentes:
+                self.completar_contexto(janela, resultado, None)
+            
+            print(f"{Fore.GREEN}✅ Página analisada com sucesso!")
+            
+        except requests.exceptions.RequestException as e:
+            print(f"{Fore.RED}❌ Erro ao acessar a página: {e}")
+            return None
+        finally:
+            response.close()
+        
+        # Com interrupção antecipada, a contagem visível cobre apenas o trecho baixado
+        contagens_visiveis = extrator.finalizar()
+        return {
+            termo: (resultados[indice], contagens_visiveis[indice])
+            for indice, termo in enumerate(automato.termos)
+        }
+    
+    def montar_resultado_stream(self, janela, inicio, fim, elemento):
+        """Monta o resultado de uma ocorrência encontrada no modo streaming (contexto completado depois)"""
+        linha, coluna = janela.linha_coluna(inicio)
+        if elemento:
+            tag, trecho = elemento
+        else:
+            tag, trecho = None, janela.texto[inicio - janela.inicio:inicio - janela.inicio + TAMANHO_TRECHO]
+        
+        return {
+            'inicio': inicio,
+            'fim': fim,
+            'linha': linha,
+            'coluna': coluna,
+            'tag': tag,
+            'elemento': self.classificar_tag(tag) if tag else "Texto/Conteúdo",
+            'trecho': re.sub(r'\s+', ' ', trecho).strip(),
+            'contexto': None
+        }
+    
+    def completar_contexto(self, janela, resultado, fim_janela):
+        """Preenche o contexto se o texto depois da ocorrência já chegou (fim_janela=None força)"""
+        if fim_janela is not None and resultado['fim'] + TAMANHO_CONTEXTO > fim_janela:
+            return False
+        spans = [(resultado['inicio'] - janela.inicio, resultado['fim'] - janela.inicio)]
+        resultado['contexto'] = re.sub(r'\s+', ' ', self.destacar_ocorrencias(janela.texto, spans)[0])
+        return True
+    
+    def extrair_texto_visivel(self, html_content):
+        """Extrai o texto visível da página"""
+        extrator = ExtratorTextoVisivel(AhoCorasick([]), guardar_texto=True)
+        try:
+            extrator.feed(html_content)
+            extrator.finalizar()
         except Exception as e:
             print(f"{Fore.YELLOW}⚠️ Aviso: Erro ao processar HTML para texto visível: {e}")
-            texto_visivel = ""
-        
-        return resultados, self.contar_ocorrencias_visiveis(texto_visivel, texto_busca, case_sensitive)
+        return extrator.texto()
     
     def extrair_contexto(self, linha, texto_busca, case_sensitive):
         """Extrai o contexto ao redor do texto encontrado"""
         flags = 0 if case_sensitive else re.IGNORECASE
         
-        # Encontrar todas as ocorrências na linha
-        matches = list(re.finditer(re.escape(texto_busca), linha, flags))
+        # Encontrar todas as ocorrências na linha (padrão compilado uma única vez por termo)
+        spans = [match.span() for match in _compilar_literal(texto_busca, flags).finditer(linha)]
+        return self.destacar_ocorrencias(linha, spans)
+    
+    def destacar_ocorrencias(self, linha, spans):
+        """Recorta o contexto de cada ocorrência (início, fim) e destaca o texto encontrado"""
         contextos = []
         
-        for match in matches:
-            start = max(0, match.start() - 30)
-            end = min(len(linha), match.end() + 30)
-            contexto = linha[start:end]
-            
-            # Destacar o texto encontrado
-            if case_sensitive:
-                contexto_destacado = contexto.replace(texto_busca, f">>>{texto_busca}<<<")
-            else:
-                # Para case insensitive, precisamos destacar a ocorrência exata
-                texto_real = linha[match.start():match.end()]
-                contexto_destacado = contexto.replace(texto_real, f">>>{texto_real}<<<")
-            
-            contextos.append(contexto_destacado)
+        for inicio, fim in spans:
+            start = max(0, inicio - TAMANHO_CONTEXTO)
+            end = min(len(linha), fim + TAMANHO_CONTEXTO)
+            contextos.append(f"{linha[start:inicio]}>>>{linha[inicio:fim]}<<<{linha[fim:end]}")
         
         return contextos
     
@@ -145,31 +1469,18 @@ class TextSearcher:
         linha_limpa = linha.strip()
         
         # Padrões de elementos HTML
-        if re.match(r'<h[1-6]', linha_limpa, re.IGNORECASE):
-            return "Cabeçalho"
-        elif re.match(r'<p\b', linha_limpa, re.IGNORECASE):
-            return "Parágrafo"
-        elif re.match(r'<a\b', linha_limpa, re.IGNORECASE):
-            return "Link"
-        elif re.match(r'<div\b', linha_limpa, re.IGNORECASE):
-            return "Div"
-        elif re.match(r'<span\b', linha_limpa, re.IGNORECASE):
-            return "Span"
-        elif re.match(r'<title\b', linha_limpa, re.IGNORECASE):
-            return "Título da Página"
-        elif re.match(r'<meta\b', linha_limpa, re.IGNORECASE):
-            return "Meta Tag"
-        elif re.match(r'<img\b', linha_limpa, re.IGNORECASE):
-            return "Imagem"
-        elif re.match(r'<script\b', linha_limpa, re.IGNORECASE):
-            return "Script"
-        elif re.match(r'<style\b', linha_limpa, re.IGNORECASE):
-            return "CSS/Style"
+        match = re.match(r'<([a-zA-Z][a-zA-Z0-9]*)\b', linha_limpa)
+        if match and match.group(1).lower() in TIPOS_ELEMENTO:
+            return self.classificar_tag(match.group(1))
         elif re.match(r'<.*?>', linha_limpa):
             return "Outro HTML"
         else:
             return "Texto/Conteúdo"
     
+    def classificar_tag(self, tag):
+        """Retorna o tipo de elemento correspondente ao nome da tag"""
+        return TIPOS_ELEMENTO.get(tag.lower(), "Outro HTML")
+    
     def contar_ocorrencias_visiveis(self, texto_visivel, texto_busca, case_sensitive):
         """Conta ocorrências no texto visível da página"""
         if case_sensitive:
@@ -190,7 +1501,7 @@ class TextSearcher:
         
         if not resultados:
             print(f"\n{Fore.RED}❌ Nenhuma ocorrência encontrada na estrutura HTML.")
-            if ocorrencias_visiveis > 0:
+            if ocorrencias_visiveis:
                 print(f"{Fore.YELLOW}💡 Porém, o texto foi encontrado {ocorrencias_visiveis} vez(es) no conteúdo visível da página.")
             return
         
@@ -198,13 +1509,12 @@ class TextSearcher:
         print(f"{Fore.CYAN}{'-'*80}")
         
         for i, resultado in enumerate(resultados, 1):
-            print(f"\n{Fore.YELLOW}[{i}] Linha {resultado['linha']} - {resultado['elemento']}")
+            print(f"\n{Fore.YELLOW}[{i}] Linha {resultado['linha']}, coluna {resultado['coluna']} - {resultado['elemento']}")
             print(f"{Fore.WHITE}Código HTML:")
-            print(f"{Fore.LIGHTBLACK_EX}   {resultado['conteudo_linha'][:100]}...")
+            print(f"{Fore.LIGHTBLACK_EX}   {resultado['trecho'][:100]}...")
             
-            print(f"{Fore.WHITE}Contexto(s):")
-            for j, contexto in enumerate(resultado['contexto']):
-                print(f"{Fore.LIGHTGREEN_EX}   {j+1}. {contexto}")
+            print(f"{Fore.WHITE}Contexto:")
+            print(f"{Fore.LIGHTGREEN_EX}   {resultado['contexto']}")
         
         # Resumo por tipo de elemento
         self.exibir_resumo_elementos(resultados)
@@ -216,7 +1526,7 @@ class TextSearcher:
             elemento = resultado['elemento']
             if elemento not in elementos:
                 elementos[elemento] = 0
-            elementos[elemento] += len(resultado['contexto'])
+            elementos[elemento] += 1
         
         print(f"\n{Fore.CYAN}📊 RESUMO POR TIPO DE ELEMENTO:")
         print(f"{Fore.CYAN}{'-'*40}")
@@ -224,6 +1534,64 @@ class TextSearcher:
         for elemento, count in sorted(elementos.items(), key=lambda x: x[1], reverse=True):
             print(f"{Fore.WHITE}{elemento}: {Fore.GREEN}{count} ocorrência(s)")
     
+    def exibir_resultados_multiplos(self, resultados_por_termo, url):
+        """Exibe um resumo por termo seguido dos detalhes de cada termo encontrado"""
+        print(f"\n{Fore.CYAN}{'='*80}")
+        print(f"{Fore.CYAN}                     RESUMO POR TERMO")
+        print(f"{Fore.CYAN}{'='*80}")
+        print(f"{Fore.WHITE}URL analisada: {Fore.YELLOW}{url}")
+        print(f"{Fore.WHITE}Termos buscados: {Fore.YELLOW}{len(resultados_por_termo)}")
+        print(f"{Fore.CYAN}{'-'*80}")
+        
+        for termo, (resultados, ocorrencias_visiveis) in resultados_por_termo.items():
+            cor = Fore.GREEN if resultados or ocorrencias_visiveis else Fore.RED
+            print(f"{Fore.WHITE}'{termo}': {cor}{len(resultados)} no HTML, {ocorrencias_visiveis} no texto visível")
+        
+        for termo, (resultados, ocorrencias_visiveis) in resultados_por_termo.items():
+            if resultados:
+                self.exibir_resultados(resultados, termo, ocorrencias_visiveis, url)
+    
+    def exibir_resultados_lote(self, resultados_por_url):
+        """Exibe uma tabela com as ocorrências de cada termo por URL"""
+        print(f"\n{Fore.CYAN}{'='*80}")
+        print(f"{Fore.CYAN}                     RESULTADOS DO LOTE")
+        print(f"{Fore.CYAN}{'='*80}")
+        
+        falhas = 0
+        for url, resultados_por_termo in resultados_por_url.items():
+            if resultados_por_termo is None:
+                falhas += 1
+                print(f"\n{Fore.RED}❌ {url} (falha no download)")
+                continue
+            
+            print(f"\n{Fore.YELLOW}{url}")
+            for termo, (resultados, ocorrencias_visiveis) in resultados_por_termo.items():
+                cor = Fore.GREEN if resultados or ocorrencias_visiveis else Fore.LIGHTBLACK_EX
+                print(f"{Fore.WHITE}   '{termo}': {cor}{len(resultados)} no HTML, {ocorrencias_visiveis} no texto visível")
+        
+        print(f"\n{Fore.CYAN}{'-'*80}")
+        print(f"{Fore.WHITE}Páginas analisadas: {Fore.GREEN}{len(resultados_por_url) - falhas}"
+              f"{Fore.WHITE}  Falhas: {Fore.RED if falhas else Fore.GREEN}{falhas}")
+    
+    def salvar_resultados_lote(self, resultados_por_url, formato='txt', filename=None):
+        """Salva os resultados de todas as URLs do lote em um único arquivo"""
+        filename = filename or self.nome_arquivo_resultado('busca_lote', formato)
+        
+        try:
+            with open(filename, 'wb') as f:
+                escritor = EscritorResultados(self, f, formato)
+                for url, resultados_por_termo in resultados_por_url.items():
+                    if resultados_por_termo is None:
+                        continue
+                    escritor.escrever_relatorio(resultados_por_termo, None, url)
+                    escritor.separar()
+            
+            tamanho = self.formatar_tamanho_arquivo(escritor.bytes_escritos)
+            print(f"{Fore.GREEN}✅ Resultados salvos em: {filename} ({tamanho})")
+            
+        except Exception as e:
+            print(f"{Fore.RED}❌ Erro ao salvar arquivo: {e}")
+    
     def executar(self):
         """Método principal que executa o script"""
         try:
@@ -235,9 +1603,19 @@ class TextSearcher:
             if not html_content:
                 return
             
+            # Vários termos (@arquivo): uma única varredura para todos
+            if texto_busca.startswith('@'):
+                termos = self.carregar_termos(texto_busca[1:])
+                resultados_por_termo = self.buscar_multiplos_termos(html_content, termos, case_sensitive, url)
+                self.exibir_resultados_multiplos(resultados_por_termo, url)
+                
+                if any(resultados for resultados, _ in resultados_por_termo.values()):
+                    self.salvar_resultados_opcao(resultados_por_termo, None, url)
+                return
+            
             # Buscar texto na página
             resultados, ocorrencias_visiveis = self.buscar_texto_na_pagina(
-                html_content, texto_busca, case_sensitive
+                html_content, texto_busca, case_sensitive, url
             )
             
             # Exibir resultados
@@ -252,47 +1630,79 @@ class TextSearcher:
         except Exception as e:
             print(f"\n{Fore.RED}❌ Erro inesperado: {e}")
     
-    def salvar_resultados_opcao(self, resultados, texto_busca, url):
+    def salvar_resultados_opcao(self, resultados, texto_busca, url, formato='txt'):
         """Pergunta se o usuário quer salvar os resultados"""
-        # Calcular tamanho estimado do arquivo
-        tamanho_bytes = self.calcular_tamanho_arquivo_resultado(resultados, texto_busca, url)
+        # O relatório é gerado uma única vez em um arquivo temporário: o tamanho exibido é o real
+        filename = self.nome_arquivo_resultado('busca_resultado', formato)
+        temporario = f"{filename}.tmp"
+        try:
+            tamanho_bytes = self.escrever_arquivo_resultado(temporario, resultados, texto_busca, url, formato)
+        except Exception as e:
+            print(f"{Fore.RED}❌ Erro ao gerar arquivo: {e}")
+            return
         tamanho_formatado = self.formatar_tamanho_arquivo(tamanho_bytes)
         
         print(f"\n{Fore.MAGENTA}💾 Deseja salvar os resultados em um arquivo?")
-        print(f"{Fore.CYAN}   Tamanho estimado do arquivo: {Fore.YELLOW}{tamanho_formatado}")
+        print(f"{Fore.CYAN}   Tamanho do arquivo: {Fore.YELLOW}{tamanho_formatado}")
         print(f"{Fore.MAGENTA}   (s/n): ", end="")
         
         if input().strip().lower() in ['s', 'sim', 'y', 'yes']:
-            self.salvar_resultados(resultados, texto_busca, url)
+            os.replace(temporario, filename)
+            print(f"{Fore.GREEN}✅ Resultados salvos em: {filename}")
+        else:
+            os.remove(temporario)
     
-    def salvar_resultados(self, resultados, texto_busca, url):
-        """Salva os resultados em um arquivo de texto"""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"busca_resultado_{timestamp}.txt"
+    def salvar_resultados(self, resultados, texto_busca, url, formato='txt', filename=None):
+        """Salva os resultados em um arquivo (txt, ndjson ou csv)"""
+        filename = filename or self.nome_arquivo_resultado('busca_resultado', formato)
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"RESULTADO DA BUSCA DE TEXTO\n")
-                f.write(f"{'='*50}\n\n")
-                f.write(f"URL: {url}\n")
-                f.write(f"Texto buscado: '{texto_busca}'\n")
-                f.write(f"Data/Hora: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-                f.write(f"Total de ocorrências: {len(resultados)}\n\n")
-                
-                for i, resultado in enumerate(resultados, 1):
-                    f.write(f"[{i}] Linha {resultado['linha']} - {resultado['elemento']}\n")
-                    f.write(f"HTML: {resultado['conteudo_linha']}\n")
-                    f.write(f"Contexto(s):\n")
-                    for j, contexto in enumerate(resultado['contexto']):
-                        f.write(f"  {j+1}. {contexto}\n")
-                    f.write("\n" + "-"*50 + "\n\n")
-            
-            print(f"{Fore.GREEN}✅ Resultados salvos em: {filename}")
+            tamanho_bytes = self.escrever_arquivo_resultado(filename, resultados, texto_busca, url, formato)
+            tamanho = self.formatar_tamanho_arquivo(tamanho_bytes)
+            print(f"{Fore.GREEN}✅ Resultados salvos em: {filename} ({tamanho})")
             
         except Exception as e:
             print(f"{Fore.RED}❌ Erro ao salvar arquivo: {e}")
     
+    def escrever_arquivo_resultado(self, filename, resultados, texto_busca, url, formato='txt'):
+        """Grava o relatório no arquivo e retorna o número de bytes escritos"""
+        with open(filename, 'wb') as f:
+            escritor = EscritorResultados(self, f, formato)
+            escritor.escrever_relatorio(resultados, texto_busca, url)
+        return escritor.bytes_escritos
+    
+    def nome_arquivo_resultado(self, prefixo, formato):
+        """Nome do arquivo de resultado com data/hora"""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{prefixo}_{timestamp}.{formato}"
+    
+    def gerar_relatorio(self, resultados, texto_busca, url):
+        """Gera o conteúdo do relatório em partes; com texto_busca=None, resultados é agrupado por termo"""
+        if texto_busca is None:
+            resultados_por_termo = {termo: res for termo, (res, _) in resultados.items()}
+        else:
+            resultados_por_termo = {texto_busca: resultados}
+        
+        yield f"RESULTADO DA BUSCA DE TEXTO\n"
+        yield f"{'='*50}\n\n"
+        yield f"URL: {url}\n"
+        if texto_busca is None:
+            yield f"Termos buscados: {len(resultados_por_termo)}\n"
+        else:
+            yield f"Texto buscado: '{texto_busca}'\n"
+        yield f"Data/Hora: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+        yield f"Total de ocorrências: {sum(len(res) for res in resultados_por_termo.values())}\n\n"
+        
+        for termo, resultados_termo in resultados_por_termo.items():
+            if texto_busca is None:
+                yield f"### Termo: '{termo}' ({len(resultados_termo)} ocorrência(s))\n\n"
+            
+            for i, resultado in enumerate(resultados_termo, 1):
+                yield f"[{i}] Linha {resultado['linha']}, coluna {resultado['coluna']} (offset {resultado['inicio']}) - {resultado['elemento']}\n"
+                yield f"HTML: {resultado['trecho']}\n"
+                yield f"Contexto: {resultado['contexto']}\n"
+                yield "\n" + "-"*50 + "\n\n"
+    
     def verificar_pagina_dinamica(self, html_content, url):
         """Verifica se a página é dinâmica/SPA e exibe aviso"""
         indicadores_dinamicos = [
@@ -332,31 +1742,6 @@ class TextSearcher:
             print(f"{Fore.YELLOW}   O conteúdo pode ser carregado via JavaScript após o carregamento inicial.")
             print(f"{Fore.YELLOW}   Para páginas como esta, considere usar ferramentas específicas de scraping como Selenium, Playwright ou Puppeteer")
     
-    def calcular_tamanho_arquivo_resultado(self, resultados, texto_busca, url):
-        """Calcula o tamanho estimado do arquivo de resultado"""
-        import datetime
-        
-        # Simular o conteúdo que seria escrito
-        conteudo_simulado = f"RESULTADO DA BUSCA DE TEXTO\n"
-        conteudo_simulado += f"{'='*50}\n\n"
-        conteudo_simulado += f"URL: {url}\n"
-        conteudo_simulado += f"Texto buscado: '{texto_busca}'\n"
-        conteudo_simulado += f"Data/Hora: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
-        conteudo_simulado += f"Total de ocorrências: {len(resultados)}\n\n"
-        
-        for i, resultado in enumerate(resultados, 1):
-            conteudo_simulado += f"[{i}] Linha {resultado['linha']} - {resultado['elemento']}\n"
-            conteudo_simulado += f"HTML: {resultado['conteudo_linha']}\n"
-            conteudo_simulado += f"Contexto(s):\n"
-            for j, contexto in enumerate(resultado['contexto']):
-                conteudo_simulado += f"  {j+1}. {contexto}\n"
-            conteudo_simulado += "\n" + "-"*50 + "\n\n"
-        
-        # Calcular tamanho em bytes (UTF-8)
-        tamanho_bytes = len(conteudo_simulado.encode('utf-8'))
-        
-        return tamanho_bytes
-    
     def formatar_tamanho_arquivo(self, tamanho_bytes):
         """Formata o tamanho do arquivo em uma unidade legível"""
         if tamanho_bytes < 1024:
@@ -369,10 +1754,197 @@ class TextSearcher:
             return f"{tamanho_bytes / (1024 * 1024 * 1024):.1f} GB"
 
 
+# Estado de cada processo do modo diretório (criado uma vez por processo, não por arquivo)
+_searcher_processo = None
+_automato_processo = None
+_filtro_processo = None
+
+
+def _iniciar_processo_diretorio(termos, case_sensitive, modo, max_erros):
+    """Inicializa o processo do pool com o buscador e o filtro em bytes"""
+    global _searcher_processo, _automato_processo, _filtro_processo
+    _searcher_processo = TextSearcher(modo=modo, max_erros=max_erros)
+    _automato_processo = _searcher_processo.criar_buscador(termos, case_sensitive)
+    
+    # O filtro em bytes só vale para texto exato e termos ASCII sem caracteres que o HTML escapa:
+    # "ação" pode estar em Latin-1 e "café" como "caf&eacute;", e esses arquivos seriam descartados
+    termos_bytes = [termo.encode('utf-8') for termo in _automato_processo.termos]
+    if modo == 'exato' and termos_bytes and all(
+            termo.isascii() and not any(caractere in termo for caractere in b'&<>"\'') for termo in termos_bytes):
+        flags = 0 if case_sensitive else re.IGNORECASE
+        _filtro_processo = re.compile(b'|'.join(re.escape(termo) for termo in termos_bytes), flags)
+
+
+def _buscar_arquivo(caminho):
+    """Tarefa executada nos processos do modo diretório"""
+    try:
+        return _searcher_processo.buscar_em_arquivo(caminho, _automato_processo, _filtro_processo)
+    except OSError as e:
+        print(f"{Fore.RED}❌ {caminho} - {e}")
+        return None
+
+
+def criar_parser():
+    """Argumentos de linha de comando (sem argumentos, o modo interativo é usado)"""
+    parser = argparse.ArgumentParser(description="Busca texto na estrutura HTML de páginas web")
+    parser.add_argument('url', nargs='?', help="URL da página a ser analisada")
+    parser.add_argument('--urls', metavar='ARQUIVO',
+                        help="Modo lote: arquivo com uma URL por linha, baixadas em paralelo")
+    parser.add_argument('--diretorio', metavar='DIRETORIO',
+                        help="Busca em todos os arquivos .html/.htm salvos no diretório (recursivo)")
+    parser.add_argument('--processos', type=int,
+                        help="Modo diretório: número de processos (padrão=número de CPUs)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS_LOTE,
+                        help=f"Modo lote: downloads simultâneos (padrão={MAX_WORKERS_LOTE})")
+    parser.add_argument('--por-host', type=int, default=LIMITE_POR_HOST,
+                        help=f"Modo lote: downloads simultâneos por host (padrão={LIMITE_POR_HOST})")
+    parser.add_argument('-t', '--termo', action='append', default=[],
+                        help="Texto a ser buscado (pode ser repetido)")
+    parser.add_argument('--termos', metavar='ARQUIVO',
+                        help="Arquivo com um termo por linha")
+    parser.add_argument('-c', '--case-sensitive', action='store_true',
+                        help="Diferencia maiúsculas/minúsculas")
+    parser.add_argument('--modo', choices=MODOS_BUSCA, default='exato',
+                        help="exato, regex (cada termo é uma expressão regular) ou aproximado (tolera erros de digitação)")
+    parser.add_argument('--max-erros', type=int, default=MAX_ERROS_PADRAO, metavar='N',
+                        help=f"Modo aproximado: inserções/remoções/trocas toleradas (padrão={MAX_ERROS_PADRAO})")
+    parser.add_argument('--cache', nargs='?', const=DIRETORIO_CACHE, metavar='DIRETORIO',
+                        help=f"Guarda as páginas em disco e revalida com ETag/Last-Modified (padrão={DIRETORIO_CACHE})")
+    parser.add_argument('--indexar', metavar='URL',
+                        help="Rastreia o site (links do mesmo host e sitemap.xml) e grava no índice local")
+    parser.add_argument('--max-paginas', type=int, default=200,
+                        help="Ao indexar: número máximo de páginas (padrão=200)")
+    parser.add_argument('--sem-sitemap', action='store_true',
+                        help="Ao indexar: não usa o sitemap.xml como ponto de partida")
+    parser.add_argument('--do-indice', action='store_true',
+                        help="Responde a busca pelo índice local, sem baixar as páginas (URL opcional filtra o host). "
+                             "Regex, busca aproximada e termos com menos de 3 caracteres não usam o índice FTS "
+                             "e varrem todas as páginas guardadas")
+    parser.add_argument('--analisar', type=int, default=20, metavar='N',
+                        help="Com --do-indice: classifica o elemento HTML só nas N páginas mais relevantes; "
+                             "as demais trazem os offsets do índice (padrão=20, -1 = todas)")
+    parser.add_argument('--indice', default='indice_sites.db', metavar='ARQUIVO',
+                        help="Arquivo SQLite do índice local (padrão=indice_sites.db)")
+    parser.add_argument('--monitorar', type=int, nargs='?', const=INTERVALO_MONITORAMENTO, metavar='SEGUNDOS',
+                        help=f"Verifica as páginas periodicamente e mostra só as ocorrências que mudaram (padrão={INTERVALO_MONITORAMENTO}s)")
+    parser.add_argument('--estado', metavar='ARQUIVO',
+                        help="Ao monitorar: arquivo JSON para guardar o estado entre execuções")
+    parser.add_argument('--formato', choices=EscritorResultados.FORMATOS, default='txt',
+                        help="Formato do arquivo de resultados (padrão=txt)")
+    parser.add_argument('--saida', metavar='ARQUIVO',
+                        help="Grava os resultados direto neste arquivo, sem perguntar")
+    parser.add_argument('--stream', action='store_true',
+                        help="Baixa e analisa a página em blocos, com memória limitada")
+    parser.add_argument('--max-ocorrencias', type=int, metavar='N',
+                        help="No modo streaming, interrompe o download após N ocorrências")
+    return parser
+
+
+def executar_cli(searcher, args):
+    """Executa uma busca a partir dos argumentos de linha de comando"""
+    if args.indexar:
+        from indice_sites import IndiceSites
+        indice = IndiceSites(searcher, args.indice)
+        indice.indexar_site(args.indexar, args.max_paginas, not args.sem_sitemap)
+        indice.fechar()
+        if not (args.termo or args.termos):
+            return
+    
+    termos = list(args.termo)
+    if args.termos:
+        termos += searcher.carregar_termos(args.termos)
+    if not termos:
+        print(f"{Fore.RED}❌ Informe ao menos um termo com -t/--termo ou --termos.")
+        return
+    
+    if args.diretorio:
+        resultados_por_arquivo = searcher.buscar_em_diretorio(
+            args.diretorio, termos, args.case_sensitive, args.processos
+        )
+        searcher.exibir_resultados_lote(resultados_por_arquivo)
+        if args.saida:
+            searcher.salvar_resultados_lote(resultados_por_arquivo, args.formato, args.saida)
+        return
+    
+    if args.do_indice:
+        from indice_sites import IndiceSites
+        indice = IndiceSites(searcher, args.indice)
+        host = urlparse(args.url).netloc if args.url else None
+        resultados_por_url = indice.buscar(termos, args.case_sensitive, host,
+                                           None if args.analisar < 0 else args.analisar)
+        indice.fechar()
+        searcher.exibir_resultados_lote(resultados_por_url)
+        if args.saida:
+            searcher.salvar_resultados_lote(resultados_por_url, args.formato, args.saida)
+        return
+    
+    if args.monitorar:
+        urls = searcher.carregar_urls(args.urls) if args.urls else [args.url]
+        if not all(url and searcher.validar_url(url) for url in urls):
+            print(f"{Fore.RED}❌ Informe uma URL válida ou um arquivo com --urls.")
+            return
+        searcher.monitorar(urls, termos, args.case_sensitive, args.monitorar, args.estado,
+                           args.workers, args.por_host)
+        return
+    
+    if args.urls:
+        urls = searcher.carregar_urls(args.urls)
+        resultados_por_url = searcher.buscar_em_lote(
+            urls, termos, args.case_sensitive, args.workers, args.por_host
+        )
+        searcher.exibir_resultados_lote(resultados_por_url)
+        
+        if args.saida:
+            searcher.salvar_resultados_lote(resultados_por_url, args.formato, args.saida)
+            return
+        print(f"\n{Fore.MAGENTA}💾 Deseja salvar os resultados em um arquivo? (s/n): ", end="")
+        if input().strip().lower() in ['s', 'sim', 'y', 'yes']:
+            searcher.salvar_resultados_lote(resultados_por_url, args.formato)
+        return
+    
+    if not args.url or not searcher.validar_url(args.url):
+        print(f"{Fore.RED}❌ URL inválida: {args.url}")
+        return
+    
+    if args.stream:
+        resultados_por_termo = searcher.buscar_em_stream(
+            args.url, termos, args.case_sensitive, args.max_ocorrencias
+        )
+    else:
+        html_content = searcher.obter_pagina(args.url)
+        resultados_por_termo = html_content and searcher.buscar_multiplos_termos(
+            html_content, termos, args.case_sensitive, args.url
+        )
+    if not resultados_por_termo:
+        return
+    
+    if len(resultados_por_termo) == 1:
+        termo, (resultados, ocorrencias_visiveis) = next(iter(resultados_por_termo.items()))
+        searcher.exibir_resultados(resultados, termo, ocorrencias_visiveis, args.url)
+        relatorio = (resultados, termo)
+    else:
+        searcher.exibir_resultados_multiplos(resultados_por_termo, args.url)
+        relatorio = (resultados_por_termo, None)
+    
+    if args.saida:
+        searcher.salvar_resultados(*relatorio, args.url, args.formato, args.saida)
+    elif any(resultados for resultados, _ in resultados_por_termo.values()):
+        searcher.salvar_resultados_opcao(*relatorio, args.url, args.formato)
+
+
 def main():
     """Função principal"""
-    searcher = TextSearcher()
-    searcher.executar()
+    if len(sys.argv) == 1:
+        TextSearcher().executar()
+        return
+    
+    args = criar_parser().parse_args()
+    try:
+        executar_cli(TextSearcher(args.cache, args.modo, args.max_erros), args)
+    except ValueError as e:
+        print(f"{Fore.RED}❌ {e}")
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}⚠️  Operação cancelada pelo usuário.")
 
 
 if __name__ == "__main__":
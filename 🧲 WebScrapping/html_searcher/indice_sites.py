@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice Local de Sites para o Buscador de Texto
+Rastreia um site e guarda o texto visível e o HTML de cada página em um índice
+SQLite FTS5, para que buscas repetidas sejam respondidas sem baixar as páginas de novo
+"""
+import re
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urldefrag, urlparse
+
+import requests
+from colorama import Fore
+
+# Arquivo padrão do índice
+ARQUIVO_INDICE = 'indice_sites.db'
+
+# Limites padrão do rastreamento
+MAX_PAGINAS = 200
+WORKERS_RASTREAMENTO = 8
+
+# Páginas mais relevantes que recebem a análise completa (elemento HTML de cada ocorrência)
+PAGINAS_ANALISADAS = 20
+
+# Marcadores que o highlight() do FTS5 coloca em volta de cada trecho encontrado
+MARCA_INICIO = '\x02'
+MARCA_FIM = '\x03'
+
+# Extensões que certamente não são páginas HTML
+EXTENSOES_IGNORADAS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.pdf', '.zip',
+    '.gz', '.mp3', '.mp4', '.webm', '.css', '.js', '.json', '.xml', '.woff', '.woff2'
+)
+
+
+class ExtratorLinks(HTMLParser):
+    """Coleta os href de <a> sem montar a árvore do documento"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for nome, valor in attrs:
+                if nome == 'href' and valor:
+                    self.links.append(valor)
+
+
+class IndiceSites:
+    """Índice FTS5 de páginas rastreadas, consultado com a mesma classificação do TextSearcher"""
+
+    def __init__(self, searcher, caminho=ARQUIVO_INDICE):
+        self.searcher = searcher
+        self.conexao = sqlite3.connect(caminho)
+        self.trigram = self._criar_tabelas()
+
+    def _criar_tabelas(self):
+        """Cria as tabelas; retorna True se o tokenizador trigram (busca por substring) está disponível"""
+        self.conexao.executescript('''
+            CREATE TABLE IF NOT EXISTS paginas (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                host TEXT NOT NULL,
+                html TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                indexado_em REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS paginas_host ON paginas(host);
+        ''')
+
+        try:
+            self.conexao.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS paginas_fts USING fts5(
+                    texto, html, content='paginas', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            # SQLite sem FTS5/trigram: as consultas varrem a tabela local (ainda sem rede)
+            return False
+
+        # Mantém o índice FTS sincronizado com a tabela de conteúdo
+        self.conexao.executescript('''
+            CREATE TRIGGER IF NOT EXISTS paginas_ai AFTER INSERT ON paginas BEGIN
+                INSERT INTO paginas_fts(rowid, texto, html) VALUES (new.id, new.texto, new.html);
+            END;
+            CREATE TRIGGER IF NOT EXISTS paginas_ad AFTER DELETE ON paginas BEGIN
+                INSERT INTO paginas_fts(paginas_fts, rowid, texto, html) VALUES ('delete', old.id, old.texto, old.html);
+            END;
+            CREATE TRIGGER IF NOT EXISTS paginas_au AFTER UPDATE ON paginas BEGIN
+                INSERT INTO paginas_fts(paginas_fts, rowid, texto, html) VALUES ('delete', old.id, old.texto, old.html);
+                INSERT INTO paginas_fts(rowid, texto, html) VALUES (new.id, new.texto, new.html);
+            END;
+        ''')
+        return True
+
+    def indexar_site(self, url_inicial, max_paginas=MAX_PAGINAS, usar_sitemap=True,
+                     workers=WORKERS_RASTREAMENTO):
+        """Rastreia links do mesmo host (opcionalmente a partir do sitemap.xml) e indexa cada página"""
+        host = urlparse(url_inicial).netloc.lower()
+        fila = deque([self._normalizar_url(url_inicial)])
+        if usar_sitemap:
+            fila.extend(self.urls_do_sitemap(url_inicial))
+
+        vistos = set()
+        indexadas = 0
+        inicio = time.perf_counter()
+        print(f"\n{Fore.BLUE}🕸️  Indexando {host} (até {max_paginas} páginas)...")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while fila and indexadas < max_paginas:
+                # Cada rodada baixa em paralelo uma "onda" de URLs ainda não vistas
+                onda = []
+                while fila and len(onda) < min(workers * 2, max_paginas - indexadas):
+                    url = fila.popleft()
+                    if url not in vistos and self._mesmo_host(url, host):
+                        vistos.add(url)
+                        onda.append(url)
+
+                for url, pagina in zip(onda, executor.map(self._baixar, onda)):
+                    if pagina is None:
+                        continue
+                    html_content, texto_visivel, links = pagina
+                    self._salvar(url, host, html_content, texto_visivel)
+                    indexadas += 1
+                    print(f"{Fore.GREEN}[{indexadas}] {url}")
+                    fila.extend(link for link in links if link not in vistos)
+
+                self.conexao.commit()
+
+        duracao = time.perf_counter() - inicio
+        print(f"{Fore.GREEN}✅ {indexadas} página(s) indexada(s) em {duracao:.1f}s")
+        return indexadas
+
+    def _baixar(self, url):
+        """Baixa uma página e extrai texto visível e links (executado nas threads)"""
+        try:
+            response, html_content, _ = self.searcher.requisitar_pagina(url)
+        except requests.exceptions.RequestException as e:
+            print(f"{Fore.RED}❌ {url} - {e}")
+            return None
+
+        if 'html' not in response.headers.get('content-type', 'text/html').lower():
+            return None
+
+        extrator = ExtratorLinks()
+        try:
+            extrator.feed(html_content)
+            extrator.close()
+        except Exception:
+            pass
+        links = [self._normalizar_url(urljoin(url, link)) for link in extrator.links]
+        return html_content, self.searcher.extrair_texto_visivel(html_content), links
+
+    def urls_do_sitemap(self, url_inicial):
+        """Lê o sitemap.xml do site (e sitemaps aninhados em um sitemapindex)"""
+        partes = urlparse(url_inicial)
+        pendentes = [f"{partes.scheme}://{partes.netloc}/sitemap.xml"]
+        urls = []
+
+        while pendentes:
+            try:
+                response = self.searcher.session.get(pendentes.pop(), timeout=15)
+                response.raise_for_status()
+                raiz = ET.fromstring(response.content)
+            except (requests.exceptions.RequestException, ET.ParseError):
+                continue
+
+            for elemento in raiz.iter():
+                if elemento.tag.endswith('loc') and elemento.text:
+                    loc = elemento.text.strip()
+                    if raiz.tag.endswith('sitemapindex'):
+                        pendentes.append(loc)
+                    else:
+                        urls.append(self._normalizar_url(loc))
+
+        if urls:
+            print(f"{Fore.CYAN}🗺️  {len(urls)} URL(s) encontradas no sitemap.xml")
+        return urls
+
+    def _salvar(self, url, host, html_content, texto_visivel):
+        self.conexao.execute('''
+            INSERT INTO paginas (url, host, html, texto, indexado_em) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                html = excluded.html, texto = excluded.texto, indexado_em = excluded.indexado_em
+        ''', (url, host, html_content, texto_visivel, time.time()))
+
+    def _normalizar_url(self, url):
+        return urldefrag(url)[0]
+
+    def _mesmo_host(self, url, host):
+        partes = urlparse(url)
+        return (partes.scheme in ('http', 'https') and partes.netloc.lower() == host
+                and not partes.path.lower().endswith(EXTENSOES_IGNORADAS))
+
+    def buscar(self, termos, case_sensitive=False, host=None, analisar=PAGINAS_ANALISADAS):
+        """Responde a busca a partir do índice: {url: resultados_por_termo} das páginas com ocorrências
+        
+        As `analisar` páginas mais relevantes passam pela análise completa (elemento e contexto de
+        cada ocorrência; None analisa todas); nas demais, as ocorrências vêm dos offsets do índice.
+        """
+        inicio = time.perf_counter()
+        automato = self.searcher.criar_buscador(termos, case_sensitive)
+        resultados_por_url = {}
+        analisadas = 0
+
+        for url, html_content, texto_visivel, ocorrencias, visiveis in self._candidatos(automato, host):
+            if not (ocorrencias or any(visiveis)):
+                continue
+            if analisar is None or analisadas < analisar:
+                resultados_por_url[url] = self.searcher.analisar_html(
+                    html_content, automato, texto_visivel=texto_visivel
+                )
+                analisadas += 1
+            else:
+                resultados = self._resultados_do_indice(html_content, ocorrencias, len(automato.termos))
+                resultados_por_url[url] = {
+                    termo: (resultados[indice], visiveis[indice])
+                    for indice, termo in enumerate(automato.termos)
+                }
+
+        duracao = (time.perf_counter() - inicio) * 1000
+        print(f"\n{Fore.GREEN}⚡ Consulta respondida pelo índice em {duracao:.0f} ms "
+              f"({len(resultados_por_url)} página(s) com ocorrências, {analisadas} analisada(s) por completo)")
+        return resultados_por_url
+
+    def _candidatos(self, automato, host):
+        """Gera (url, html, texto visível, ocorrências no HTML, contagens visíveis) das páginas candidatas"""
+        filtro_host = " AND p.host = ?" if host else ""
+        parametros_host = [host.lower()] if host else []
+
+        # O trigram só indexa termos exatos com 3+ caracteres: o FTS devolve os trechos encontrados
+        # (highlight) e o buscador só confirma caixa e limites dentro deles, sem varrer o HTML
+        if self.searcher.modo == 'exato' and self.trigram and all(len(termo) >= 3 for termo in automato.termos):
+            consulta = ' OR '.join('"' + termo.replace('"', '""') + '"' for termo in automato.termos)
+            linhas = self.conexao.execute(f'''
+                SELECT p.url, highlight(paginas_fts, 1, ?, ?), highlight(paginas_fts, 0, ?, ?), p.texto
+                FROM paginas_fts f JOIN paginas p ON p.id = f.rowid
+                WHERE paginas_fts MATCH ?{filtro_host} ORDER BY f.rank
+            ''', [MARCA_INICIO, MARCA_FIM, MARCA_INICIO, MARCA_FIM, consulta] + parametros_host)
+
+            for url, html_marcado, texto_marcado, texto_visivel in linhas:
+                html_content, trechos = self._desmarcar(html_marcado)
+                ocorrencias = [
+                    (inicio_trecho + inicio, inicio_trecho + fim, indice)
+                    for inicio_trecho, fim_trecho in trechos
+                    for inicio, fim, indice in automato.buscar(html_content[inicio_trecho:fim_trecho])
+                ]
+                visiveis = [0] * len(automato.termos)
+                for inicio_trecho, fim_trecho in self._desmarcar(texto_marcado)[1]:
+                    for indice, quantidade in enumerate(automato.contar(texto_visivel[inicio_trecho:fim_trecho])):
+                        visiveis[indice] += quantidade
+                yield url, html_content, texto_visivel, ocorrencias, visiveis
+            return
+
+        # Regex, busca aproximada, termos curtos ou SQLite sem trigram: varre as páginas guardadas
+        print(f"{Fore.YELLOW}⚠️  Esta busca não usa o índice FTS: varrendo todas as páginas guardadas")
+        linhas = self.conexao.execute(f'''
+            SELECT p.url, p.html, p.texto FROM paginas p WHERE 1 = 1{filtro_host} ORDER BY p.url
+        ''', parametros_host)
+        for url, html_content, texto_visivel in linhas:
+            yield url, html_content, texto_visivel, list(automato.buscar(html_content)), automato.contar(texto_visivel)
+
+    def _desmarcar(self, marcado):
+        """Remove os marcadores do highlight(): (texto original, [(início, fim) de cada trecho marcado])"""
+        partes = marcado.split(MARCA_INICIO)
+        texto = [partes[0]]
+        trechos = []
+        posicao = len(partes[0])
+        for parte in partes[1:]:
+            trecho, _, resto = parte.partition(MARCA_FIM)
+            trechos.append((posicao, posicao + len(trecho)))
+            posicao += len(trecho) + len(resto)
+            texto.extend((trecho, resto))
+        return ''.join(texto), trechos
+
+    def _resultados_do_indice(self, html_content, ocorrencias, quantidade_termos):
+        """Resultados só com offsets, linha/coluna e contexto (sem classificar o elemento HTML)"""
+        resultados = [[] for _ in range(quantidade_termos)]
+        linha, ultima_quebra, posicao = 1, -1, 0
+
+        for inicio, fim, indice in sorted(ocorrencias):
+            linha += html_content.count('\n', posicao, inicio)
+            quebra = html_content.rfind('\n', posicao, inicio)
+            if quebra != -1:
+                ultima_quebra = quebra
+            posicao = inicio
+
+            contexto = self.searcher.destacar_ocorrencias(html_content, [(inicio, fim)])[0]
+            resultados[indice].append({
+                'inicio': inicio,
+                'fim': fim,
+                'linha': linha,
+                'coluna': inicio - ultima_quebra,
+                'tag': None,
+                'elemento': "Não analisado (aumente --analisar)",
+                'trecho': '',
+                'contexto': re.sub(r'\s+', ' ', contexto)
+            })
+        return resultados
+
+    def fechar(self):
+        self.conexao.close()
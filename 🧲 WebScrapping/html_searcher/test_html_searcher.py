@@ -0,0 +1,176 @@
+"""
+Testes da busca em blocos: o resultado em streaming tem que ser o mesmo da busca no documento inteiro
+
+Uso: python -m unittest test_html_searcher
+"""
+
+import contextlib
+import io
+import random
+import time
+import unittest
+
+from html_searcher import (
+    Buscador,
+    BuscadorAproximado,
+    ExtratorTextoVisivel,
+    IndiceHTML,
+    TextSearcher,
+    criar_buscador,
+)
+
+TERMOS_POR_MODO = {
+    'exato': ['python', 'busca', 'ação'],
+    'regex': [r'py\w*on', r'\d+(?:\.\d+)?', r'<b>[^<]*</b>', r'busca'],
+    'aproximado': ['python', 'busca'],
+}
+
+TAMANHOS_BLOCO = (1, 7, 64, 1000)
+
+
+def gerar_documento(tamanho, semente=42):
+    """HTML sintético com os termos (exatos, com erros e colados) espalhados pelo texto"""
+    aleatorio = random.Random(semente)
+    pedacos = ['python', 'pyton', 'pythhon', 'pythonpython', 'pytonpyton', 'busca', 'bsca',
+               'ação', '3.14', '12345', '<b>negrito</b>', '<p>', '</p>', ' ', '\n', 'texto comum ']
+    partes = []
+    while sum(map(len, partes)) < tamanho:
+        partes.append(aleatorio.choice(pedacos))
+    return '<html><body>' + ''.join(partes) + '</body></html>'
+
+
+def buscar_em_blocos(buscador, texto, tamanho_bloco):
+    busca = buscador.iniciar_busca()
+    ocorrencias = []
+    for inicio in range(0, len(texto), tamanho_bloco):
+        ocorrencias.extend(busca.alimentar(texto[inicio:inicio + tamanho_bloco]))
+    ocorrencias.extend(busca.finalizar())
+    return ocorrencias
+
+
+class TestBuscaEmBlocos(unittest.TestCase):
+
+    def test_blocos_iguais_ao_documento_inteiro(self):
+        # Maior que a sobreposição do regex, para que ocorrências fiquem retidas entre blocos
+        documento = gerar_documento(5000)
+        for modo, termos in TERMOS_POR_MODO.items():
+            buscador = criar_buscador(termos, modo=modo)
+            esperado = sorted(buscador.buscar(documento))
+            for tamanho_bloco in TAMANHOS_BLOCO:
+                with self.subTest(modo=modo, tamanho_bloco=tamanho_bloco):
+                    self.assertEqual(sorted(buscar_em_blocos(buscador, documento, tamanho_bloco)), esperado)
+
+    def test_contagem_visivel_em_blocos(self):
+        documento = gerar_documento(3000, semente=7)
+        for modo, termos in TERMOS_POR_MODO.items():
+            buscador = criar_buscador(termos, modo=modo)
+            extrator = ExtratorTextoVisivel(buscador, guardar_texto=True)
+            extrator.feed(documento)
+            extrator.finalizar()
+            esperado = buscador.contar(extrator.texto())
+            for tamanho_bloco in TAMANHOS_BLOCO:
+                with self.subTest(modo=modo, tamanho_bloco=tamanho_bloco):
+                    extrator = ExtratorTextoVisivel(buscador)
+                    for inicio in range(0, len(documento), tamanho_bloco):
+                        extrator.feed(documento[inicio:inicio + tamanho_bloco])
+                    self.assertEqual(extrator.finalizar(), esperado)
+
+
+def gerar_pagina(tamanho, semente=3):
+    """Página com ocorrências dentro de atributos, scripts, tags vazias e fechamentos fora de ordem"""
+    aleatorio = random.Random(semente)
+    pedacos = ['python', 'ação', ' texto ', '\n', '<p>', '</p>', '<div class="python">', '</div>',
+               '<b>python</b>', '<br>', '<img alt="ação python"/>', '<script>var python = "<p>";</script>',
+               '<span>', '</span>', '</li>', '<a href="/python">py', 'thon</a>', '<!-- python -->']
+    partes = []
+    while sum(map(len, partes)) < tamanho:
+        partes.append(aleatorio.choice(pedacos))
+    return '<html><body>' + ''.join(partes) + '</body></html>'
+
+
+class RespostaFalsa:
+    """Resposta HTTP em memória, entregue em blocos de bytes de tamanho fixo"""
+
+    encoding = 'utf-8'
+    headers = {'content-type': 'text/html; charset=utf-8'}
+
+    def __init__(self, html, tamanho_bloco):
+        self.dados = html.encode('utf-8')
+        self.tamanho_bloco = tamanho_bloco
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for inicio in range(0, len(self.dados), self.tamanho_bloco):
+            yield self.dados[inicio:inicio + self.tamanho_bloco]
+
+    def close(self):
+        pass
+
+
+class TestBuscaEmStream(unittest.TestCase):
+
+    def test_stream_igual_ao_documento(self):
+        # Termos que cruzam o limite de uma tag ("p>py", "<b>...</b>") e blocos que cortam tags e trechos
+        pagina = gerar_pagina(6000)
+        termos_por_modo = dict(TERMOS_POR_MODO, exato=['python', 'ação', 'p>py', '</b><'])
+        for modo, termos in termos_por_modo.items():
+            searcher = TextSearcher(modo=modo)
+            esperado = searcher.analisar_html(pagina, searcher.criar_buscador(termos))
+            for tamanho_bloco in (5, 64, 1000):
+                with self.subTest(modo=modo, tamanho_bloco=tamanho_bloco):
+                    searcher.session.get = lambda *args, **kwargs: RespostaFalsa(pagina, tamanho_bloco)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        resultado = searcher.buscar_em_stream('http://exemplo', termos)
+                    self.assertEqual(resultado, esperado)
+
+
+class TestIndiceHTML(unittest.TestCase):
+
+    def test_linha_coluna_em_documento_de_uma_linha(self):
+        # HTML minificado: nenhuma quebra de linha e muitas ocorrências
+        documento = '<p>python</p>' * 300000
+        indice = IndiceHTML(documento)
+        posicoes = range(3, len(documento), 13)
+
+        inicio = time.perf_counter()
+        resultado = [indice.linha_coluna(posicao) for posicao in posicoes]
+        decorrido = time.perf_counter() - inicio
+
+        self.assertEqual(resultado, [(1, posicao + 1) for posicao in posicoes])
+        # Procurar a quebra anterior desde o início do documento a cada chamada levaria segundos
+        self.assertLess(decorrido, 2)
+
+    def test_linha_coluna_com_quebras(self):
+        documento = 'ab\ncd\n\nefg\nh'
+        indice = IndiceHTML(documento)
+        for posicao in list(range(len(documento))) + [5, 0, 9]:
+            linha = documento.count('\n', 0, posicao) + 1
+            coluna = posicao - documento.rfind('\n', 0, posicao)
+            self.assertEqual(indice.linha_coluna(posicao), (linha, coluna))
+
+
+class TestBuscadorAproximado(unittest.TestCase):
+
+    def test_ocorrencias_coladas(self):
+        buscador = BuscadorAproximado(['python'], max_erros=1)
+        self.assertEqual(list(buscador.buscar('pythonpython')), [(0, 6, 0), (6, 12, 0)])
+        self.assertEqual(list(buscador.buscar('pytonpyton')), [(0, 5, 0), (5, 10, 0)])
+
+    def test_max_erros_invalido(self):
+        with self.assertRaises(ValueError):
+            BuscadorAproximado(['ab'], max_erros=2)
+        with self.assertRaises(ValueError):
+            BuscadorAproximado(['python'], max_erros=-1)
+
+
+class TestBuscador(unittest.TestCase):
+
+    def test_base_abstrata(self):
+        with self.assertRaises(TypeError):
+            Buscador(['python'])
+
+
+if __name__ == '__main__':
+    unittest.main()